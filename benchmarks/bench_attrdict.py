@@ -0,0 +1,85 @@
+"""AttrDict 微基准测试
+
+对比旧版递归构建的 AttrDict 与当前按需解析的只读视图
+在“构建 + 读取 content/author”这一典型插件访问模式下的耗时
+
+运行方式（在项目根目录下）：
+    python -m benchmarks.bench_attrdict
+"""
+import timeit
+from typing import Any, Dict
+
+from src.Utils.EventClass import AttrDict
+
+
+class EagerAttrDict:
+    """旧版实现：构造时递归转换整棵树"""
+
+    def __init__(self, data: Dict[str, Any]):
+        for key, value in data.items():
+            if isinstance(value, dict):
+                setattr(self, key, EagerAttrDict(value))
+            elif isinstance(value, list):
+                processed_list = []
+                for item in value:
+                    if isinstance(item, dict):
+                        processed_list.append(EagerAttrDict(item))
+                    else:
+                        processed_list.append(item)
+                setattr(self, key, processed_list)
+            else:
+                setattr(self, key, value)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+
+SAMPLE = {
+    "id": "ROBOT1.0_xxxxxxxxxxxxxxxxxxxxxxxx",
+    "content": " /hotlist weibo",
+    "timestamp": "2025-01-01T12:00:00+08:00",
+    "group_id": "XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",
+    "group_openid": "XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",
+    "author": {
+        "id": "XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",
+        "member_openid": "XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",
+        "union_openid": "XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",
+    },
+    "message_scene": {"source": "default", "ext": ["ref_msg_idx=REFIDX_1", "msg_idx=REFIDX_2"]},
+    "attachments": [
+        {
+            "content_type": "image/png",
+            "filename": f"{i}.png",
+            "height": 720,
+            "width": 1280,
+            "size": 102400,
+            "url": f"https://multimedia.nt.qq.com.cn/download?appid=1407&fileid={i}",
+        }
+        for i in range(3)
+    ],
+}
+
+
+def eager_access():
+    d = EagerAttrDict(SAMPLE)
+    return d.get("content"), d.get("author").get("union_openid")
+
+
+def lazy_access():
+    d = AttrDict(SAMPLE)
+    return d.get("content"), d.get("author").get("union_openid")
+
+
+def main(number: int = 200000):
+    assert eager_access() == lazy_access()
+    print(f"{'实现':<16}{'总耗时(s)':>12}{'单次(us)':>12}")
+    results = {}
+    for name, func in (("EagerAttrDict", eager_access), ("AttrDict", lazy_access)):
+        elapsed = min(timeit.repeat(func, number=number, repeat=5))
+        results[name] = elapsed
+        print(f"{name:<16}{elapsed:>12.4f}{elapsed / number * 1e6:>12.3f}")
+    print(f"加速比: {results['EagerAttrDict'] / results['AttrDict']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
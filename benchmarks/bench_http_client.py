@@ -0,0 +1,68 @@
+"""共享HTTP客户端基准测试
+
+在本地启动一个模拟开放平台发信接口的aiohttp服务，
+对比“每条消息新建ClientSession”与“复用共享连接池”的单次发送延迟
+
+注意：本地测试不含TLS握手与DNS解析，生产环境中两者的差距会更大
+
+运行方式（在项目根目录下）：
+    python -m benchmarks.bench_http_client
+"""
+import asyncio, statistics, time
+
+import aiohttp
+from aiohttp import web
+
+from src.Utils.HttpClient import get_session, close_http_client
+
+SENDS = 500
+PAYLOAD = {"content": "\n测试消息", "msg_type": 0, "msg_id": "ROBOT1.0_xxxxxxxx", "msg_seq": 1}
+HEADERS = {"Authorization": "QQBot xxxxxxxx", "Content-Type": "application/json"}
+
+
+async def fake_send(request: web.Request) -> web.Response:
+    await request.json()
+    return web.json_response({"id": "ROBOT1.0_yyyyyyyy", "timestamp": 0})
+
+
+async def per_message_session(url: str) -> float:
+    started = time.perf_counter()
+    async with aiohttp.ClientSession() as session:
+        async with session.post(url, json=PAYLOAD, headers=HEADERS) as response:
+            await response.json()
+    return time.perf_counter() - started
+
+
+async def shared_session(url: str) -> float:
+    started = time.perf_counter()
+    async with get_session().post(url, json=PAYLOAD, headers=HEADERS) as response:
+        await response.json()
+    return time.perf_counter() - started
+
+
+async def main():
+    app = web.Application()
+    app.router.add_post("/v2/groups/{group_openid}/messages", fake_send)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    url = f"http://127.0.0.1:{port}/v2/groups/XXXXXXXX/messages"
+
+    print(f"{'实现':<16}{'平均(ms)':>10}{'P50(ms)':>10}{'P99(ms)':>10}")
+    results = {}
+    try:
+        for name, func in (("per-message", per_message_session), ("shared", shared_session)):
+            await func(url)  # 预热
+            samples = sorted([await func(url) for _ in range(SENDS)])
+            results[name] = statistics.mean(samples)
+            print(f"{name:<16}{results[name] * 1000:>10.3f}{samples[len(samples) // 2] * 1000:>10.3f}{samples[int(len(samples) * 0.99)] * 1000:>10.3f}")
+        print(f"加速比: {results['per-message'] / results['shared']:.2f}x")
+    finally:
+        await close_http_client()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
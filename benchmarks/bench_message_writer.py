@@ -0,0 +1,61 @@
+"""消息入库基准测试
+
+对比旧版“每条消息一次 GroupMessage.create（各自一个事务）”
+与当前BatchWriter“缓冲后在一个事务中bulk_create”写入相同数量消息的耗时
+
+数据库建在临时目录中，不会影响data目录下的数据
+
+运行方式（在项目根目录下）：
+    python -m benchmarks.bench_message_writer
+"""
+import asyncio, os, tempfile, time
+
+from tortoise import Tortoise
+
+from src.Utils.BatchWriter import BatchWriter
+from src.Utils.EventSender import GroupMessage
+
+
+def make_rows(prefix: str, count: int):
+    return [
+        {"group_id": f"group{i % 20}", "user_id": f"user{i % 200}", "message": f"消息内容 {i}", "message_id": f"{prefix}{i}"}
+        for i in range(count)
+    ]
+
+
+async def legacy_write(rows):
+    for row in rows:
+        await GroupMessage.create(**row)
+
+
+async def batched_write(rows):
+    writer = BatchWriter("bench", "message", {"group": GroupMessage}, max_batch=200, unique_field="message_id")
+    writer.start()
+    for row in rows:
+        writer.add("group", **row)
+    await writer.stop()
+
+
+async def main(count: int = 2000):
+    with tempfile.TemporaryDirectory() as tmp:
+        await Tortoise.init(config={
+            "connections": {"message": f"sqlite://{os.path.join(tmp, 'message.db')}"},
+            "apps": {"message": {"models": ["src.Utils.EventSender"], "default_connection": "message"}},
+        })
+        await Tortoise.generate_schemas()
+        print(f"{'实现':<16}{'总耗时(s)':>12}{'行/秒':>12}")
+        results = {}
+        for name, func in (("逐条create", legacy_write), ("BatchWriter", batched_write)):
+            rows = make_rows(name, count)
+            started = time.perf_counter()
+            await func(rows)
+            elapsed = time.perf_counter() - started
+            results[name] = elapsed
+            print(f"{name:<16}{elapsed:>12.4f}{count / elapsed:>12.0f}")
+        assert await GroupMessage.all().count() == count * 2
+        await Tortoise.close_connections()
+    print(f"加速比: {results['逐条create'] / results['BatchWriter']:.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
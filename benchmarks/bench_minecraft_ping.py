@@ -0,0 +1,98 @@
+"""Minecraft服务器状态查询基准测试
+
+在本地启动模拟的Java版（TCP，Server List Ping）与基岩版（UDP，Unconnected Ping）服务器，
+每个请求在服务器端延迟latency秒，然后用MinecraftPinger分别测量：
+- 单次查询：校验解析结果并输出测得的延迟
+- 并发查询：同一服务器的concurrent次并发查询（合并为一次查询）
+- 缓存查询：缓存有效期内的再次查询
+并统计模拟服务器实际收到的查询次数
+
+运行方式（在项目根目录下）：
+    python -m benchmarks.bench_minecraft_ping
+"""
+import asyncio, json, struct, time
+
+from uapis_extension.minecraft_ping import (
+    MinecraftPinger, _pack_packet, _pack_string, _read_packet, _RAKNET_MAGIC,
+)
+
+STATUS = {
+    "version": {"name": "1.21.1", "protocol": 767},
+    "players": {"max": 100, "online": 7},
+    "description": {"text": "§aAxT ", "extra": [{"text": "测试服务器"}]},
+}
+BEDROCK_INFO = "MCPE;§bAxT 基岩测试;712;1.21.20;3;50;1234567890;生存世界;Survival;1;19132;19133;"
+
+
+async def java_handler(reader, writer, latency: float, counter: dict):
+    try:
+        await _read_packet(reader)  # 握手
+        await _read_packet(reader)  # 状态请求
+        counter["java"] += 1
+        await asyncio.sleep(latency)
+        writer.write(_pack_packet(0x00, _pack_string(json.dumps(STATUS))))
+        packet_id, payload = await _read_packet(reader)
+        await asyncio.sleep(latency)
+        writer.write(_pack_packet(packet_id, payload))
+        await writer.drain()
+    except asyncio.IncompleteReadError:
+        pass
+    finally:
+        writer.close()
+
+
+class BedrockServer(asyncio.DatagramProtocol):
+    def __init__(self, latency: float, counter: dict):
+        self.latency = latency
+        self.counter = counter
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.counter["bedrock"] += 1
+        info = BEDROCK_INFO.encode("utf-8")
+        pong = b"\x1c" + data[1:9] + struct.pack(">q", 1) + _RAKNET_MAGIC + struct.pack(">H", len(info)) + info
+        asyncio.get_running_loop().call_later(self.latency, self.transport.sendto, pong, addr)
+
+
+async def measure(label: str, pinger: MinecraftPinger, address: str, edition: str, count: int, counter: dict):
+    before = dict(counter)
+    started = time.perf_counter()
+    results = await asyncio.gather(*(pinger.ping(address, edition) for _ in range(count)))
+    elapsed = (time.perf_counter() - started) * 1000
+    upstream = sum(counter.values()) - sum(before.values())
+    print(f"{label:<16}{count:>8}{elapsed:>12.1f}{upstream:>12}{results[0].get('latency', '-'):>12}")
+    return results[0]
+
+
+async def main(latency: float = 0.02, concurrent: int = 200, java_port: int = 25599, bedrock_port: int = 19199):
+    counter = {"java": 0, "bedrock": 0}
+    server = await asyncio.start_server(
+        lambda r, w: java_handler(r, w, latency, counter), "127.0.0.1", java_port
+    )
+    transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+        lambda: BedrockServer(latency, counter), local_addr=("127.0.0.1", bedrock_port)
+    )
+
+    print(f"{'查询':<16}{'次数':>8}{'耗时(ms)':>12}{'服务器收到':>12}{'延迟(ms)':>12}")
+    for edition, port in (("java", java_port), ("be", bedrock_port)):
+        pinger = MinecraftPinger(timeout=2, cache_ttl=30, allow_private=True)
+        address = f"127,0,0,1:{port}"
+        result = await measure(f"{edition} 单次", pinger, address, edition, 1, counter)
+        assert result["online"], result
+        pinger = MinecraftPinger(timeout=2, cache_ttl=30, allow_private=True)
+        await measure(f"{edition} 并发", pinger, address, edition, concurrent, counter)
+        await measure(f"{edition} 缓存", pinger, address, edition, concurrent, counter)
+        print(f"    {result}")
+
+    offline = await MinecraftPinger(timeout=1, allow_private=True).ping("127.0.0.1:1", "java")
+    assert not offline["online"]
+
+    transport.close()
+    server.close()
+    await server.wait_closed()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,88 @@
+"""Minecraft UUID查询基准测试
+
+在本地启动一个模拟的Mojang接口（每次请求延迟latency秒），模拟一群用户并发查询玩家UUID：
+共requests次查询，涉及names个不同的玩家名（其中1/5不存在）。分别测量：
+- 旧实现：每次查询新建ClientSession，请求 /users/profiles/minecraft/<玩家名>
+- 冷缓存：MinecraftUUIDCache，内存与磁盘均为空（合并为批量请求）
+- 内存缓存：同一实例再查询一遍
+- 磁盘缓存：新建实例（内存为空）读取上一步写入的磁盘缓存
+并统计各阶段向模拟接口发出的请求数
+
+运行方式（在项目根目录下）：
+    python -m benchmarks.bench_minecraft_uuid
+"""
+import aiohttp, asyncio, os, random, tempfile, time
+from aiohttp import web
+
+from src.Utils.HttpClient import close_http_client
+from uapis_extension.minecraft_uuid import MinecraftUUIDCache
+
+
+def make_server(known: dict, latency: float, counter: dict) -> web.Application:
+    async def single(request):
+        counter["requests"] += 1
+        await asyncio.sleep(latency)
+        name = request.match_info["name"].lower()
+        if name not in known:
+            return web.Response(status=404)
+        return web.json_response({"id": known[name], "name": name})
+
+    async def bulk(request):
+        counter["requests"] += 1
+        await asyncio.sleep(latency)
+        names = await request.json()
+        if len(names) > 10:
+            return web.json_response({"errorMessage": "Not more that 10 profile name per call is allowed."}, status=400)
+        return web.json_response([{"id": known[n.lower()], "name": n} for n in names if n.lower() in known])
+
+    app = web.Application()
+    app.router.add_get("/users/profiles/minecraft/{name}", single)
+    app.router.add_post("/profiles/minecraft", bulk)
+    return app
+
+
+async def legacy_lookup(base: str, name: str):
+    async with aiohttp.ClientSession() as session:
+        async with session.get(f"{base}/users/profiles/minecraft/{name}") as response:
+            if response.status != 200:
+                return None
+            return (await response.json()).get("id")
+
+
+async def measure(label: str, counter: dict, lookups):
+    counter["requests"] = 0
+    started = time.perf_counter()
+    results = await asyncio.gather(*lookups)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<12}{elapsed:>12.3f}{counter['requests']:>14}")
+    return results
+
+
+async def main(names: int = 50, requests: int = 500, latency: float = 0.05, port: int = 18767):
+    known = {f"player{i}": f"{i:032x}" for i in range(names) if i % 5}
+    queries = [f"Player{random.randrange(names)}" for _ in range(requests)]
+    counter = {"requests": 0}
+    runner = web.AppRunner(make_server(known, latency, counter))
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    base = f"http://127.0.0.1:{port}"
+
+    print(f"{'阶段':<12}{'耗时(s)':>12}{'上游请求数':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "minecraft_uuid.db")
+        expected = await measure("旧实现", counter, [legacy_lookup(base, name) for name in queries])
+        cache = MinecraftUUIDCache(path, profiles_url=f"{base}/profiles/minecraft")
+        cold = await measure("冷缓存", counter, [cache.resolve(name) for name in queries])
+        warm = await measure("内存缓存", counter, [cache.resolve(name) for name in queries])
+        cache.close()
+        cache = MinecraftUUIDCache(path, profiles_url=f"{base}/profiles/minecraft")
+        disk = await measure("磁盘缓存", counter, [cache.resolve(name) for name in queries])
+        cache.close()
+        assert expected == cold == warm == disk
+
+    await close_http_client()
+    await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,90 @@
+"""Mojang服务状态查询基准测试
+
+在本地启动模拟的会话服务器与API服务（每次请求延迟latency秒），分别测量：
+- 旧实现：每次查询依次请求两个服务，各新建一个ClientSession
+- 状态监控：MojangStatusMonitor并发检查一轮后，/mcstatus直接返回内存中的文本
+并模拟一个服务超时，确认单个服务的超时不会拖慢整轮检查，且可用率正确反映检查结果
+
+运行方式（在项目根目录下）：
+    python -m benchmarks.bench_mojang_status
+"""
+import aiohttp, asyncio, time
+from aiohttp import web
+
+from src.Utils.HttpClient import close_http_client
+from uapis_extension.mojang_status import MOJANG_ENDPOINTS, MojangStatusMonitor
+
+
+def make_server(latency: float, state: dict) -> web.Application:
+    async def session_server(request):
+        state["requests"] += 1
+        await asyncio.sleep(latency)
+        return web.Response(status=403)
+
+    async def api(request):
+        state["requests"] += 1
+        await asyncio.sleep(state["api_latency"])
+        return web.json_response({"Status": "OK"})
+
+    app = web.Application()
+    app.router.add_post("/session/", session_server)
+    app.router.add_get("/api/", api)
+    return app
+
+
+async def legacy_check(base: str) -> str:
+    async with aiohttp.ClientSession() as session:
+        async with session.post(f"{base}/session/") as response:
+            status1 = "正常" if response.status == 403 else f"异常，返回码{response.status}"
+    async with aiohttp.ClientSession() as session:
+        async with session.get(f"{base}/api/") as response:
+            status2 = "正常" if (await response.json()).get("Status") == "OK" else "异常"
+    return f"===MC验证服务器在线状态===\n| 会话验证：{status1}\n| API服务：{status2}"
+
+
+async def timed(label: str, state: dict, coro_factory, rounds: int):
+    state["requests"] = 0
+    started = time.perf_counter()
+    for _ in range(rounds):
+        await coro_factory()
+    per_call = (time.perf_counter() - started) / rounds
+    print(f"{label:<16}{per_call * 1e6:>14.1f}{state['requests']:>14}")
+    return per_call
+
+
+async def main(latency: float = 0.05, port: int = 18769):
+    state = {"requests": 0, "api_latency": latency}
+    runner = web.AppRunner(make_server(latency, state))
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    base = f"http://127.0.0.1:{port}"
+    endpoints = {
+        "会话验证": ("POST", f"{base}/session/", MOJANG_ENDPOINTS["会话验证"][2]),
+        "API服务": ("GET", f"{base}/api/", MOJANG_ENDPOINTS["API服务"][2]),
+    }
+    monitor = MojangStatusMonitor(endpoints, interval=3600, timeout=latency * 4, history_size=10)
+
+    print(f"{'阶段':<16}{'单次耗时(us)':>14}{'上游请求数':>14}")
+    await timed("旧实现", state, lambda: legacy_check(base), 10)
+    probe = await timed("并发检查一轮", state, monitor.refresh, 10)
+    served = await timed("读取状态快照", state, monitor.get, 10000)
+    assert probe < latency * 1.8, "两个服务应并发检查"
+    assert served < 1e-3
+
+    # API服务超时：整轮检查耗时不超过timeout，可用率下降
+    state["api_latency"] = latency * 10
+    started = time.perf_counter()
+    await monitor.refresh()
+    elapsed = time.perf_counter() - started
+    print(f"{'API超时的一轮':<16}{elapsed * 1e6:>14.1f}")
+    assert elapsed < latency * 4 + 0.1
+    assert monitor.uptime("会话验证") == 100.0
+    assert monitor.uptime("API服务") == 90.0  # 历史记录保留最近10次，其中1次失败
+    print(await monitor.get())
+
+    await close_http_client()
+    await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,181 @@
+"""统计查询的查询计划回归测试
+
+在临时目录中建立收/发消息数据库，向8张消息表各写入若干行合成数据（默认每表100万行），
+然后执行 MessageState.py 与 EventSenderApp.py 中的统计查询：
+- MessageCounters._count_from_db：冷启动全量统计与重启后的增量统计（timestamp > ?）
+- group_message_stats 等按目标分组统计
+- get_failed_* 最近失败的发送记录
+
+记录每个查询实际执行的SQL并用 EXPLAIN QUERY PLAN 检查：
+- 不允许出现不走索引的全表扫描（SCAN <表名>）
+- 需要用到指定复合索引的查询必须使用该索引
+- get_failed_* 的排序必须由索引完成（不允许 USE TEMP B-TREE FOR ORDER BY）
+分别在 ANALYZE 之前与之后各检查一次，任一查询不符合预期时以非0状态码退出
+
+运行方式（在项目根目录下）：
+    python -m benchmarks.bench_query_plan [每表行数]
+"""
+import asyncio, logging, os, re, sqlite3, sys, tempfile, time
+from datetime import datetime, timedelta
+
+from tortoise import Tortoise, connections
+
+from src.Utils.MessageState import STAT_KINDS, MessageCounters, time_index
+from src.Utils import EventSenderApp
+
+TARGETS = 500
+DAYS = 90
+FAILED_EVERY = 50
+
+_FULL_SCAN = re.compile(r"^SCAN (TABLE )?\"?\w+\"?$")
+_FROM = re.compile(r'FROM "(\w+)"')
+_CONNECTIONS = {
+    model._meta.db_table: model._meta.app
+    for _, _, received_model, sent_model in STAT_KINDS.values()
+    for model in (received_model, sent_model)
+}
+
+
+class QueryCapture(logging.Handler):
+    """收集Tortoise执行的SQL及参数"""
+
+    def __init__(self):
+        super().__init__(logging.DEBUG)
+        self.queries = []
+
+    def emit(self, record):
+        if record.args and len(record.args) == 2:
+            self.queries.append(record.args)
+
+
+def seed(path: str, model, rows: int):
+    """用sqlite3直接批量写入合成数据（只为准备数据，不计入耗时）"""
+    _, field, _, _ = next(spec for spec in STAT_KINDS.values() if model in spec[2:])
+    ts_field = model._meta.fields_map["timestamp"]
+    columns = [name for name in model._meta.db_fields if name != "id"]
+    now = datetime.now()
+    step = timedelta(days=DAYS) / rows
+
+    def make(i):
+        row = {
+            "timestamp": ts_field.to_db_value(now - step * (rows - i), model),
+            "message": f"消息内容 {i}",
+            "message_id": f"msg{i}",
+            "status": "failed" if i % FAILED_EVERY == 0 else "success",
+            "error_info": None,
+        }
+        for name in ("group_id", "user_id", "channel_id", "guild_id"):
+            row[name] = f"{name}{i % TARGETS}"
+        row[field] = f"{field}{i % TARGETS}"
+        return tuple(row[name] for name in columns)
+
+    db = sqlite3.connect(path)
+    with db:
+        db.executemany(
+            f'INSERT INTO "{model._meta.db_table}" ({",".join(columns)}) VALUES ({",".join("?" * len(columns))})',
+            (make(i) for i in range(rows)),
+        )
+    db.close()
+
+
+def queries():
+    """(名称, 执行查询的协程工厂, 表名 -> (必须使用的索引, 是否禁止临时排序))"""
+    counters = MessageCounters()
+    since = datetime.now() - timedelta(days=1)
+    time_indexes = {
+        model._meta.db_table: time_index(model, field)
+        for _, field, received_model, sent_model in STAT_KINDS.values()
+        for model in (received_model, sent_model)
+    }
+    items = [
+        ("MessageCounters._count_from_db(None)", lambda: counters._count_from_db(None), lambda table: (None, False)),
+        (
+            "MessageCounters._count_from_db(since)", lambda: counters._count_from_db(since),
+            lambda table: (time_indexes[table], False),
+        ),
+    ]
+    for name in ("group", "user", "channel", "channel_private"):
+        items.append((f"{name}_message_stats", getattr(EventSenderApp, f"{name}_message_stats"), lambda table: (None, False)))
+        items.append((
+            f"get_failed_{name}_messages", getattr(EventSenderApp, f"get_failed_{name}_messages"),
+            lambda table: (f"idx_{table}_status_timestamp", True),
+        ))
+    return items
+
+
+def check_plan(plan, index, no_temp_sort):
+    details = [row[3] for row in plan]
+    problems = [f"全表扫描: {detail}" for detail in details if _FULL_SCAN.match(detail)]
+    if index and not any(index in detail for detail in details):
+        problems.append(f"未使用索引 {index}")
+    if no_temp_sort and any("TEMP B-TREE FOR ORDER BY" in detail for detail in details):
+        problems.append("排序未走索引")
+    return details, problems
+
+
+async def run_checks(label: str):
+    capture = QueryCapture()
+    db_logger = logging.getLogger("tortoise.db_client")
+    level = db_logger.level
+    db_logger.addHandler(capture)
+    db_logger.setLevel(logging.DEBUG)
+    failures = 0
+    print(f"\n== {label} ==")
+    print(f"{'查询':<60}{'耗时(ms)':>10}")
+    try:
+        for name, func, expect in queries():
+            capture.queries = []
+            started = time.perf_counter()
+            await func()
+            elapsed = (time.perf_counter() - started) * 1000
+            print(f"{name:<60}{elapsed:>10.1f}")
+            executed = capture.queries
+            capture.queries = []
+            for sql, values in executed:
+                table = _FROM.search(sql).group(1)
+                _, plan = await connections.get(_CONNECTIONS[table]).execute_query(
+                    f"EXPLAIN QUERY PLAN {sql}", values or []
+                )
+                details, problems = check_plan(plan, *expect(table))
+                failures += bool(problems)
+                print(f"  {table:<58}{'':>10}  {'OK' if not problems else '失败: ' + '; '.join(problems)}")
+                for detail in details:
+                    print(f"      {detail}")
+    finally:
+        db_logger.removeHandler(capture)
+        db_logger.setLevel(level)
+    return failures
+
+
+async def main(rows: int = 1_000_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {name: os.path.join(tmp, f"{name}.db") for name in ("message", "messagesent")}
+        config = {
+            "connections": {name: f"sqlite://{path}" for name, path in paths.items()},
+            "apps": {name: {"models": ["src.Utils.EventSender"], "default_connection": name} for name in paths},
+        }
+        await Tortoise.init(config=config)
+        await Tortoise.generate_schemas()
+        await Tortoise.close_connections()
+
+        started = time.perf_counter()
+        for _, _, received_model, sent_model in STAT_KINDS.values():
+            for model in (received_model, sent_model):
+                seed(paths[_CONNECTIONS[model._meta.db_table]], model, rows)
+        print(f"已写入 8 张表 × {rows} 行，耗时 {time.perf_counter() - started:.1f}s")
+
+        await Tortoise.init(config=config)
+        failures = await run_checks("ANALYZE 之前")
+        for name in paths:
+            await connections.get(name).execute_script("ANALYZE")
+        failures += await run_checks("ANALYZE 之后")
+        await Tortoise.close_connections()
+
+    if failures:
+        print(f"\n{failures} 个查询的查询计划不符合预期")
+        sys.exit(1)
+    print("\n所有查询的查询计划均符合预期")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*(int(arg) for arg in sys.argv[1:2])))
@@ -0,0 +1,83 @@
+"""事件路由基准测试
+
+对比旧版“create_payload中的if/elif列表扫描 + handle_event中的消息类型列表扫描”
+与当前EVENT_ROUTES单次字典查找的耗时（不含构建事件对象本身）
+
+事件类型以bytes保存并在每次路由前解码，模拟Webhook解析出的未驻留字符串
+
+运行方式（在项目根目录下）：
+    python -m benchmarks.bench_routing
+"""
+import timeit
+
+from src.Utils.EventClass import (
+    EVENT_ROUTES, MessageEventPayload, GuildMessageEvent, GroupMessageEvent,
+    PrivateMessageEvent, GuildEvent, GroupEvent, ValidationEvent,
+)
+
+# 模拟的事件类型分布：以群消息为主，夹杂频道、私聊与通知类事件
+EVENTS = (
+    [(0, b"GROUP_AT_MESSAGE_CREATE")] * 6
+    + [(0, b"C2C_MESSAGE_CREATE")] * 2
+    + [(0, b"AT_MESSAGE_CREATE"), (0, b"GROUP_ADD_ROBOT"), (0, b"GUILD_CREATE"), (0, b"FRIEND_ADD")]
+)
+
+
+def legacy_classify(op, t):
+    """旧版实现：逐个扫描列表"""
+    if op == 0:
+        if t in ["MESSAGE_CREATE", "AT_MESSAGE_CREATE", "DIRECT_MESSAGE_CREATE"]:
+            return GuildMessageEvent
+        elif t in ["GROUP_AT_MESSAGE_CREATE"]:
+            return GroupMessageEvent
+        elif t in ["C2C_MESSAGE_CREATE"]:
+            return PrivateMessageEvent
+        elif t in ["GUID_UPDATE", "GUILD_CREATE", "GUILD_DELETE"]:
+            return GuildEvent
+        elif t in ["GROUP_ADD_ROBOT", "GROUP_DEL_ROBOT"]:
+            return GroupEvent
+    elif op == 13:
+        return ValidationEvent
+    return MessageEventPayload
+
+
+def route_classify(op, t):
+    """当前实现：单次字典查找"""
+    if op == 0:
+        route = EVENT_ROUTES.get(t)
+        if route is not None:
+            return route.payload_class
+    elif op == 13:
+        return ValidationEvent
+    return MessageEventPayload
+
+
+def legacy_run():
+    for op, raw in EVENTS:
+        t = raw.decode()
+        legacy_classify(op, t)
+        t in ["MESSAGE_CREATE", "AT_MESSAGE_CREATE", "DIRECT_MESSAGE_CREATE", "C2C_MESSAGE_CREATE", "GROUP_AT_MESSAGE_CREATE"]
+
+
+def route_run():
+    for op, raw in EVENTS:
+        t = raw.decode()
+        route = EVENT_ROUTES.get(t) if op == 0 else None
+        payload_class = route.payload_class if route is not None else route_classify(op, t)
+        route is not None and route.is_message
+
+
+def main(number: int = 200000):
+    for op, raw in EVENTS:
+        assert legacy_classify(op, raw.decode()) is route_classify(op, raw.decode()), raw
+    print(f"{'实现':<16}{'总耗时(s)':>12}{'单事件(ns)':>12}")
+    results = {}
+    for name, func in (("if/elif", legacy_run), ("EVENT_ROUTES", route_run)):
+        elapsed = min(timeit.repeat(func, number=number, repeat=5))
+        results[name] = elapsed
+        print(f"{name:<16}{elapsed:>12.4f}{elapsed / number / len(EVENTS) * 1e9:>12.1f}")
+    print(f"加速比: {results['if/elif'] / results['EVENT_ROUTES']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Webhook签名校验基准测试
+
+对比“每次请求重新派生种子并构建SigningKey”的旧流程
+与复用缓存密钥的SignatureVerifier的每秒校验次数
+
+运行方式（在项目根目录下）：
+    python -m benchmarks.bench_signature
+"""
+import binascii, json, time, timeit
+
+from nacl.signing import SigningKey
+
+from src.Utils.Signature import SignatureVerifier
+
+SECRET = "XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX"
+TIMESTAMP = str(int(time.time()))
+BODY = json.dumps({
+    "op": 0,
+    "s": 1,
+    "t": "GROUP_AT_MESSAGE_CREATE",
+    "id": "GROUP_AT_MESSAGE_CREATE:xxxxxxxxxxxxxxxxxxxxxxxx",
+    "d": {
+        "id": "ROBOT1.0_xxxxxxxxxxxxxxxxxxxxxxxx",
+        "content": " /hotlist weibo",
+        "group_openid": "XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX",
+        "author": {"member_openid": "XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX"},
+        "timestamp": "2025-01-01T12:00:00+08:00",
+    },
+}, ensure_ascii=False).encode("utf-8")
+
+verifier = SignatureVerifier(SECRET)
+SIGNATURE = verifier.sign(TIMESTAMP, BODY)
+
+
+def legacy_verify():
+    """旧流程：每次请求都重新派生种子、构建签名器"""
+    seed = SECRET.encode("utf-8")
+    while len(seed) < 32:
+        seed += seed
+    seed = seed[:32]
+    signature = binascii.unhexlify(SIGNATURE.encode("utf-8"))
+    SigningKey(seed).verify_key.verify(TIMESTAMP.encode("utf-8") + BODY, signature)
+
+
+def cached_verify():
+    verifier.verify(SIGNATURE, TIMESTAMP, BODY)
+
+
+def main(number: int = 5000):
+    legacy_verify()
+    cached_verify()
+    print(f"{'实现':<16}{'次/秒':>12}{'单次(us)':>12}")
+    results = {}
+    for name, func in (("legacy", legacy_verify), ("cached", cached_verify)):
+        elapsed = min(timeit.repeat(func, number=number, repeat=5))
+        results[name] = number / elapsed
+        print(f"{name:<16}{results[name]:>12.0f}{elapsed / number * 1e6:>12.2f}")
+    print(f"加速比: {results['cached'] / results['legacy']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""SQLite性能配置档基准测试
+
+在临时目录中为每个配置档（见 src.Utils.ConfigClass.SQLITE_PROFILES）新建消息数据库，分别测量：
+- 逐条插入：每条消息一次 GroupMessage.create（每次一个事务，最能体现synchronous的差别）
+- 批量插入：每200条一次 bulk_create
+- 聚合查询：按群统计消息数，以及按用户统计某个群内的消息数
+
+运行方式（在项目根目录下）：
+    python -m benchmarks.bench_sqlite_profiles
+"""
+import asyncio, os, tempfile, time
+
+from tortoise import Tortoise
+from tortoise.functions import Count
+
+from src.Utils.ConfigClass import SQLITE_PROFILES
+from src.Utils.EventSender import GroupMessage
+
+
+def make_rows(prefix: str, count: int):
+    return [
+        GroupMessage(group_id=f"group{i % 50}", user_id=f"user{i % 500}", message=f"消息内容 {i}", message_id=f"{prefix}{i}")
+        for i in range(count)
+    ]
+
+
+async def run_profile(path: str, pragmas: dict, single: int, bulk: int, queries: int):
+    await Tortoise.init(config={
+        "connections": {"message": {
+            "engine": "tortoise.backends.sqlite",
+            "credentials": {"file_path": path, **pragmas},
+        }},
+        "apps": {"message": {"models": ["src.Utils.EventSender"], "default_connection": "message"}},
+    })
+    await Tortoise.generate_schemas()
+    results = {}
+
+    started = time.perf_counter()
+    for row in make_rows("single", single):
+        await row.save()
+    results["逐条插入(行/秒)"] = single / (time.perf_counter() - started)
+
+    rows = make_rows("bulk", bulk)
+    started = time.perf_counter()
+    for i in range(0, bulk, 200):
+        await GroupMessage.bulk_create(rows[i:i + 200])
+    results["批量插入(行/秒)"] = bulk / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for i in range(queries):
+        await GroupMessage.annotate(count=Count("id")).group_by("group_id").values("group_id", "count")
+        await GroupMessage.filter(group_id=f"group{i % 50}").annotate(count=Count("id")).group_by("user_id").values("user_id", "count")
+    results["聚合查询(次/秒)"] = queries * 2 / (time.perf_counter() - started)
+
+    await Tortoise.close_connections()
+    return results
+
+
+async def main(single: int = 1000, bulk: int = 20000, queries: int = 50):
+    rows = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, pragmas in SQLITE_PROFILES.items():
+            rows[name] = await run_profile(os.path.join(tmp, f"{name}.db"), pragmas, single, bulk, queries)
+    columns = list(next(iter(rows.values())))
+    print(f"{'配置档':<14}" + "".join(f"{column:>18}" for column in columns))
+    for name, results in rows.items():
+        print(f"{name:<14}" + "".join(f"{results[column]:>18.0f}" for column in columns))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
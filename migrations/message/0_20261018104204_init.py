@@ -0,0 +1,75 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "channel_messages" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "timestamp" TIMESTAMP NOT NULL,
+    "channel_id" VARCHAR(255) NOT NULL,
+    "guild_id" VARCHAR(255) NOT NULL,
+    "user_id" VARCHAR(255) NOT NULL,
+    "message" TEXT NOT NULL,
+    "message_id" VARCHAR(255) NOT NULL UNIQUE
+) /* 频道公开消息记录 */;
+CREATE INDEX IF NOT EXISTS "idx_channel_mes_channel_8385d2" ON "channel_messages" ("channel_id");
+CREATE INDEX IF NOT EXISTS "idx_channel_mes_guild_i_9aa33e" ON "channel_messages" ("guild_id");
+CREATE INDEX IF NOT EXISTS "idx_channel_mes_user_id_6caaeb" ON "channel_messages" ("user_id");
+CREATE TABLE IF NOT EXISTS "channel_private_messages" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "timestamp" TIMESTAMP NOT NULL,
+    "channel_id" VARCHAR(255) NOT NULL,
+    "guild_id" VARCHAR(255) NOT NULL,
+    "user_id" VARCHAR(255) NOT NULL,
+    "message" TEXT NOT NULL,
+    "message_id" VARCHAR(255) NOT NULL UNIQUE
+) /* 频道私聊消息记录 */;
+CREATE INDEX IF NOT EXISTS "idx_channel_pri_channel_f1e28b" ON "channel_private_messages" ("channel_id");
+CREATE INDEX IF NOT EXISTS "idx_channel_pri_guild_i_79ebac" ON "channel_private_messages" ("guild_id");
+CREATE INDEX IF NOT EXISTS "idx_channel_pri_user_id_a789e9" ON "channel_private_messages" ("user_id");
+CREATE TABLE IF NOT EXISTS "group_messages" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "timestamp" TIMESTAMP NOT NULL,
+    "group_id" VARCHAR(255) NOT NULL,
+    "user_id" VARCHAR(255) NOT NULL,
+    "message" TEXT NOT NULL,
+    "message_id" VARCHAR(255) NOT NULL UNIQUE
+) /* 群消息记录 */;
+CREATE INDEX IF NOT EXISTS "idx_group_messa_group_i_63bd53" ON "group_messages" ("group_id");
+CREATE INDEX IF NOT EXISTS "idx_group_messa_user_id_8aeee5" ON "group_messages" ("user_id");
+CREATE TABLE IF NOT EXISTS "message_rollup_daily" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "bucket" INT NOT NULL,
+    "direction" VARCHAR(8) NOT NULL,
+    "kind" VARCHAR(16) NOT NULL,
+    "target" VARCHAR(255) NOT NULL,
+    "count" INT NOT NULL DEFAULT 0,
+    CONSTRAINT "uid_message_rol_bucket_be4ce9" UNIQUE ("bucket", "direction", "kind", "target")
+) /* 每天收发消息数汇总 */;
+CREATE TABLE IF NOT EXISTS "message_rollup_hourly" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "bucket" INT NOT NULL,
+    "direction" VARCHAR(8) NOT NULL,
+    "kind" VARCHAR(16) NOT NULL,
+    "target" VARCHAR(255) NOT NULL,
+    "count" INT NOT NULL DEFAULT 0,
+    CONSTRAINT "uid_message_rol_bucket_fea9e5" UNIQUE ("bucket", "direction", "kind", "target")
+) /* 每小时收发消息数汇总 */;
+CREATE TABLE IF NOT EXISTS "rollup_state" (
+    "name" VARCHAR(64) NOT NULL PRIMARY KEY,
+    "upto_id" INT NOT NULL DEFAULT 0,
+    "done_id" INT NOT NULL DEFAULT 0
+) /* 汇总表的历史数据回填进度 */;
+CREATE TABLE IF NOT EXISTS "user_messages" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "timestamp" TIMESTAMP NOT NULL,
+    "user_id" VARCHAR(255) NOT NULL,
+    "message" TEXT NOT NULL,
+    "message_id" VARCHAR(255) NOT NULL UNIQUE
+) /* 用户私聊消息记录 */;
+CREATE INDEX IF NOT EXISTS "idx_user_messag_user_id_0a67f5" ON "user_messages" ("user_id");"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        """
@@ -0,0 +1,17 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE INDEX IF NOT EXISTS "idx_channel_messages_timestamp_channel_id" ON "channel_messages" ("timestamp", "channel_id");
+        CREATE INDEX IF NOT EXISTS "idx_channel_private_messages_timestamp_guild_id" ON "channel_private_messages" ("timestamp", "guild_id");
+        CREATE INDEX IF NOT EXISTS "idx_group_messages_timestamp_group_id" ON "group_messages" ("timestamp", "group_id");
+        CREATE INDEX IF NOT EXISTS "idx_user_messages_timestamp_user_id" ON "user_messages" ("timestamp", "user_id");"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP INDEX IF EXISTS "idx_user_messages_timestamp_user_id";
+        DROP INDEX IF EXISTS "idx_group_messages_timestamp_group_id";
+        DROP INDEX IF EXISTS "idx_channel_private_messages_timestamp_guild_id";
+        DROP INDEX IF EXISTS "idx_channel_messages_timestamp_channel_id";"""
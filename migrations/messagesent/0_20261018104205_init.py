@@ -0,0 +1,52 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE TABLE IF NOT EXISTS "sent_channel_messages" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "timestamp" TIMESTAMP NOT NULL,
+    "channel_id" VARCHAR(255) NOT NULL,
+    "guild_id" VARCHAR(255) NOT NULL,
+    "message" TEXT NOT NULL,
+    "message_id" VARCHAR(200),
+    "status" VARCHAR(20) NOT NULL DEFAULT 'pending',
+    "error_info" TEXT
+) /* 发送的频道公开消息记录 */;
+CREATE INDEX IF NOT EXISTS "idx_sent_channe_channel_294f1a" ON "sent_channel_messages" ("channel_id");
+CREATE INDEX IF NOT EXISTS "idx_sent_channe_guild_i_fb7eb1" ON "sent_channel_messages" ("guild_id");
+CREATE TABLE IF NOT EXISTS "sent_channel_private_messages" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "timestamp" TIMESTAMP NOT NULL,
+    "guild_id" VARCHAR(255) NOT NULL,
+    "message" TEXT NOT NULL,
+    "message_id" VARCHAR(200),
+    "status" VARCHAR(20) NOT NULL DEFAULT 'pending',
+    "error_info" TEXT
+) /* 发送的频道私聊消息记录 */;
+CREATE INDEX IF NOT EXISTS "idx_sent_channe_guild_i_319019" ON "sent_channel_private_messages" ("guild_id");
+CREATE TABLE IF NOT EXISTS "sent_group_messages" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "timestamp" TIMESTAMP NOT NULL,
+    "group_id" VARCHAR(255) NOT NULL,
+    "message" TEXT NOT NULL,
+    "message_id" VARCHAR(200),
+    "status" VARCHAR(20) NOT NULL DEFAULT 'pending',
+    "error_info" TEXT
+) /* 发送的群消息记录 */;
+CREATE INDEX IF NOT EXISTS "idx_sent_group__group_i_b7c8be" ON "sent_group_messages" ("group_id");
+CREATE TABLE IF NOT EXISTS "sent_user_messages" (
+    "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+    "timestamp" TIMESTAMP NOT NULL,
+    "user_id" VARCHAR(255) NOT NULL,
+    "message" TEXT NOT NULL,
+    "message_id" VARCHAR(200),
+    "status" VARCHAR(20) NOT NULL DEFAULT 'pending',
+    "error_info" TEXT
+) /* 发送的用户私聊消息记录 */;
+CREATE INDEX IF NOT EXISTS "idx_sent_user_m_user_id_ec94b9" ON "sent_user_messages" ("user_id");"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        """
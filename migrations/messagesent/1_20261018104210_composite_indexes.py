@@ -0,0 +1,25 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        CREATE INDEX IF NOT EXISTS "idx_sent_channel_messages_timestamp_channel_id" ON "sent_channel_messages" ("timestamp", "channel_id");
+        CREATE INDEX IF NOT EXISTS "idx_sent_channel_messages_status_timestamp" ON "sent_channel_messages" ("status", "timestamp");
+        CREATE INDEX IF NOT EXISTS "idx_sent_channel_private_messages_timestamp_guild_id" ON "sent_channel_private_messages" ("timestamp", "guild_id");
+        CREATE INDEX IF NOT EXISTS "idx_sent_channel_private_messages_status_timestamp" ON "sent_channel_private_messages" ("status", "timestamp");
+        CREATE INDEX IF NOT EXISTS "idx_sent_group_messages_status_timestamp" ON "sent_group_messages" ("status", "timestamp");
+        CREATE INDEX IF NOT EXISTS "idx_sent_group_messages_timestamp_group_id" ON "sent_group_messages" ("timestamp", "group_id");
+        CREATE INDEX IF NOT EXISTS "idx_sent_user_messages_status_timestamp" ON "sent_user_messages" ("status", "timestamp");
+        CREATE INDEX IF NOT EXISTS "idx_sent_user_messages_timestamp_user_id" ON "sent_user_messages" ("timestamp", "user_id");"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP INDEX IF EXISTS "idx_sent_user_messages_timestamp_user_id";
+        DROP INDEX IF EXISTS "idx_sent_user_messages_status_timestamp";
+        DROP INDEX IF EXISTS "idx_sent_group_messages_timestamp_group_id";
+        DROP INDEX IF EXISTS "idx_sent_group_messages_status_timestamp";
+        DROP INDEX IF EXISTS "idx_sent_channel_private_messages_status_timestamp";
+        DROP INDEX IF EXISTS "idx_sent_channel_private_messages_timestamp_guild_id";
+        DROP INDEX IF EXISTS "idx_sent_channel_messages_status_timestamp";
+        DROP INDEX IF EXISTS "idx_sent_channel_messages_timestamp_channel_id";"""
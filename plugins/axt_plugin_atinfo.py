@@ -3,7 +3,7 @@ from datetime import datetime
 
 from src.Utils.PluginBase import command
 from src.Utils.EventClass import GroupMessageEvent
-from src.Utils.MessageState import AppState, MessageStatistics
+from src.Utils.MessageState import AppState, message_counters
 
 __metadata__ = {
     "name": "[官方插件]获取框架信息",
@@ -17,8 +17,7 @@ __metadata__ = {
 @command(["atinfo", "/atinfo"])
 async def get_message(event: GroupMessageEvent):
     start_time = AppState.get_start_time()
-    stats_service = MessageStatistics(start_time)
-    stats = await stats_service.get_stats()
+    stats = message_counters.get_stats()
     elapsed_time = datetime.now() - start_time
     days = elapsed_time.days
     hours, remainder = divmod(elapsed_time.seconds, 3600)
@@ -1,7 +1,7 @@
 from src.Utils.PluginBase import command
 from src.Utils.EventClass import MessageEventPayload
 
-from uapis_extension import format_hot_search, get_from_api
+from uapis_extension.hotboard import HOT_TYPES, hotboard
 
 __metadata__ = {
     "name": "[官方插件]获取今日热榜",
@@ -11,58 +11,35 @@ __metadata__ = {
     "official": True,
 }
 
-@command(["hotlist", "/hotlist"])
+MENU = "=======每日热榜菜单=======" + "\n" + \
+       "/hotlist [热榜类型] - 查询指定热榜信息" + "\n" + \
+       "可选的热榜类型有:" + "\n" + \
+       "- acfun | AcFun热搜榜" + "\n" + \
+       "- weibo | 微博热搜榜" + "\n" + \
+       "- bilibili | 哔哩哔哩全站日榜" + "\n" + \
+       "- zhihu | 知乎热搜榜" + "\n" + \
+       "- douyin | 抖音热搜榜" + "\n" + \
+       "==========================" + "\n" + \
+       "使用示例: /hotlist weibo" + "\n" + \
+       "注:如果指令发送后无返回且无获取错误信息，视为热榜内含有违规信息，被QQ消息审核拦截" + "\n" + \
+       "=========================="
+
+def initialize():
+    hotboard.start()
+
+def shutdown():
+    hotboard.stop()
+
+@command(["hotlist", "/hotlist"], args=["type"])
 async def hotlist_handler(event: MessageEventPayload):
-    content =   "=======每日热榜菜单=======" + "\n" + \
-                "/hotlist [热榜类型] - 查询指定热榜信息" + "\n" + \
-                "可选的热榜类型有:" + "\n" + \
-                "- acfun | AcFun热搜榜" + "\n" + \
-                "- weibo | 微博热搜榜" + "\n" + \
-                "- bilibili | 哔哩哔哩全站日榜" + "\n" + \
-                "- zhihu | 知乎热搜榜" + "\n" + \
-                "- douyin | 抖音热搜榜" + "\n" + \
-                "==========================" + "\n" + \
-                "使用示例: /hotlist weibo" + "\n" + \
-                "注:如果指令发送后无返回且无获取错误信息，视为热榜内含有违规信息，被QQ消息审核拦截" + "\n" + \
-                "=========================="
-    if event.content.startswith(("/hotlist ","hotlist ")) and event.content.split(" ")[1]:
-        hot_list = None
-        hot_type = None
-        msg = event.content
-        async def get_hot_list(hot_type: str) -> dict:
-            returns = await get_from_api(f"/api/v1/misc/hotboard?type={hot_type}")
-            return returns
-        if msg.split(" ")[1] == "bilibili":
-            hot_list = await get_hot_list("bilibili")
-            hot_type = "B站-日榜"
-        elif msg.split(" ")[1] == "acfun":
-            hot_list = await get_hot_list("acfun")
-            hot_type = "A站-热搜榜"
-        elif msg.split(" ")[1] == "weibo":
-            hot_list = await get_hot_list("weibo")
-            hot_type = "微博-热搜榜"
-        elif msg.split(" ")[1] == "zhihu":
-            hot_list = await get_hot_list("zhihu")
-            hot_type = "知乎-热搜榜"
-        elif msg.split(" ")[1] == "douyin":
-            hot_list = await get_hot_list("douyin")
-            hot_type = "抖音-热搜榜"
-        else:
+    if event.args.type:
+        if event.args.type not in HOT_TYPES:
             await event.reply('请指定热榜类型')
             return
-
-        if hot_list is None:
+        content = await hotboard.get(event.args.type)
+        if content is None:
             await event.reply('未查询到该热搜信息')
             return
-        else:
-            content = "===" + hot_type + "===" + "\n" + \
-                    format_hot_search(hot_list) + "\n" + \
-                    "=============" + "\n" + \
-                    hot_list["update_time"] + "\n" + \
-                    "============="
         await event.reply(content)
     else:
-        await event.reply(content)
-
-
-
+        await event.reply(MENU)
@@ -11,10 +11,10 @@ __metadata__ = {
     "official": True,
 }
 
-@command(["ipinfo", "/ipinfo"])
+@command(["ipinfo", "/ipinfo"], args=["ip"])
 async def ipinfo_handler(event: MessageEventPayload):
-    if event.content.split(" ")[1]:
-        host = event.content.split(" ")[1]
+    host = event.args.ip
+    if host:
         info = await get_from_api(f"api/v1/network/ipinfo?ip={host}")
         if info is None:
             await event.reply('未查询到该IP信息')
@@ -9,6 +9,8 @@ from uapis_extension import (
     get_minecraft_info,
     get_hypixel_info,
 )
+from uapis_extension.minecraft_uuid import minecraft_uuids
+from uapis_extension.mojang_status import mojang_status
 
 
 __metadata__ = {
@@ -19,9 +21,23 @@ __metadata__ = {
     "official": True,
 }
 
-@command(["/mc", "mc", "/mchead", "mchead", "/mcskin", "mcskin", "/mcbody", "mcbody"])
+def initialize():
+    mojang_status.start()
+
+def shutdown():
+    mojang_status.stop()
+    minecraft_uuids.close()
+
+MC_IMAGE_TYPES = {
+    "mchead": "avatars/",
+    "mcbody": "renders/body/",
+    "mcskin": "skins/",
+}
+
+@command(["/mc", "mc", "/mchead", "mchead", "/mcskin", "mcskin", "/mcbody", "mcbody"], args=["player"])
 async def mc_handler(event: GroupMessageEvent):
-    if event.content in ["/mc", "/mc ", "mc", "mc ", "/mchead ", "/mchead", "mchead ", "mchead", "/mcskin ", "/mcskin", "mcskin ","mcskin", "/mcbody ", "/mcbody", "mcbody ", "mcbody"]:
+    player_name = event.args.player
+    if not player_name:
         content = "======Minecraft查询菜单======" + "\n" + \
                    "/mc [ID] - 查询玩家UUID及历史用户名" + "\n" + \
                    "/mcskin [ID] - 查询玩家皮肤" + "\n" + \
@@ -31,64 +47,50 @@ async def mc_handler(event: GroupMessageEvent):
                    "[ID]为玩家用户名" + "\n" + \
                    "=========================="
         await event.reply(content=content)
-    else:
-        msg = event.content
-        if msg.startswith(("/mc ","mc ")) and len(msg.split(" ")) > 1:
-            player_name = msg.split(" ")[1]
-            uuid = await get_minecraft_uuid(player_name)
-            if uuid is None:
-                await event.reply(content="未查询到该玩家的信息")
-                return
-            try:
-                history_info = await get_player_history(uuid)
-                if history_info is not None:
-                    formatted_history = history_info
-                else:
-                    formatted_history = "未查询到当前玩家的历史用户名信息"
-            except Exception:
+        return
+
+    uuid = await get_minecraft_uuid(player_name)
+    if uuid is None:
+        await event.reply(content="未查询到该玩家的信息")
+        return
+
+    if event.command == "mc":
+        try:
+            history_info = await get_player_history(uuid)
+            if history_info is not None:
+                formatted_history = history_info
+            else:
                 formatted_history = "未查询到当前玩家的历史用户名信息"
-            contents = f"===Minecraft玩家查询===\n| 玩家名: {player_name}\n| UUID: {uuid}\n===历史用户名===\n{formatted_history}"
-            await event.reply(content=contents)
+        except Exception:
+            formatted_history = "未查询到当前玩家的历史用户名信息"
+        contents = f"===Minecraft玩家查询===\n| 玩家名: {player_name}\n| UUID: {uuid}\n===历史用户名===\n{formatted_history}"
+        await event.reply(content=contents)
+        return
 
-        async def post_minecraft_image(avatar_type, content):
-            player_name = msg.split(" ")[1]
-            uuid = await get_minecraft_uuid(player_name)
-            if uuid is None:
-                await event.reply(content="未查询到该玩家的信息")
-                return
-            image_url = f"https://crafatar.com/{avatar_type}{uuid}"
-            response = await upload_file(
-                MediaUploadPayload(file_type=1, url=image_url, event=event)
-            )
-            if response:
-                await event.reply(content=
+    image_url = f"https://crafatar.com/{MC_IMAGE_TYPES[event.command]}{uuid}"
+    response = await upload_file(
+        MediaUploadPayload(file_type=1, url=image_url, event=event)
+    )
+    if response:
+        await event.reply(content=
     """请注意：您使用本功能即默认当前玩家贴图无任何不良信息，并允许当前机器人主体进行消息审查。
 一切由于贴图存在不良信息导致机器人不可用的行为将受到管控和二次审查，严重者将上报腾讯""", media=response)
-            else:
-                if event.event_type in ["频道私信", "频道艾特", "私域频道"]:
-                    await event.reply(content="上传失败，频道-文字子频道和频道私聊不支持富媒体，请转到群/私聊请求")
-                else:
-                    await event.reply(content="获取贴图失败，富媒体文件上传超时")
-
-        if msg.startswith(("/mchead ","mchead ")) and len(msg.split(" ")) > 1:
-            await post_minecraft_image("avatars/", "未查询到该玩家的信息")
-
-        if msg.startswith(("/mcbody ","mcbody ")) and len(msg.split(" ")) > 1:
-            await post_minecraft_image("renders/body/", "未查询到该玩家的信息")
-
-        if msg.startswith(("/mcskin ","mcskin ")) and len(msg.split(" ")) > 1:
-            await post_minecraft_image("skins/", "未查询到该玩家的信息")
+    else:
+        if event.event_type in ["频道私信", "频道艾特", "私域频道"]:
+            await event.reply(content="上传失败，频道-文字子频道和频道私聊不支持富媒体，请转到群/私聊请求")
+        else:
+            await event.reply(content="获取贴图失败，富媒体文件上传超时")
 
 
 @command(["/mcstatus", "mcstatus"])
 async def mcstatus_handler(event: GroupMessageEvent):
-    if event.content in ['/mcstatus','/mcstatus ', 'mcstatus', 'mcstatus ']:
+    if not event.args:
         result = await check_minecraft_online()
         await event.reply(content=result)
 
-@command(["/mcping","mcping"])
+@command(["/mcping","mcping"], args=["address", "type"])
 async def mcping_handler(event: GroupMessageEvent):
-    if event.content in ["/mcping","/mcping ","mcping","mcping "]:
+    if not event.args.address:
         content = "=======服务器查询菜单=======" + "\n" + \
                    "/mcping [IP]:[端口] [服务器类型] - 请求该服务器信息" + "\n" + \
                    "可选的服务器类型有:" + "\n" + \
@@ -100,12 +102,9 @@ async def mcping_handler(event: GroupMessageEvent):
                    "=========================="
         await event.reply(content=content)
     else:
-        msg = event.content
-        if msg.startswith(("/mcping ","mcping ")):
-            msg = msg.split(" ")[1]
-            await event.reply(content=await get_minecraft_info(msg))
+        await event.reply(content=await get_minecraft_info(event.args.address, event.args.type))
 
-@command(['hyp','/hyp'])
+@command(['hyp','/hyp'], max_concurrency=5, timeout=15)
 async def hyp_handler(event: GroupMessageEvent):
     content=await get_hypixel_info(event.content, event.msg_id)
     await event.reply(content=content)
@@ -1,5 +1,3 @@
-import re
-
 from src.Utils.PluginBase import command
 from src.Utils.EventClass import GroupMessageEvent, MediaUploadPayload
 from src.Utils.MessageSender import upload_file
@@ -15,9 +13,9 @@ __metadata__ = {
 }
 
 
-@command(["摸", "/摸"])
+@command(["摸", "/摸"], args=["qq:int"])
 async def touch_handler(event: GroupMessageEvent):
-    if event.content in ['摸','/摸','/摸 ','摸 ']:
+    if event.args.qq is None:
         content = "\n=======摸一摸菜单=======" + "\n" + \
                    "/摸 [QQ号/图片] - 生成摸一摸GIF" + "\n" + \
                    "==========================" + "\n" + \
@@ -27,22 +25,11 @@ async def touch_handler(event: GroupMessageEvent):
                    "=========================="
         await event.reply(content=content)
     else:
-        match = re.match(r"(?:/)?摸\s*(\d+)", event.content)
-        if match:
-            payload = MediaUploadPayload(file_type=1, event=event)
-            try:
-                contents = match.group(1)
-            except ValueError:
-                await event.reply(content="输入值有误，请输入QQ号或添加图片。")
-                return
-            try:
-                int(contents)
-                payload.url = f"{apiconfig.url}api/v1/image/motou?qq={contents}"
-            except ValueError:
-                payload.url = event.attachments[0].get("url")
-            result = await upload_file(payload)
-            if result:
-                await event.reply(content=" ", media=result)
-            else:
-                contents = f"获取失败。\n请检查您的QQ号、UnionOpenID是否正确，或重新发起命令。若多次出现该问题，请提交至AxT社区"
-                await event.reply(content=contents)
+        payload = MediaUploadPayload(file_type=1, event=event)
+        payload.url = f"{apiconfig.url}api/v1/image/motou?qq={event.args.qq}"
+        result = await upload_file(payload)
+        if result:
+            await event.reply(content=" ", media=result)
+        else:
+            contents = f"获取失败。\n请检查您的QQ号、UnionOpenID是否正确，或重新发起命令。若多次出现该问题，请提交至AxT社区"
+            await event.reply(content=contents)
@@ -12,9 +12,9 @@ __metaresult__ = {
 }
 
 
-@command(["steam", "/steam"])
+@command(["steam", "/steam"], args=["steamid"])
 async def ping_handler(event: MessageEventPayload):
-    if event.content in ['/steam', '/steam ', 'steam', 'steam ']:
+    if not event.args.steamid:
         content = "=======Steam账户查询=======" + "\n" + \
                    "/steam [昵称/ID] - 查询指定Steam账户信息" + "\n" + \
                    "=======================" + "\n" + \
@@ -24,17 +24,13 @@ async def ping_handler(event: MessageEventPayload):
                    "======================="
         await event.reply(content=content)
     else:
-        msg = event.content
-        if msg.startswith(("/steam ","steam ")):
-            result = await get_steamid_info(msg)
-            if result:
-                await event.reply(content=result)
-                return
+        result = await get_steamid_info(event.args.steamid)
+        if result:
+            await event.reply(content=result)
+            return
 
 
 async def get_steamid_info(steamid):
-    split_str = steamid.split(" ")
-    steamid = split_str[1]  # 获取分割后的第二个子字符串
     result = await get_from_api(f"/api/v1/game/steam/summary?steamid={steamid}")
     if result:
         communitystate = result.get("communityvisibilitystate") if result.get("communityvisibilitystate") != 'N/A' else "未知"
@@ -1,7 +1,7 @@
 from src.Utils.PluginBase import command
 from src.Utils.Logger import logger
 from src.Utils.EventClass import GroupMessageEvent
-from src.Utils.MessageState import AppState, MessageStatistics
+from src.Utils.MessageState import message_counters
 
 __metadata__ = {
     "name": "测试-消息获取、检索插件",
@@ -14,11 +14,7 @@ __metadata__ = {
 @command("get_message_1")
 async def get_message(event: GroupMessageEvent) -> str:
 
-    # 初始化统计服务
-    start_time = AppState.get_start_time()
-    stats_service = MessageStatistics(start_time)
-    
-    stats = await stats_service.get_stats()
+    stats = message_counters.get_stats()
 
     logger.info("本次启动后消息统计:")
     logger.info(f"群聊消息: 接收 {stats['received']['group']['total']} 条 | 发送 {stats['sent']['group']['total']} 条")
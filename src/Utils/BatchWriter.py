@@ -0,0 +1,301 @@
+import asyncio, json, os, time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from tortoise.exceptions import IntegrityError, ValidationError
+from tortoise.models import Model
+from tortoise.transactions import in_transaction
+
+from src.Utils.Logger import logger
+
+
+class BatchWriter:
+    """批量写入器（write-behind）
+
+    调用方通过add()把记录放入内存缓冲区后立即返回，后台协程每隔flush_interval秒
+    或缓冲区达到max_batch条时，在同一个事务中对每种记录各执行一次bulk_create，
+    调用方的耗时不再受SQLite落盘影响。
+
+    缓冲区最多保存max_buffer条记录，写满后按overflow处理新记录：
+    - "spill": 追加写入磁盘上的溢出文件，下次启动时读回并写入数据库
+    - "drop": 直接丢弃并计数
+
+    批次写入失败时：
+    - 数据错误（如非空字段为None、违反约束）：二分拆分后重试，只有单独写入仍失败的记录
+      写入死信文件dead_letter_path，其余记录正常写入；死信文件不会在启动时读回
+    - 其他错误（如数据库被锁、磁盘已满）：整批按overflow处理，不会反复重试阻塞后续写入
+
+    指定unique_field时，同一批次内该字段重复的记录只保留第一条，
+    并以 INSERT OR IGNORE 写入，与数据库中已有记录冲突的行被直接跳过
+    """
+
+    def __init__(
+        self,
+        name: str,
+        connection: str,
+        models: Dict[str, Type[Model]],
+        flush_interval: float = 0.5,
+        max_batch: int = 200,
+        max_buffer: int = 10000,
+        overflow: str = "spill",
+        spill_path: Optional[str] = None,
+        dead_letter_path: Optional[str] = None,
+        unique_field: Optional[str] = None,
+    ):
+        """
+        :param name: 写入器名称（用于日志）
+        :param connection: Tortoise连接名，每次刷新在该连接上开启一个事务
+        :param models: 记录类型 -> 模型类
+        :param dead_letter_path: 死信文件路径，为None时无法写入的记录直接丢弃
+        :param unique_field: 唯一字段名（如message_id），用于批内去重并忽略与已有记录的冲突
+        """
+        self.name = name
+        self.connection = connection
+        self.models = models
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_buffer = max_buffer
+        self.overflow = overflow
+        self.spill_path = spill_path if overflow == "spill" else None
+        self.dead_letter_path = dead_letter_path
+        self.unique_field = unique_field
+        self._started_at = time.monotonic()
+        self._buffer: List[Tuple[str, Dict[str, Any]]] = []
+        self._full: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._stats = {
+            "added": 0,
+            "written": 0,
+            "flushes": 0,
+            "failed_flushes": 0,
+            "spilled": 0,
+            "dropped": 0,
+            "recovered": 0,
+            "dead_lettered": 0,
+            "deduplicated": 0,
+            "flush_time_total": 0.0,
+            "flush_time_max": 0.0,
+        }
+
+    def add(self, kind: str, **fields) -> bool:
+        """放入一条记录
+
+        :param kind: 记录类型（models中的键）
+        :return: 是否放入了缓冲区（溢出到磁盘或被丢弃时返回False）
+        """
+        if kind not in self.models:
+            raise ValueError(f"无效的记录类型: {kind}")
+        self._stats["added"] += 1
+        if len(self._buffer) >= self.max_buffer:
+            self._overflow([(kind, fields)])
+            return False
+        self._buffer.append((kind, fields))
+        if len(self._buffer) >= self.max_batch and self._full is not None:
+            self._full.set()
+        return True
+
+    def start(self):
+        """读回溢出文件并启动后台刷新协程（需在事件循环中调用）"""
+        if self._task is not None:
+            return
+        self._full = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._started_at = time.monotonic()
+        self._recover()
+        self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """停止后台刷新协程，并写入缓冲区中剩余的记录"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        while self._buffer:
+            if not await self.flush():
+                break
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+            while self._buffer:
+                await self.flush()
+                if len(self._buffer) < self.max_batch:
+                    break
+
+    async def flush(self) -> bool:
+        """写入缓冲区中最早的max_batch条记录
+
+        :return: 是否写入成功（数据错误的记录写入死信文件后，其余记录写入成功时同样返回True）
+        """
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            batch = self._buffer[:self.max_batch]
+            if not batch:
+                return True
+            del self._buffer[:len(batch)]
+            batch = self._deduplicate(batch)
+            started = time.perf_counter()
+            try:
+                rows = await self._write(batch)
+            except Exception as e:
+                self._stats["failed_flushes"] += 1
+                if not _is_data_error(e):
+                    logger.error(f"{self.name} >>> 批量写入 {len(batch)} 条记录失败: {e}")
+                    self._overflow(batch)
+                    return False
+                logger.error(f"{self.name} >>> 批量写入 {len(batch)} 条记录失败，正在拆分重试: {e}")
+                failed: List[Tuple[str, Dict[str, Any]]] = []
+                rows = await self._write_isolated(batch, e, failed)
+                if failed:
+                    self._overflow(failed)
+                    return False
+            elapsed = time.perf_counter() - started
+            self._stats["flushes"] += 1
+            self._stats["written"] += rows
+            self._stats["flush_time_total"] += elapsed
+            if elapsed > self._stats["flush_time_max"]:
+                self._stats["flush_time_max"] = elapsed
+            return True
+
+    def _deduplicate(self, batch: List[Tuple[str, Dict[str, Any]]]) -> List[Tuple[str, Dict[str, Any]]]:
+        """去掉批次内unique_field重复的记录（只保留第一条）"""
+        unique_field = self.unique_field
+        if unique_field is None:
+            return batch
+        seen = set()
+        result = []
+        for kind, fields in batch:
+            key = (kind, fields.get(unique_field))
+            if key in seen:
+                self._stats["deduplicated"] += 1
+                continue
+            seen.add(key)
+            result.append((kind, fields))
+        return result
+
+    async def _write(self, batch: List[Tuple[str, Dict[str, Any]]]) -> int:
+        grouped: Dict[str, List[Model]] = {}
+        for kind, fields in batch:
+            grouped.setdefault(kind, []).append(self.models[kind](**fields))
+        async with in_transaction(self.connection) as conn:
+            for kind, objects in grouped.items():
+                await self.models[kind].bulk_create(
+                    objects, ignore_conflicts=self.unique_field is not None, using_db=conn
+                )
+        return len(batch)
+
+    async def _write_isolated(
+        self, batch: List[Tuple[str, Dict[str, Any]]], error: Exception, failed: List[Tuple[str, Dict[str, Any]]]
+    ) -> int:
+        """把因数据错误写入失败的批次拆成两半分别重试，直到找出无法写入的单条记录
+
+        无法写入的记录写入死信文件；拆分过程中遇到其他错误时，该部分记录放入failed，由调用方按overflow处理
+
+        :param error: 写入整个batch时的异常
+        :return: 写入成功的记录数
+        """
+        if len(batch) == 1:
+            self._dead_letter(batch[0], error)
+            return 0
+        middle = len(batch) // 2
+        rows = 0
+        for part in (batch[:middle], batch[middle:]):
+            try:
+                rows += await self._write(part)
+            except Exception as e:
+                if _is_data_error(e):
+                    rows += await self._write_isolated(part, e, failed)
+                else:
+                    failed.extend(part)
+        return rows
+
+    def _dead_letter(self, record: Tuple[str, Dict[str, Any]], error: Exception):
+        kind, fields = record
+        self._stats["dead_lettered"] += 1
+        logger.error(f"{self.name} >>> 记录无法写入数据库，已移入死信文件: {error} | {kind} {fields}")
+        if not self.dead_letter_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.dead_letter_path) or ".", exist_ok=True)
+            with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(
+                    {"kind": kind, "fields": fields, "error": str(error)}, ensure_ascii=False, default=_encode
+                ) + "\n")
+        except OSError as e:
+            logger.error(f"{self.name} >>> 写入死信文件失败: {e}")
+
+    def _overflow(self, records: List[Tuple[str, Dict[str, Any]]]):
+        if not self.spill_path:
+            self._stats["dropped"] += len(records)
+            logger.warning(f"{self.name} >>> 缓冲区已满或写入失败，已丢弃 {len(records)} 条记录")
+            return
+        try:
+            os.makedirs(os.path.dirname(self.spill_path) or ".", exist_ok=True)
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                for kind, fields in records:
+                    f.write(json.dumps({"kind": kind, "fields": fields}, ensure_ascii=False, default=_encode) + "\n")
+            self._stats["spilled"] += len(records)
+        except OSError as e:
+            self._stats["dropped"] += len(records)
+            logger.error(f"{self.name} >>> 写入溢出文件失败，已丢弃 {len(records)} 条记录: {e}")
+
+    def _recover(self):
+        """读回溢出文件中的记录并放入缓冲区"""
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return
+        recovered = []
+        try:
+            with open(self.spill_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        item = json.loads(line, object_hook=_decode)
+                    except ValueError:
+                        continue
+                    if item.get("kind") in self.models:
+                        recovered.append((item["kind"], item["fields"]))
+            os.remove(self.spill_path)
+        except OSError as e:
+            logger.error(f"{self.name} >>> 读取溢出文件失败: {e}")
+            return
+        self._buffer[:0] = recovered
+        self._stats["recovered"] += len(recovered)
+        if recovered:
+            logger.info(f"{self.name} >>> 已从溢出文件恢复 {len(recovered)} 条记录")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取批量写入统计信息"""
+        stats = dict(self._stats)
+        flush_time_total = stats.pop("flush_time_total")
+        uptime = time.monotonic() - self._started_at
+        stats.update({
+            "buffered": len(self._buffer),
+            "max_buffer": self.max_buffer,
+            "rows_per_sec": round(stats["written"] / uptime, 3) if uptime > 0 else 0.0,
+            "flush_rows_per_sec": round(stats["written"] / flush_time_total, 1) if flush_time_total else 0.0,
+            "avg_flush_ms": round(flush_time_total / stats["flushes"] * 1000, 3) if stats["flushes"] else 0.0,
+            "max_flush_ms": round(stats.pop("flush_time_max") * 1000, 3),
+        })
+        return stats
+
+
+def _is_data_error(error: Exception) -> bool:
+    """是否为记录本身的数据错误（重试同一条记录仍会失败）"""
+    return isinstance(error, (ValidationError, IntegrityError, TypeError, ValueError))
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return {"$datetime": value.isoformat()}
+    raise TypeError(f"无法序列化的类型: {type(value).__name__}")
+
+
+def _decode(obj):
+    if len(obj) == 1 and "$datetime" in obj:
+        return datetime.fromisoformat(obj["$datetime"])
+    return obj
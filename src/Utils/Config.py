@@ -20,4 +20,8 @@ if _config.Advanced.debug:
 else:
     _config.Logger.level = _config.Logger.level
 
-config = _config
\ No newline at end of file
+config = _config
+
+
+# 供aerich读取的Tortoise ORM配置（pyproject.toml 中 [tool.aerich] 的 tortoise_orm）
+TORTOISE_ORM = config.Database.TORTOISE_ORM
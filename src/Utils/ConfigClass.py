@@ -52,8 +52,255 @@ class AdvancedConfig(BaseModel):
             raise ValueError("配置项错误：Debug模式必须是布尔值")
         return v
 
+class DispatchConfig(BaseModel):
+    """事件分发配置"""
+    queue_size: int = 1000
+    lanes: int = 8
+    full_policy: str = "drop_oldest"
+    spill_path: str = "data/dispatch_spill.jsonl"
+
+    @field_validator('queue_size', 'lanes')
+    def validate_positive(cls, v):
+        if v < 1:
+            raise ValueError("配置项错误：事件队列长度与执行通道数量必须大于0")
+        return v
+
+    @field_validator('full_policy')
+    def validate_full_policy(cls, v):
+        if v not in ["drop_oldest", "reject", "spill"]:
+            raise ValueError("配置项错误：队列满载策略必须是drop_oldest, reject或spill")
+        return v
+
+class StatisticsConfig(BaseModel):
+    """消息统计配置"""
+    snapshot_path: str = "data/message_stats.json"
+    snapshot_interval: int = 60
+
+    @field_validator('snapshot_interval')
+    def validate_interval(cls, v):
+        if v < 1:
+            raise ValueError("配置项错误：统计快照间隔必须大于0")
+        return v
+
+class RetentionConfig(BaseModel):
+    """消息记录保留期配置"""
+    enable: bool = False
+    default_days: int = 0
+    tables: dict = {}
+    archive: bool = True
+    archive_dir: str = "data/archive"
+    interval: int = 3600
+    batch_size: int = 500
+    batch_pause: float = 0.05
+    vacuum_pages: int = 1000
+
+    @field_validator('default_days', 'vacuum_pages')
+    def validate_non_negative(cls, v):
+        if v < 0:
+            raise ValueError("配置项错误：保留天数与每次归还的页数不能小于0")
+        return v
+
+    @field_validator('interval', 'batch_size')
+    def validate_positive(cls, v):
+        if v < 1:
+            raise ValueError("配置项错误：归档间隔与每批处理条数必须大于0")
+        return v
+
+    @field_validator('tables')
+    def validate_tables(cls, v):
+        for table, days in v.items():
+            if not isinstance(days, int) or days < 0:
+                raise ValueError(f"配置项错误：表 {table} 的保留天数须为不小于0的整数")
+        return v
+
+class RollupConfig(BaseModel):
+    """消息汇总配置"""
+    enable: bool = True
+    flush_interval: int = 10
+    backfill_chunk: int = 5000
+    max_range_days: int = 366
+
+    @field_validator('flush_interval', 'backfill_chunk', 'max_range_days')
+    def validate_positive(cls, v):
+        if v < 1:
+            raise ValueError("配置项错误：汇总写入间隔、回填分块大小与最大查询范围必须大于0")
+        return v
+
+class BatchWriteConfig(BaseModel):
+    """数据库批量写入配置"""
+    flush_interval: float = 0.5
+    max_batch: int = 200
+    max_buffer: int = 10000
+    overflow: str = "spill"
+    spill_dir: str = "data/spill"
+
+    @field_validator('flush_interval')
+    def validate_interval(cls, v):
+        if v <= 0:
+            raise ValueError("配置项错误：批量写入间隔必须大于0")
+        return v
+
+    @field_validator('max_batch', 'max_buffer')
+    def validate_positive(cls, v):
+        if v < 1:
+            raise ValueError("配置项错误：批量写入条数与缓冲区大小必须大于0")
+        return v
+
+    @field_validator('overflow')
+    def validate_overflow(cls, v):
+        if v not in ("spill", "drop"):
+            raise ValueError("配置项错误：缓冲区溢出策略只能为 spill 或 drop")
+        return v
+
+class AccessTokenConfig(BaseModel):
+    """AccessToken刷新配置"""
+    refresh_ahead: int = 60
+    retry_max: int = 60
+    ready_timeout: int = 10
+    send_wait_timeout: int = 10
+
+    @field_validator('refresh_ahead', 'retry_max', 'ready_timeout', 'send_wait_timeout')
+    def validate_non_negative(cls, v):
+        if v < 0:
+            raise ValueError("配置项错误：AccessToken刷新提前量、重试间隔与等待时间不能小于0")
+        return v
+
+class SendConfig(BaseModel):
+    """发信调度配置"""
+    workers: int = 4
+    global_rate: float = 20
+    global_burst: int = 20
+    target_rate: float = 2
+    target_burst: int = 5
+    max_retries: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 10
+    group_reply_window: int = 300
+    user_reply_window: int = 3600
+    channel_reply_window: int = 300
+
+    @field_validator('workers', 'global_burst', 'target_burst')
+    def validate_positive(cls, v):
+        if v < 1:
+            raise ValueError("配置项错误：发信协程数与令牌桶容量必须大于0")
+        return v
+
+    @field_validator('global_rate', 'target_rate', 'max_retries', 'backoff_base', 'backoff_max',
+                     'group_reply_window', 'user_reply_window', 'channel_reply_window')
+    def validate_non_negative(cls, v):
+        if v < 0:
+            raise ValueError("配置项错误：发信速率、重试次数、退避时间与回复窗口不能小于0")
+        return v
+
+class HttpConfig(BaseModel):
+    """共享HTTP客户端配置"""
+    limit: int = 100
+    limit_per_host: int = 30
+    dns_cache_ttl: int = 300
+    keepalive_timeout: float = 30
+    connect_timeout: float = 5
+    read_timeout: float = 15
+    total_timeout: float = 30
+
+    @field_validator('limit', 'limit_per_host', 'dns_cache_ttl', 'keepalive_timeout', 'connect_timeout', 'read_timeout', 'total_timeout')
+    def validate_non_negative(cls, v):
+        if v < 0:
+            raise ValueError("配置项错误：连接池上限与超时时间不能小于0")
+        return v
+
+class RateLimitConfig(BaseModel):
+    """消息限流配置"""
+    enable: bool = True
+    user_rate: float = 1
+    user_burst: int = 5
+    group_rate: float = 5
+    group_burst: int = 20
+    command_rate: float = 0
+    command_burst: int = 10
+    max_buckets: int = 10000
+    idle_ttl: int = 600
+
+    @field_validator('user_rate', 'group_rate', 'command_rate')
+    def validate_rate(cls, v):
+        if v < 0:
+            raise ValueError("配置项错误：限流速率不能小于0")
+        return v
+
+    @field_validator('user_burst', 'group_burst', 'command_burst', 'max_buckets', 'idle_ttl')
+    def validate_positive(cls, v):
+        if v < 1:
+            raise ValueError("配置项错误：限流容量、令牌桶数量上限与闲置时间必须大于0")
+        return v
+
+class CommandConfig(BaseModel):
+    """命令执行配置"""
+    timeout: float = 30
+    max_concurrency: int = 0
+    busy_reply: str = "当前使用该功能的人数过多，请稍后再试"
+    timeout_reply: str = "请求超时，请稍后再试"
+
+    @field_validator('timeout', 'max_concurrency')
+    def validate_non_negative(cls, v):
+        if v < 0:
+            raise ValueError("配置项错误：命令执行时限与最大同时执行数不能小于0")
+        return v
+
+class DedupConfig(BaseModel):
+    """事件去重配置"""
+    enable: bool = True
+    max_size: int = 10000
+    ttl: int = 600
+    snapshot: bool = True
+    snapshot_path: str = "data/dedup_snapshot.json"
+    snapshot_interval: int = 60
+
+    @field_validator('max_size', 'ttl', 'snapshot_interval')
+    def validate_positive(cls, v):
+        if v < 1:
+            raise ValueError("配置项错误：去重缓存容量、有效期与快照间隔必须大于0")
+        return v
+
+class SignatureConfig(BaseModel):
+    """Webhook签名校验配置"""
+    verify: bool = True
+    max_skew: int = 300
+
+    @field_validator('max_skew')
+    def validate_max_skew(cls, v):
+        if v < 0:
+            raise ValueError("配置项错误：签名时间戳允许偏差不能小于0")
+        return v
+
+# SQLite性能配置档：每个连接建立时依次执行的PRAGMA
+# auto_vacuum需在journal_mode之前执行：切换到WAL会写入数据库文件头，此后再设置auto_vacuum对新库也不生效
+SQLITE_PROFILES = {
+    # Tortoise默认设置（WAL日志，synchronous=FULL）
+    "default": {},
+    # WAL + synchronous=NORMAL：断电时可能丢失最近的事务，但不会损坏数据库
+    "performance": {
+        "auto_vacuum": "INCREMENTAL",
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 268435456,
+        "cache_size": -16000,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    # 每次提交都落盘，适合对消息记录完整性要求较高的场景
+    "durable": {
+        "auto_vacuum": "INCREMENTAL",
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+    },
+}
+
 class DatabaseConfig(BaseModel):
     """数据库配置"""
+    profile: str = "performance"
+    pragmas: dict = {}
+    checkpoint_interval: int = 300
+    optimize_interval: int = 3600
     connections: dict = {
         "default": "sqlite://data/web_user.db",
         "message": "sqlite://data/message.db",
@@ -73,11 +320,45 @@ class DatabaseConfig(BaseModel):
             "default_connection": "messagesent",
         }
     }
+    @field_validator('profile')
+    def validate_profile(cls, v):
+        if v not in SQLITE_PROFILES:
+            raise ValueError(f"配置项错误：数据库性能配置档只能为 {'/'.join(SQLITE_PROFILES)}")
+        return v
+
+    @field_validator('checkpoint_interval', 'optimize_interval')
+    def validate_interval(cls, v):
+        if v < 0:
+            raise ValueError("配置项错误：数据库维护间隔不能小于0")
+        return v
+
+    @property
+    def sqlite_pragmas(self) -> dict:
+        """当前配置档的PRAGMA（pragmas中的同名项优先）"""
+        return {**SQLITE_PROFILES[self.profile], **self.pragmas}
+
     @property
     def TORTOISE_ORM(self):
-        """返回Tortoise ORM配置"""
+        """返回Tortoise ORM配置
+
+        sqlite连接会被展开为字典形式，并带上当前配置档的PRAGMA
+        """
+        from tortoise.backends.base.config_generator import expand_db_url
+
+        pragmas = self.sqlite_pragmas
+        connections = {}
+        for name, connection in self.connections.items():
+            if isinstance(connection, str) and connection.startswith("sqlite://"):
+                connection = expand_db_url(connection)
+            if isinstance(connection, dict) and connection.get("engine") == "tortoise.backends.sqlite":
+                credentials = {**connection.get("credentials", {}), **pragmas}
+                # 连接地址展开后已带有journal_mode，auto_vacuum需移到最前面才能对新库生效
+                if "auto_vacuum" in credentials:
+                    credentials = {"auto_vacuum": credentials.pop("auto_vacuum"), **credentials}
+                connection = {**connection, "credentials": credentials}
+            connections[name] = connection
         return {
-            "connections": self.connections,
+            "connections": connections,
             "apps": self.apps
         }
 
@@ -88,4 +369,16 @@ class ConfigBase(BaseModel):
     Notice: NoticeConfig
     Plugins: PluginConfig
     Advanced: AdvancedConfig
-    Database: DatabaseConfig
\ No newline at end of file
+    Database: DatabaseConfig
+    Dispatch: DispatchConfig = DispatchConfig()
+    Signature: SignatureConfig = SignatureConfig()
+    Dedup: DedupConfig = DedupConfig()
+    Command: CommandConfig = CommandConfig()
+    RateLimit: RateLimitConfig = RateLimitConfig()
+    Http: HttpConfig = HttpConfig()
+    Send: SendConfig = SendConfig()
+    AccessToken: AccessTokenConfig = AccessTokenConfig()
+    BatchWrite: BatchWriteConfig = BatchWriteConfig()
+    Statistics: StatisticsConfig = StatisticsConfig()
+    Rollup: RollupConfig = RollupConfig()
+    Retention: RetentionConfig = RetentionConfig()
\ No newline at end of file
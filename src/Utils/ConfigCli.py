@@ -89,6 +89,7 @@ def generate_config_wizard() -> ConfigBase:
             "session_secret": "xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx"
         },
         "Database": {
+            "profile": "performance",
             "connections": {"default": "sqlite://data/web_user.db","message": "sqlite://data/message.db","messagesent": "sqlite://data/message_sent.db"},
             "apps": {
                 "models": {
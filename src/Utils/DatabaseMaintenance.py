@@ -0,0 +1,105 @@
+import asyncio, time
+from typing import Any, Dict, List, Optional
+
+from tortoise import connections
+
+from src.Utils.Logger import logger
+from src.Utils.Config import config
+
+
+class DatabaseMaintenance:
+    """SQLite定期维护
+
+    - 每隔checkpoint_interval秒对每个连接执行 PRAGMA wal_checkpoint(TRUNCATE)，
+      把WAL文件合并回数据库并截断，避免WAL文件持续增长拖慢读取
+    - 每隔optimize_interval秒执行 PRAGMA optimize，让SQLite按需更新查询规划所用的统计信息
+    关闭时会再执行一次，使数据库文件在退出后处于干净状态
+    """
+
+    def __init__(self, names: List[str], checkpoint_interval: float = 300, optimize_interval: float = 3600):
+        """
+        :param names: 需要维护的Tortoise连接名
+        """
+        self.names = names
+        self.checkpoint_interval = checkpoint_interval
+        self.optimize_interval = optimize_interval
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"checkpoints": 0, "optimizes": 0, "errors": 0, "last_checkpoint": None, "last_optimize": None}
+
+    def start(self):
+        """启动维护协程（需在事件循环中调用）"""
+        if self._task is not None or not (self.checkpoint_interval or self.optimize_interval):
+            return
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        """停止维护协程并执行最后一次维护"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.checkpoint()
+        await self.optimize()
+
+    async def _loop(self):
+        now = time.monotonic()
+        next_checkpoint = now + self.checkpoint_interval if self.checkpoint_interval else None
+        next_optimize = now + self.optimize_interval if self.optimize_interval else None
+        while True:
+            due = min(t for t in (next_checkpoint, next_optimize) if t is not None)
+            await asyncio.sleep(max(0.0, due - time.monotonic()))
+            now = time.monotonic()
+            if next_checkpoint is not None and now >= next_checkpoint:
+                await self.checkpoint()
+                next_checkpoint = now + self.checkpoint_interval
+            if next_optimize is not None and now >= next_optimize:
+                await self.optimize()
+                next_optimize = now + self.optimize_interval
+
+    async def _execute(self, sql: str) -> Dict[str, Any]:
+        results = {}
+        for name in self.names:
+            try:
+                _, rows = await connections.get(name).execute_query(sql)
+                results[name] = [tuple(row) for row in rows]
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.error(f"数据库维护 >>> 连接 {name} 执行 {sql} 失败: {e}")
+        return results
+
+    async def checkpoint(self) -> Dict[str, Any]:
+        """合并并截断WAL文件
+
+        :return: 连接名 -> (busy, WAL页数, 已合并页数)
+        """
+        results = await self._execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self._stats["checkpoints"] += 1
+        self._stats["last_checkpoint"] = time.strftime("%Y-%m-%d %H:%M:%S")
+        logger.debug(f"数据库维护 >>> wal_checkpoint 完成: {results}")
+        return results
+
+    async def optimize(self):
+        """更新查询规划统计信息"""
+        await self._execute("PRAGMA optimize")
+        self._stats["optimizes"] += 1
+        self._stats["last_optimize"] = time.strftime("%Y-%m-%d %H:%M:%S")
+        logger.debug("数据库维护 >>> PRAGMA optimize 完成")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取数据库维护统计信息"""
+        stats = dict(self._stats)
+        stats.update({
+            "profile": config.Database.profile,
+            "pragmas": config.Database.sqlite_pragmas,
+        })
+        return stats
+
+
+db_maintenance = DatabaseMaintenance(
+    names=[
+        name for name, connection in config.Database.TORTOISE_ORM["connections"].items()
+        if isinstance(connection, dict) and connection.get("engine") == "tortoise.backends.sqlite"
+    ],
+    checkpoint_interval=config.Database.checkpoint_interval,
+    optimize_interval=config.Database.optimize_interval,
+)
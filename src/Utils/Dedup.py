@@ -0,0 +1,148 @@
+import asyncio, json, os, time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from src.Utils.Logger import logger
+from src.Utils.Config import config
+
+
+class DedupCache:
+    """事件去重缓存（TTL + LRU）
+
+    开放平台在ACK较慢时会重发Webhook，同一事件ID/消息ID在有效期内只处理一次。
+    条目按最近一次出现的时间排序，超过容量时淘汰最久未出现的条目，
+    过期条目在查询时或新增时从队首清理，内存占用始终不超过max_size个条目。
+
+    启用快照后会定期并在关闭时将未过期的条目写入磁盘，重启后读回，避免重放最近的事件
+    """
+
+    def __init__(self, max_size: int, ttl: float, snapshot_path: Optional[str] = None, snapshot_interval: float = 60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval
+        self._entries: "OrderedDict[str, float]" = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "evicted": 0,
+            "expired": 0,
+        }
+
+    def contains(self, key: str) -> bool:
+        """查询键是否已出现过（命中时刷新其有效期）"""
+        if not key:
+            return False
+        expire_at = self._entries.get(key)
+        now = time.time()
+        if expire_at is None or expire_at <= now:
+            if expire_at is not None:
+                del self._entries[key]
+                self._stats["expired"] += 1
+            self._stats["misses"] += 1
+            return False
+        self._entries[key] = now + self.ttl
+        self._entries.move_to_end(key)
+        self._stats["hits"] += 1
+        return True
+
+    def add(self, key: str):
+        """记录一个键"""
+        if not key:
+            return
+        now = time.time()
+        self._entries[key] = now + self.ttl
+        self._entries.move_to_end(key)
+        self._purge(now)
+
+    def seen(self, key: str) -> bool:
+        """查询并记录：已出现过返回True，否则记录该键并返回False"""
+        if self.contains(key):
+            return True
+        self.add(key)
+        return False
+
+    def _purge(self, now: float):
+        entries = self._entries
+        while entries:
+            key, expire_at = next(iter(entries.items()))
+            if expire_at > now:
+                break
+            entries.popitem(last=False)
+            self._stats["expired"] += 1
+        while len(entries) > self.max_size:
+            entries.popitem(last=False)
+            self._stats["evicted"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取去重统计信息"""
+        stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats.update({
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hit_rate": round(stats["hits"] / lookups, 4) if lookups else 0.0,
+        })
+        return stats
+
+    def load_snapshot(self):
+        """读回磁盘快照中未过期的条目"""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"事件去重 >>> 读取快照失败，将忽略该快照: {e}")
+            return
+        now = time.time()
+        for key, expire_at in sorted(data.items(), key=lambda item: item[1]):
+            if expire_at > now:
+                self._entries[key] = expire_at
+        self._purge(now)
+        logger.info(f"事件去重 >>> 已从快照恢复 {len(self._entries)} 条记录")
+
+    def save_snapshot(self):
+        """将未过期的条目写入磁盘快照"""
+        if not self.snapshot_path:
+            return
+        now = time.time()
+        self._purge(now)
+        tmp_path = self.snapshot_path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_path) or ".", exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(dict(self._entries), f)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            logger.error(f"事件去重 >>> 写入快照失败: {e}")
+
+    def start(self):
+        """读回快照并启动定期快照协程（需在事件循环中调用）"""
+        if not self.snapshot_path or self._task is not None:
+            return
+        self.load_snapshot()
+        self._task = asyncio.create_task(self._snapshot_loop())
+
+    async def stop(self):
+        """停止定期快照并写入最终快照"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self.save_snapshot()
+
+    async def _snapshot_loop(self):
+        while True:
+            await asyncio.sleep(self.snapshot_interval)
+            self.save_snapshot()
+
+
+dedup = DedupCache(
+    max_size=config.Dedup.max_size,
+    ttl=config.Dedup.ttl,
+    snapshot_path=config.Dedup.snapshot_path if config.Dedup.snapshot else None,
+    snapshot_interval=config.Dedup.snapshot_interval,
+)
@@ -1,12 +1,13 @@
-import json, binascii
-from nacl.signing import SigningKey
-from nacl.exceptions import BadSignatureError
+import json
 from fastapi import Request
-from typing import Any, Dict, List, Union, Type, TypeVar, Optional
+from collections.abc import Sequence
+from typing import Any, Callable, Dict, List, Union, Type, TypeVar, Optional
 from pydantic import BaseModel
 
 from src.Utils.Logger import logger
 from src.Utils.Config import config
+from src.Utils.JsonCodec import Envelope, decode_envelope
+from src.Utils.Signature import get_verifier
 
 # 类型变量用于类方法
 T = TypeVar("T", bound="QQBasePayload")
@@ -16,42 +17,56 @@ class QQBasePayload:
     QQ开放平台通用Payload基类
     处理Webhook和WebSocket两种方式的数据
     """
-    def __init__(self, payload: Union[Dict[str, Any], str]):
+    def __init__(self, payload: Union[Dict[str, Any], str, bytes, Envelope]):
         """
         初始化Payload
-        :param payload: 可以是字典或JSON字符串
+        :param payload: 可以是字典、JSON字符串/字节串或已解析外层的Envelope
         """
         # 处理输入数据
-        if isinstance(payload, str):
-            self._raw_data = json.loads(payload)
+        if isinstance(payload, Envelope):
+            self._envelope = payload
+        elif isinstance(payload, (str, bytes, bytearray, memoryview)):
+            self._envelope = decode_envelope(payload)
         else:
-            self._raw_data = payload
+            self._envelope = Envelope.from_dict(payload)
         # 解析基础字段
-        self.id: str = self._raw_data.get("id", "")
+        self.id: str = self._envelope.id
         """id字段通常是事件的唯一标识符"""
-        self.op: int = self._raw_data.get("op", -1)
+        self.op: int = self._envelope.op
         """op字段 即OpCode，指示事件大类型"""
-        self.s: int = self._raw_data.get("s", 0)
+        self.s: int = self._envelope.s
         """s字段 下行消息序列ID，用于标识消息"""
-        self.t: str = self._raw_data.get("t", "")
+        self.t: str = self._envelope.t
         """t字段 事件类型名称（仅当op=0时有效）"""
+        self._d = None
+
+    @property
+    def d(self) -> "AttrDict":
+        """d字段 事件数据，嵌套的字典或列表（首次访问时才解析）"""
+        if self._d is None:
+            self._d = _wrap(self._envelope.d)
+        return self._d
+
+    def peek_ids(self) -> Dict[str, Any]:
+        """读取d字段中的会话ID，d字段尚未解析时不会解码整个事件（见Envelope.peek_ids）"""
+        return self._envelope.peek_ids()
+
+    @property
+    def _raw_data(self) -> Dict[str, Any]:
+        """原始数据包"""
+        return self._envelope.to_dict()
 
-        # 递归处理d字段
-        self.d: dict = self._recursive_parse(self._raw_data.get("d", {}))
-        """d字段 事件数据，嵌套的字典或列表"""
+    def log_event(self) -> None:
+        """记录收到的事件（由事件处理器调用，避免在Webhook请求内解析d字段）
 
-    def _recursive_parse(self, data: Any) -> Any:
-        """递归解析嵌套数据结构"""
-        if isinstance(data, dict):
-            return AttrDict(data)
-        elif isinstance(data, list):
-            return [self._recursive_parse(item) for item in data]
-        return data
+        子类按事件类型输出详细日志，未单独处理的事件只记录类型和ID
+        """
+        logger.debug(f"事件 | 类型：{self.event_type or self.opcode_name} | ID：{self.id}")
 
     @classmethod
-    def from_json(cls: Type[T], json_str: str) -> T:
+    def from_json(cls: Type[T], json_str: Union[str, bytes]) -> T:
         """从JSON字符串创建实例"""
-        return cls(json.loads(json_str))
+        return cls(decode_envelope(json_str))
 
     @property
     def opcode_name(self) -> str:
@@ -93,120 +108,189 @@ class QQBasePayload:
 
     def is_message_create(self) -> bool:
         """是否是消息创建事件"""
-        return self.is_dispatch() and self.t in [
-            "MESSAGE_CREATE",
-            "AT_MESSAGE_CREATE",
-            "DIRECT_MESSAGE_CREATE",
-            "C2C_MESSAGE_CREATE",
-            "GROUP_AT_MESSAGE_CREATE",
-        ]
+        return self.is_dispatch() and self.t in MESSAGE_EVENT_TYPES
 
     @staticmethod
     async def generate_validation_response(
-        request: Request
+        request: Request, body: Optional[bytes] = None
     ) -> Dict[str, str]:
         """验证开放平台提供的签名密钥，并对官方平台进行回应
         
         Args:
             request (Request): FastAPI请求对象，包含请求头和body
+            body (bytes): 已读取的原始请求体，为空时从request中读取
 
         Returns:
             dict: 返回一个字典，包含plain_token和signature
 
         Raises:
-            BadSignatureError: 如果签名验证失败，抛出异常
-            binascii.Error: 如果X-Signature-Ed25519长度不是64字节，抛出异常
+            SignatureError: 如果签名验证失败，抛出异常
         """
-        _X_Signature_Ed25519 = request.headers.get("X-Signature-Ed25519").encode(
-            "utf-8"
-        )  # 读请求头中的Ed25519签名信息
-        _X_Signature_Timestamp = request.headers.get("X-Signature-Timestamp").encode(
-            "utf-8"
-        )  # 读请求头中的时间戳 按理说等价于body["d"]["event_ts"]
-        _body = await request.body()  # 先拿到手一个body用于检查证书是否正确
-        _plain_token = json.loads(_body.decode("utf-8")).get("d").get("plain_token").encode(
-            "utf-8"
-        )
-        QQ_BOT_SECRET = config.Bot.appsecret.encode(
-            "utf-8"
-        )
-        while len(QQ_BOT_SECRET) < 32:
-            QQ_BOT_SECRET += QQ_BOT_SECRET  # 按理说这里不用到32 但是开放平台这么要求的 防止出问题先这么写（
-        QQ_BOT_SECRET = QQ_BOT_SECRET[:32]  # 合成、分割前32位 用于加解密
-        _X_Signature_Ed25519 = binascii.unhexlify(
-            _X_Signature_Ed25519
-        )  # 给一下hex解码 对应官方文档的
-        if len(_X_Signature_Ed25519) != 64:  # 官方文档提出解码后应该为64 bytes
-            raise binascii.Error(
-                "X-Signature-Ed25519 must be 64 bytes long, but received %d bytes."
-                % len(_X_Signature_Ed25519)
-            )
-        _sign_key = SigningKey(QQ_BOT_SECRET)  # 先搞一个签名器
-        try:
-            _sign_key.verify_key.verify(
-                _X_Signature_Timestamp + _body, _X_Signature_Ed25519
-            )  # 前边是构建出来的时间戳+body消息串 后面是签名
-        except BadSignatureError as e:
-            raise BadSignatureError(
-                "Signature verification failed! Please check your variable QQ_BOT_SECRET."
-            )
-        _message = _X_Signature_Timestamp + _plain_token  # 还需要再次用一下json的内容构建返回消息并加密
-        _signature = _sign_key.sign(_message).signature.hex()
+        _X_Signature_Ed25519 = request.headers.get("X-Signature-Ed25519")  # 读请求头中的Ed25519签名信息
+        _X_Signature_Timestamp = request.headers.get("X-Signature-Timestamp")  # 读请求头中的时间戳 按理说等价于body["d"]["event_ts"]
+        _body = body if body is not None else await request.body()  # 先拿到手一个body用于检查证书是否正确
+        verifier = get_verifier()
+        verifier.verify(_X_Signature_Ed25519, _X_Signature_Timestamp, _body)
+        _plain_token = decode_envelope(_body).d.get("plain_token", "")
+        _signature = verifier.sign(_X_Signature_Timestamp, _plain_token)  # 还需要再次用一下json的内容构建返回消息并加密
         return {"plain_token": _plain_token, "signature": _signature}
 
+def _wrap(value: Any) -> Any:
+    """将字典/列表包装为只读视图，其余值原样返回"""
+    if isinstance(value, dict):
+        return AttrDict(value)
+    if isinstance(value, list):
+        return AttrList(value)
+    return value
+
 class AttrDict:
-    """属性字典，允许通过点号访问嵌套属性"""
+    """属性字典，允许通过点号访问嵌套属性
+
+    只读视图：直接包装原始字典，属性在首次访问时才解析，子视图解析后缓存，不复制数据
+    """
+    __slots__ = ("_data", "_cache")
 
     def __init__(self, data: Dict[str, Any]):
-        for key, value in data.items():
-            if isinstance(value, dict):
-                setattr(self, key, AttrDict(value))
-            elif isinstance(value, list):
-                # 处理列表中的嵌套字典
-                processed_list = []
-                for item in value:
-                    if isinstance(item, dict):
-                        processed_list.append(AttrDict(item))
-                    else:
-                        processed_list.append(item)
-                setattr(self, key, processed_list)
-            else:
-                setattr(self, key, value)
+        object.__setattr__(self, "_data", data)
+        object.__setattr__(self, "_cache", {})
+
+    def _resolve(self, key: str) -> Any:
+        cache = self._cache
+        if key in cache:
+            return cache[key]
+        value = self._data[key]
+        if isinstance(value, (dict, list)):
+            value = cache[key] = _wrap(value)
+        return value
+
+    def __getattr__(self, key: str) -> Any:
+        if key in AttrDict.__slots__:  # 尚未初始化（如反序列化时）
+            raise AttributeError(key)
+        try:
+            return self._resolve(key)
+        except KeyError:
+            raise AttributeError(key) from None
+
+    def __setattr__(self, key: str, value: Any):
+        raise AttributeError("AttrDict 是只读视图")
+
+    def __reduce__(self):
+        return (AttrDict, (self._data,))
 
     def to_dict(self) -> Dict[str, Any]:
-        """转换为普通字典"""
-        result = {}
-        for key, value in self.__dict__.items():
-            if isinstance(value, AttrDict):
-                result[key] = value.to_dict()
-            elif isinstance(value, list):
-                # 处理列表中的AttrDict
-                processed_list = []
-                for item in value:
-                    if isinstance(item, AttrDict):
-                        processed_list.append(item.to_dict())
-                    else:
-                        processed_list.append(item)
-                result[key] = processed_list
-            else:
-                result[key] = value
-        return result
+        """返回原始字典（不复制，请勿修改）"""
+        return self._data
 
     def __repr__(self) -> str:
         """友好的对象表示形式"""
-        return f"<AttrDict({self.to_dict()})>"
+        return f"<AttrDict({self._data})>"
 
     def __getitem__(self, key):
         """支持字典式访问"""
-        return getattr(self, key)
+        return self._resolve(key)
+
+    def __contains__(self, key) -> bool:
+        return key in self._data
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def keys(self):
+        return self._data.keys()
 
     def get(self, key, default=None):
         """安全的属性获取"""
-        return getattr(self, key, default)
+        try:
+            return self._resolve(key)
+        except KeyError:
+            return default
+
+class AttrList(Sequence):
+    """列表的只读视图，元素中的字典在首次访问时才包装为AttrDict"""
+    __slots__ = ("_data", "_cache")
+
+    def __init__(self, data: List[Any]):
+        self._data = data
+        self._cache: Dict[int, Any] = {}
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return AttrList(self._data[index])
+        if index < 0:
+            index += len(self._data)
+        cache = self._cache
+        if index in cache:
+            return cache[index]
+        value = self._data[index]
+        if isinstance(value, (dict, list)):
+            value = cache[index] = _wrap(value)
+        return value
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def to_list(self) -> List[Any]:
+        """返回原始列表（不复制，请勿修改）"""
+        return self._data
+
+    def __repr__(self) -> str:
+        return f"<AttrList({self._data})>"
+
+class CommandArgs:
+    """命令参数
+
+    由命令路由按@command声明的参数表解析一次后挂载到event.args，
+    声明的参数可直接以属性访问（缺失或类型转换失败时为None），
+    raw为命令名之后的原始文本，tokens为其按空白分割后的各项
+    """
+    __slots__ = ("raw", "tokens", "_values")
+
+    def __init__(self, raw: str = "", tokens: tuple = (), values: Optional[Dict[str, Any]] = None):
+        self.raw = raw
+        self.tokens = tokens
+        self._values = values or {}
+
+    def __getattr__(self, name: str) -> Any:
+        if name in CommandArgs.__slots__:
+            raise AttributeError(name)
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError(f"未声明的命令参数: {name}") from None
+
+    def __getitem__(self, key: Union[int, str]) -> Any:
+        if isinstance(key, str):
+            return self._values[key]
+        return self.tokens[key]
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def __bool__(self) -> bool:
+        return bool(self.raw)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._values.get(key)
+        return default if value is None else value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self._values)
+
+    def __repr__(self) -> str:
+        return f"CommandArgs(raw={self.raw!r}, values={self._values!r})"
+
 
 class MessageEventPayload(QQBasePayload):
     """消息体事件"""
 
+    command: str = ""
+    """匹配到的命令名（已去除/前缀并转为小写，由命令路由设置）"""
+    args: CommandArgs = CommandArgs()
+    """命令参数（由命令路由按@command声明的参数表解析）"""
+
     @property
     def event_type(self) -> str:
         """(转中文)事件类型"""
@@ -228,46 +312,44 @@ class MessageEventPayload(QQBasePayload):
         """消息ID"""
         return self.d.get("id", "")
     @property
-    def attachments(self) -> AttrDict:
+    def attachments(self) -> AttrList:
         """附件"""
-        return self.d.get("attachments", AttrDict({}))
+        return self.d.get("attachments", AttrList([]))
     @property
     def content(self) -> str:
-        """消息内容"""
+        """消息内容（首次访问时生成）"""
+        if self._content is None:
+            self._content = self._build_content()
+        return self._content
+
+    def _build_content(self) -> str:
         base_content = self.d.get("content", "")
         if self.event_type == "频道艾特":
             base_content = base_content.replace(f"<@!13449081469700666290>", "")
         while base_content.startswith(" "):  # 去掉开头的空格
             base_content = base_content[1:]
         attachments = self.attachments
-        if not attachments or (isinstance(attachments, AttrDict) and not attachments.to_dict()):
+        if not attachments:
             return base_content
-        # 将attachments转换为可处理的格式
-        if isinstance(attachments, AttrDict):
-            attachment_data = attachments.to_dict()
-        else:
-            attachment_data = attachments
-        
+
         # 处理附件
-        if isinstance(attachment_data, list):
-            for attachment in attachment_data:
-                if isinstance(attachment, AttrDict):
-                    attachment = attachment.to_dict()
-                if isinstance(attachment, dict):
-                    filename = attachment.get('filename', '')
-                    file_url = attachment.get('url', '')
-                    content_type = attachment.get('content_type', '')
-                    attachment_str = ""
-                    if "image" in content_type:
-                        attachment_str += f"[图片:{filename}][URL: {file_url}]"
-                    elif "file" in content_type:
-                        attachment_str += f"[文件:{filename}][URL: {file_url}]"
-                    elif "voice" in content_type:
-                        attachment_str += f"[语音:{filename}][URL: {file_url}]"
-                    elif "video" in content_type:
-                        attachment_str += f"[视频:{filename}][URL: {file_url}]"
-                    else:
-                        attachment_str += f"[{content_type}附件: {filename}][URL: {file_url}]"
+        attachment_str = ""
+        for attachment in attachments:
+            if isinstance(attachment, AttrDict):
+                filename = attachment.get('filename', '')
+                file_url = attachment.get('url', '')
+                content_type = attachment.get('content_type', '')
+                attachment_str = ""
+                if "image" in content_type:
+                    attachment_str += f"[图片:{filename}][URL: {file_url}]"
+                elif "file" in content_type:
+                    attachment_str += f"[文件:{filename}][URL: {file_url}]"
+                elif "voice" in content_type:
+                    attachment_str += f"[语音:{filename}][URL: {file_url}]"
+                elif "video" in content_type:
+                    attachment_str += f"[视频:{filename}][URL: {file_url}]"
+                else:
+                    attachment_str += f"[{content_type}附件: {filename}][URL: {file_url}]"
         return f"{base_content} {attachment_str}".strip()
 
     @property
@@ -286,7 +368,7 @@ class MessageEventPayload(QQBasePayload):
     def __init__(self, data: Union[Dict, str]):
         # 关键修复：调用父类构造函数初始化基础属性
         super().__init__(data)
-        # 现在可以安全访问属性
+        self._content: Optional[str] = None
 
 class OpenAPIErrorPayload(BaseModel):
     """OpenAPI错误响应体"""
@@ -535,9 +617,7 @@ class MessageSenderOverPayload:
 
 class GuildMessageEvent(MessageEventPayload):
     """频道消息事件处理"""
-    def __init__(self, data: Union[Dict, str]):
-        # 调用父类初始化链
-        super().__init__(data)
+    def log_event(self) -> None:
         logger.info(f"频道消息 | 频道ID：{self.guild_id} | 用户ID：{self.user_id} >>> {self.content}")
     @property
     def channel_id(self) -> str:
@@ -546,8 +626,8 @@ class GuildMessageEvent(MessageEventPayload):
     def guild_id(self) -> str:
         return self.d.get("guild_id", "")
     @property
-    def mentions(self) -> List[AttrDict]:
-        return self.d.get("mentions", [])
+    def mentions(self) -> AttrList:
+        return self.d.get("mentions", AttrList([]))
     def is_direct_message(self) -> bool:
         """是否是私信消息"""
         return self.t == "DIRECT_MESSAGE_CREATE"
@@ -565,9 +645,7 @@ class GuildMessageEvent(MessageEventPayload):
 
 class GroupMessageEvent(MessageEventPayload):
     """群消息事件处理"""
-    def __init__(self, data: Union[Dict, str]):
-        # 调用父类初始化链
-        super().__init__(data)
+    def log_event(self) -> None:
         logger.info(f"群消息 | 群ID：{self.group_id} | 用户ID：{self.user_id} >>> {self.content}")
     @property
     def group_id(self) -> str:
@@ -587,9 +665,7 @@ class GroupMessageEvent(MessageEventPayload):
 
 class PrivateMessageEvent(MessageEventPayload):
     """私聊消息事件处理"""
-    def __init__(self, data: Union[Dict, str]):
-        # 调用父类初始化链
-        super().__init__(data)
+    def log_event(self) -> None:
         logger.info(f"私聊消息 | 用户ID：{self.user_id} >>> {self.content}")
 
     async def reply(self, content: str, markdown: MarkdownPayload = None, msg_id: str = None, ark: ArkPayload = None, media: MediaPayload = None):
@@ -618,19 +694,24 @@ class ValidationEvent(QQBasePayload):
     def event_ts(self) -> str:
         return self.d.get("event_ts", "")
 
-    def generate_response(self, request: Request) -> Dict[str, str]:
+    async def generate_response(self, request: Request, body: Optional[bytes] = None) -> Dict[str, str]:
         """生成验证响应"""
-        return QQBasePayload.generate_validation_response(request)
+        return await QQBasePayload.generate_validation_response(request, body)
 
 class GroupEvent(QQBasePayload):
     """群机器人事件处理"""
-    def __init__(self, data: Union[Dict, str]):
-        # 调用父类初始化链
-        super().__init__(data)
-        self.group_id = self.d.get("group_openid", "")
-        self.op_member_id = self.d.get("op_member_openid", "")
-        self.timestamp = self.d.get("timestamp", "")
-        self.event_id = self.id
+    @property
+    def group_id(self) -> str:
+        return self.d.get("group_openid", "")
+    @property
+    def op_member_id(self) -> str:
+        return self.d.get("op_member_openid", "")
+    @property
+    def timestamp(self) -> str:
+        return self.d.get("timestamp", "")
+    @property
+    def event_id(self) -> str:
+        return self.id
 
     async def reply(self, content: str, markdown: MarkdownPayload = None, msg_id: str = None, ark: ArkPayload = None, media: MediaPayload = None):
         """快捷回复方法"""
@@ -641,16 +722,14 @@ class GroupEvent(QQBasePayload):
 
 class GuildEvent(QQBasePayload):
     """频道管理事件处理"""
-    def __init__(self, data: Union[Dict, str]):
-        # 调用父类初始化链
-        super().__init__(data)
+    def log_event(self) -> None:
         owner_id = self.d.get("owner_id", "")
         guide_name = self.d.get("name", "")
         if self.t == "GUILD_UPDATE":
             logger.info(f"频道更新 | 频道ID：{self.guild_id} | 频道主ID：{owner_id} | 频道名称：{guide_name}")
         if self.t == "GUILD_CREATE":
             logger.info(f"频道创建 | 频道ID：{self.guild_id} | 频道主ID：{owner_id} | 频道名称：{guide_name}")
-        if self.t == "GUIDE_DELETE":
+        if self.t == "GUILD_DELETE":
             logger.info(f"频道删除 | 频道ID：{self.guild_id} | 频道主ID：{owner_id} | 频道名称：{guide_name}")
     @property
     def guild_id(self) -> str:
@@ -658,39 +737,88 @@ class GuildEvent(QQBasePayload):
 
 
 # ====================== 工厂函数 ======================
-def create_payload(payload_data: Union[Dict, str]) -> Union[MessageEventPayload, QQBasePayload]:
+def create_payload(payload_data: Union[Dict, str, bytes, Envelope]) -> Union[MessageEventPayload, QQBasePayload]:
     """
     根据Payload数据创建适当的子类实例
 
-    :param payload_data: Payload数据（字典或JSON字符串）
+    仅依据外层的op和t字段在EVENT_ROUTES中查找子类，不会解析d字段
+
+    :param payload_data: Payload数据（字典、JSON字符串/字节串或Envelope）
 
     :return: 对应的Payload子类实例
     """
-    # 如果是字符串，先转换为字典
-    if isinstance(payload_data, str):
-        payload_dict = json.loads(payload_data)
+    if isinstance(payload_data, Envelope):
+        envelope = payload_data
+    elif isinstance(payload_data, (str, bytes, bytearray, memoryview)):
+        envelope = decode_envelope(payload_data)
     else:
-        payload_dict = payload_data
-
-    # 获取op和t字段
-    op = payload_dict.get("op", -1)
-    t = payload_dict.get("t", "")
-
-    # 根据op和t选择适当的子类
-    if op == 0:  # Dispatch事件
-        if t in ["MESSAGE_CREATE", "AT_MESSAGE_CREATE", "DIRECT_MESSAGE_CREATE"]: # 注意：MESSAGE_CREATE仅适用于私域
-            return GuildMessageEvent(payload_dict)
-        elif t in ["GROUP_AT_MESSAGE_CREATE"]: # 此消息为群聊
-            return GroupMessageEvent(payload_dict)
-        elif t in ["C2C_MESSAGE_CREATE"]:
-            return PrivateMessageEvent(payload_dict)
-        elif t in ["GUID_UPDATE", "GUILD_CREATE", "GUILD_DELETE"]:
-            return GuildEvent(payload_dict)
-        elif t in ["GROUP_ADD_ROBOT", "GROUP_DEL_ROBOT"]:
-            return GroupEvent(payload_dict)
-
-    elif op == 13:  # 验证事件
-        return ValidationEvent(payload_dict)
+        envelope = Envelope.from_dict(payload_data)
+
+    if envelope.op == 0:  # Dispatch事件
+        route = EVENT_ROUTES.get(envelope.t)
+        if route is not None:
+            return route.payload_class(envelope)
+    elif envelope.op == 13:  # 验证事件
+        return ValidationEvent(envelope)
 
     # 默认返回基类
-    return MessageEventPayload(payload_dict)
+    return MessageEventPayload(envelope)
+
+
+# ====================== 事件路由表 ======================
+class EventRoute:
+    """事件路由：事件类型对应的Payload子类及处理器链"""
+    __slots__ = ("name", "payload_class", "is_message", "handlers")
+
+    def __init__(self, name: str, payload_class: Type[QQBasePayload], is_message: bool = False):
+        self.name = name
+        self.payload_class = payload_class
+        """用于构建事件对象的Payload子类"""
+        self.is_message = is_message
+        """是否为消息事件（消息事件会入库并进行命令匹配）"""
+        self.handlers: List[Callable] = []
+        """事件处理器链，按注册顺序依次执行"""
+
+
+EVENT_ROUTES: Dict[str, EventRoute] = {}
+"""事件类型 -> 事件路由"""
+MESSAGE_EVENT_TYPES: frozenset = frozenset()
+"""消息事件类型集合"""
+
+
+def register_event_type(name: str, payload_class: Type[QQBasePayload] = None, is_message: bool = False) -> EventRoute:
+    """注册事件类型
+
+    已注册的事件类型会更新其Payload子类，处理器链保持不变
+
+    :param name: 事件类型名称（即t字段）
+    :param payload_class: 构建事件对象的Payload子类，为空时使用MessageEventPayload
+    :param is_message: 是否为消息事件
+
+    :return: 对应的事件路由
+    """
+    global MESSAGE_EVENT_TYPES
+    payload_class = payload_class or MessageEventPayload
+    route = EVENT_ROUTES.get(name)
+    if route is None:
+        route = EVENT_ROUTES[name] = EventRoute(name, payload_class, is_message)
+    else:
+        route.payload_class = payload_class
+        route.is_message = is_message
+    MESSAGE_EVENT_TYPES = frozenset(n for n, r in EVENT_ROUTES.items() if r.is_message)
+    return route
+
+
+for _name in ("MESSAGE_CREATE", "AT_MESSAGE_CREATE", "DIRECT_MESSAGE_CREATE"):  # 注意：MESSAGE_CREATE仅适用于私域
+    register_event_type(_name, GuildMessageEvent, is_message=True)
+register_event_type("GROUP_AT_MESSAGE_CREATE", GroupMessageEvent, is_message=True)  # 此消息为群聊
+register_event_type("C2C_MESSAGE_CREATE", PrivateMessageEvent, is_message=True)
+for _name in (
+    "GUILD_CREATE", "GUILD_UPDATE", "GUILD_DELETE",
+    "CHANNEL_CREATE", "CHANNEL_UPDATE", "CHANNEL_DELETE",
+    "GUILD_MEMBER_ADD", "GUILD_MEMBER_UPDATE", "GUILD_MEMBER_REMOVE",
+):
+    register_event_type(_name, GuildEvent)
+for _name in ("GROUP_ADD_ROBOT", "GROUP_DEL_ROBOT", "GROUP_MSG_REJECT", "GROUP_MSG_RECEIVE"):
+    register_event_type(_name, GroupEvent)
+del _name
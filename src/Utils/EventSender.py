@@ -1,4 +1,5 @@
 from tortoise import fields, models
+from tortoise.indexes import Index
 from datetime import datetime
 
 class GroupMessage(models.Model):
@@ -13,6 +14,9 @@ class GroupMessage(models.Model):
     class Meta:
         table = "group_messages"
         app = "message"
+        indexes = (
+            Index(fields=("timestamp", "group_id"), name="idx_group_messages_timestamp_group_id"),
+        )
 
 class UserMessage(models.Model):
     """用户私聊消息记录"""
@@ -25,6 +29,9 @@ class UserMessage(models.Model):
     class Meta:
         table = "user_messages"
         app = "message"
+        indexes = (
+            Index(fields=("timestamp", "user_id"), name="idx_user_messages_timestamp_user_id"),
+        )
 
 class ChannelMessage(models.Model):
     """频道公开消息记录"""
@@ -39,6 +46,9 @@ class ChannelMessage(models.Model):
     class Meta:
         table = "channel_messages"
         app = "message"
+        indexes = (
+            Index(fields=("timestamp", "channel_id"), name="idx_channel_messages_timestamp_channel_id"),
+        )
 
 class ChannelPrivateMessage(models.Model):
     """频道私聊消息记录"""
@@ -53,6 +63,9 @@ class ChannelPrivateMessage(models.Model):
     class Meta:
         table = "channel_private_messages"
         app = "message"
+        indexes = (
+            Index(fields=("timestamp", "guild_id"), name="idx_channel_private_messages_timestamp_guild_id"),
+        )
 
 class SentGroupMessage(models.Model):
     """发送的群消息记录"""
@@ -67,6 +80,10 @@ class SentGroupMessage(models.Model):
     class Meta:
         table = "sent_group_messages"
         app = "messagesent"
+        indexes = (
+            Index(fields=("timestamp", "group_id"), name="idx_sent_group_messages_timestamp_group_id"),
+            Index(fields=("status", "timestamp"), name="idx_sent_group_messages_status_timestamp"),
+        )
 
 class SentUserMessage(models.Model):
     """发送的用户私聊消息记录"""
@@ -81,6 +98,10 @@ class SentUserMessage(models.Model):
     class Meta:
         table = "sent_user_messages"
         app = "messagesent"
+        indexes = (
+            Index(fields=("timestamp", "user_id"), name="idx_sent_user_messages_timestamp_user_id"),
+            Index(fields=("status", "timestamp"), name="idx_sent_user_messages_status_timestamp"),
+        )
 
 class SentChannelMessage(models.Model):
     """发送的频道公开消息记录"""
@@ -96,6 +117,10 @@ class SentChannelMessage(models.Model):
     class Meta:
         table = "sent_channel_messages"
         app = "messagesent"
+        indexes = (
+            Index(fields=("timestamp", "channel_id"), name="idx_sent_channel_messages_timestamp_channel_id"),
+            Index(fields=("status", "timestamp"), name="idx_sent_channel_messages_status_timestamp"),
+        )
 
 class SentChannelPrivateMessage(models.Model):
     """发送的频道私聊消息记录"""
@@ -109,4 +134,46 @@ class SentChannelPrivateMessage(models.Model):
     
     class Meta:
         table = "sent_channel_private_messages"
-        app = "messagesent"
\ No newline at end of file
+        app = "messagesent"
+        indexes = (
+            Index(fields=("timestamp", "guild_id"), name="idx_sent_channel_private_messages_timestamp_guild_id"),
+            Index(fields=("status", "timestamp"), name="idx_sent_channel_private_messages_status_timestamp"),
+        )
+
+class MessageRollupHourly(models.Model):
+    """每小时收发消息数汇总"""
+    id = fields.IntField(pk=True)
+    bucket = fields.IntField()  # 该小时起点的时间戳（本地时间）
+    direction = fields.CharField(max_length=8)  # received/sent
+    kind = fields.CharField(max_length=16)  # group/user/channel/dms
+    target = fields.CharField(max_length=255)  # 群ID/用户ID/子频道ID/频道ID
+    count = fields.IntField(default=0)
+
+    class Meta:
+        table = "message_rollup_hourly"
+        app = "message"
+        unique_together = (("bucket", "direction", "kind", "target"),)
+
+class MessageRollupDaily(models.Model):
+    """每天收发消息数汇总"""
+    id = fields.IntField(pk=True)
+    bucket = fields.IntField()  # 当天零点的时间戳（本地时间）
+    direction = fields.CharField(max_length=8)
+    kind = fields.CharField(max_length=16)
+    target = fields.CharField(max_length=255)
+    count = fields.IntField(default=0)
+
+    class Meta:
+        table = "message_rollup_daily"
+        app = "message"
+        unique_together = (("bucket", "direction", "kind", "target"),)
+
+class RollupState(models.Model):
+    """汇总表的历史数据回填进度"""
+    name = fields.CharField(max_length=64, pk=True)  # 来源表名
+    upto_id = fields.IntField(default=0)  # 需要回填的最大记录ID（启用汇总时该表的最大ID）
+    done_id = fields.IntField(default=0)  # 已回填到的记录ID
+
+    class Meta:
+        table = "rollup_state"
+        app = "message"
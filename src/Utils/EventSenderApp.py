@@ -1,7 +1,13 @@
+from datetime import datetime
+
 from tortoise.exceptions import IntegrityError
 from tortoise.functions import Count
 
 from src.Utils.Logger import logger
+from src.Utils.Config import config
+from src.Utils.BatchWriter import BatchWriter
+from src.Utils.MessageState import STAT_KINDS, message_counters
+from src.Utils.MessageRollup import message_rollup
 from src.Utils.EventSender import (
     GroupMessage,
     UserMessage,
@@ -36,6 +42,7 @@ class MessageStore:
                 message=message,
                 message_id=message_id
             )
+            message_counters.incr("received", "group", group_id)
             return True
         except IntegrityError as e:
             # 处理消息ID重复的情况
@@ -59,6 +66,7 @@ class MessageStore:
                 message=message,
                 message_id=message_id
             )
+            message_counters.incr("received", "user", user_id)
             return True
         except IntegrityError as e:
             logger.error(f"保存私聊消息失败: {e}")
@@ -84,6 +92,7 @@ class MessageStore:
                 message=message,
                 message_id=message_id
             )
+            message_counters.incr("received", "channel", channel_id)
             return True
         except IntegrityError as e:
             logger.error(f"保存频道消息失败: {e}")
@@ -109,6 +118,7 @@ class MessageStore:
                 message=message,
                 message_id=message_id
             )
+            message_counters.incr("received", "dms", guild_id)
             return True
         except IntegrityError as e:
             logger.error(f"保存频道私聊消息失败: {e}")
@@ -118,46 +128,119 @@ class MessageStore:
             return False
     
     @staticmethod
-    async def save_from_event(event) -> bool:
-        """根据事件类型自动保存消息"""
-        
+    def enqueue_from_event(event) -> bool:
+        """根据事件类型将消息放入批量写入缓冲区（不等待落盘）"""
+
         if isinstance(event, GroupMessageEvent):
-            return await MessageStore.save_group_message(
-                group_id=event.group_id,
-                user_id=event.user_id,
-                message=event.content,
-                message_id=event.msg_id
-            )
-        
+            kind, target, fields = "group", event.group_id, {
+                "group_id": event.group_id,
+                "user_id": event.user_id,
+            }
+
         elif isinstance(event, PrivateMessageEvent):
-            return await MessageStore.save_user_message(
-                user_id=event.user_id,
-                message=event.content,
-                message_id=event.msg_id
-            )
-        
+            kind, target, fields = "user", event.user_id, {
+                "user_id": event.user_id,
+            }
+
         elif isinstance(event, GuildMessageEvent) and event.t == "AT_MESSAGE_CREATE":
-            return await MessageStore.save_channel_message(
-                channel_id=event.channel_id,
-                guild_id=event.guild_id,
-                user_id=event.user_id,
-                message=event.content,
-                message_id=event.msg_id
-            )
-        
+            kind, target, fields = "channel", event.channel_id, {
+                "channel_id": event.channel_id,
+                "guild_id": event.guild_id,
+                "user_id": event.user_id,
+            }
+
         elif isinstance(event, GuildMessageEvent) and event.t == "DIRECT_MESSAGE_CREATE":
-            return await MessageStore.save_channel_private_message(
-                channel_id=event.channel_id,
-                guild_id=event.guild_id,
-                user_id=event.user_id,
-                message=event.content,
-                message_id=event.msg_id
-            )
-        
-        return False
-    
+            kind, target, fields = "dms", event.guild_id, {
+                "channel_id": event.channel_id,
+                "guild_id": event.guild_id,
+                "user_id": event.user_id,
+            }
+
+        else:
+            return False
+
+        now = datetime.now()
+        message_counters.incr("received", kind, target)
+        message_rollup.incr("received", kind, target, now)
+        return message_writer.add(
+            kind,
+            message=event.content,
+            message_id=event.msg_id,
+            timestamp=now,
+            **fields
+        )
+
+    @staticmethod
+    async def save_from_event(event) -> bool:
+        """根据事件类型自动保存消息（放入批量写入缓冲区，由后台协程写入）"""
+        return MessageStore.enqueue_from_event(event)
+
+
+message_writer = BatchWriter(
+    name="消息记录",
+    connection="message",
+    models={
+        "group": GroupMessage,
+        "user": UserMessage,
+        "channel": ChannelMessage,
+        "dms": ChannelPrivateMessage,
+    },
+    flush_interval=config.BatchWrite.flush_interval,
+    max_batch=config.BatchWrite.max_batch,
+    max_buffer=config.BatchWrite.max_buffer,
+    overflow=config.BatchWrite.overflow,
+    spill_path=f"{config.BatchWrite.spill_dir}/message.jsonl",
+    dead_letter_path=f"{config.BatchWrite.spill_dir}/message.dead.jsonl",
+    unique_field="message_id",
+)
+
+sent_writer = BatchWriter(
+    name="发信记录",
+    connection="messagesent",
+    models={
+        "group": SentGroupMessage,
+        "user": SentUserMessage,
+        "channel": SentChannelMessage,
+        "dms": SentChannelPrivateMessage,
+    },
+    flush_interval=config.BatchWrite.flush_interval,
+    max_batch=config.BatchWrite.max_batch,
+    max_buffer=config.BatchWrite.max_buffer,
+    overflow=config.BatchWrite.overflow,
+    spill_path=f"{config.BatchWrite.spill_dir}/message_sent.jsonl",
+    dead_letter_path=f"{config.BatchWrite.spill_dir}/message_sent.dead.jsonl",
+)
+
+
 class SentMessageStore:
     """发送消息记录工具类"""
+
+    @staticmethod
+    def record_sent(
+        message_type: str,
+        status: str,
+        message_id: str = None,
+        error_info: str = None,
+        **fields
+    ) -> bool:
+        """记录一条已有最终结果的发送消息（批量写入，不等待落盘）
+
+        :param message_type: 消息类型 group/user/channel/dms
+        :param fields: 对应模型的其余字段（如group_id、message、timestamp）
+        """
+        if fields.get("message") is None:
+            fields["message"] = ""  # markdown/ark/富媒体消息没有文本内容
+        target = fields.get(STAT_KINDS[message_type][1]) if message_type in STAT_KINDS else None
+        if target is not None:
+            message_counters.incr("sent", message_type, target)
+            message_rollup.incr("sent", message_type, target, fields.get("timestamp"))
+        return sent_writer.add(
+            message_type,
+            status=status,
+            message_id=message_id,
+            error_info=error_info,
+            **fields
+        )
     
     @staticmethod
     async def log_sent_group_message(
@@ -168,6 +251,7 @@ class SentMessageStore:
         error_info: str = None
     ) -> SentGroupMessage:
         """记录发送的群消息"""
+        message_counters.incr("sent", "group", group_id)
         return await SentGroupMessage.create(
             group_id=group_id,
             message=message,
@@ -185,6 +269,7 @@ class SentMessageStore:
         error_info: str = None
     ) -> SentUserMessage:
         """记录发送的用户私聊消息"""
+        message_counters.incr("sent", "user", user_id)
         return await SentUserMessage.create(
             user_id=user_id,
             message=message,
@@ -203,6 +288,7 @@ class SentMessageStore:
         error_info: str = None
     ) -> SentChannelMessage:
         """记录发送的频道公开消息"""
+        message_counters.incr("sent", "channel", channel_id)
         return await SentChannelMessage.create(
             channel_id=channel_id,
             guild_id=guild_id,
@@ -221,6 +307,7 @@ class SentMessageStore:
         error_info: str = None
     ) -> SentChannelPrivateMessage:
         """记录发送的频道私聊消息"""
+        message_counters.incr("sent", "dms", guild_id)
         return await SentChannelPrivateMessage.create(
             guild_id=guild_id,
             message=message,
@@ -296,22 +383,12 @@ async def channel_private_message_stats():
     ).group_by("guild_id").values("guild_id", "count")
 
 async def get_message_statistics():
-    """获取所有类型的收发消息统计"""
+    """获取所有类型的收发消息统计（累计值，来自内存计数）"""
+    stats = message_counters.get_stats(since_start=False)
     return {
-        "group": {
-            "received": await GroupMessage.all().count(),
-            "sent": await SentGroupMessage.all().count()
-        },
-        "channel": {
-            "received": await ChannelMessage.all().count(),
-            "sent": await SentChannelMessage.all().count()
-        },
-        "channel_private": {
-            "received": await ChannelPrivateMessage.all().count(),
-            "sent": await SentChannelPrivateMessage.all().count()
-        },
-        "private": {
-            "received": await UserMessage.all().count(),
-            "sent": await SentUserMessage.all().count()
+        name: {
+            "received": stats["received"][name]["total"],
+            "sent": stats["sent"][name]["total"]
         }
+        for name in ("group", "channel", "channel_private", "private")
     }
\ No newline at end of file
@@ -1,45 +1,171 @@
-import threading, requests, time
+import asyncio, random, time
+from typing import Optional
 
 from src.Utils.Logger import logger
 from src.Utils.Config import config
 from src.Utils.EventClass import AccessTokenPayload
+from src.Utils.HttpClient import get_session
+
+TOKEN_URL = "https://bots.qq.com/app/getAppAccessToken"
 
 ACCESS_TOKEN = ""
-TOKEN_LOCK = threading.Lock()
-
-def token_manager():
-    while True:
-        logger.debug("正在获取access_token...")
-        try:
-            # 添加超时和重试机制
-            response = requests.post(
-                "https://bots.qq.com/app/getAppAccessToken",
-                json={"appId": str(config.Bot.appid), "clientSecret": config.Bot.appsecret},
-                timeout=10
-            )
-            response.raise_for_status()  # 修复：添加括号调用方法
-            
-            token_data = AccessTokenPayload(**response.json())
-            logger.debug(f"获取AccessToken成功，token: {token_data.access_token} 将于 {token_data.expires_in}s后过期")
-            
-            with TOKEN_LOCK:
-                global ACCESS_TOKEN
-                ACCESS_TOKEN = token_data.access_token
-            
-            # 分段睡眠，避免长时间阻塞
-            sleep_time = token_data.expires_in - 30
-            while sleep_time > 0:
-                chunk = min(sleep_time, 300)  # 每5分钟唤醒一次
-                time.sleep(chunk)
-                sleep_time -= chunk
-                
-        except requests.exceptions.RequestException as e:
-            logger.error(f"请求失败: {str(e)}")
-            time.sleep(10)  # 短时间等待后重试
-        except Exception as e:
-            logger.error(f"意外错误: {str(e)}")
-            time.sleep(30)
+"""当前的access_token（兼容旧代码，新代码请使用 token_manager.token）"""
+
+
+class AccessTokenManager:
+    """AccessToken管理器
+
+    在事件循环中用一个后台协程维护access_token：
+    - 在令牌过期前refresh_ahead秒（带随机抖动）主动刷新，不会出现令牌过期的空窗
+    - 获取失败时按带随机抖动的指数退避重试
+    - 发信遇到401时调用refresh(stale)，同一时刻只会发起一次刷新，其余调用方等待同一结果
+    - 首次获取成功前，wait_ready()会一直等待，避免用空令牌发出请求
+
+    热路径上读取token属性只是一次属性访问
+    """
+
+    def __init__(self, appid: str, secret: str, refresh_ahead: float = 60, retry_max: float = 60):
+        self.appid = appid
+        self.secret = secret
+        self.refresh_ahead = refresh_ahead
+        self.retry_max = retry_max
+        self.token = ""
+        self.expires_at = 0.0
+        self._ready: Optional[asyncio.Event] = None
+        self._refreshing: Optional[asyncio.Future] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"refreshed": 0, "failed": 0, "forced": 0}
+
+    def _ensure_events(self):
+        if self._ready is None:
+            self._ready = asyncio.Event()
+            self._wakeup = asyncio.Event()
+
+    def start(self):
+        """启动后台刷新协程（需在事件循环中调用）"""
+        self._ensure_events()
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        """停止后台刷新协程"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    @property
+    def ready(self) -> bool:
+        """是否已获取到未过期的令牌"""
+        return bool(self.token) and time.time() < self.expires_at
+
+    async def wait_ready(self, timeout: Optional[float] = None) -> str:
+        """等待首次获取令牌成功并返回令牌
+
+        :raises asyncio.TimeoutError: 超过timeout仍未获取到令牌
+        """
+        if self.token:
+            return self.token
+        self._ensure_events()
+        if self._task is None:
+            self.start()
+        await asyncio.wait_for(self._ready.wait(), timeout=timeout)
+        return self.token
+
+    async def refresh(self, stale: Optional[str] = None) -> str:
+        """立即刷新令牌（single-flight）
+
+        :param stale: 调用方被拒绝时使用的令牌；若当前令牌已与之不同，说明已被其他调用方刷新，直接返回
+        """
+        if stale is not None and self.token and self.token != stale:
+            return self.token
+        if self._refreshing is None:
+            self._stats["forced"] += 1
+            self._refreshing = asyncio.ensure_future(self._fetch())
+            self._refreshing.add_done_callback(self._clear_refreshing)
+        return await asyncio.shield(self._refreshing)
+
+    def _clear_refreshing(self, future: asyncio.Future):
+        self._refreshing = None
+        if not future.cancelled() and future.exception() is None and self._wakeup is not None:
+            # 提前刷新成功后，让后台协程按新的过期时间重新计时
+            self._wakeup.set()
+
+    async def _fetch(self) -> str:
+        logger.debug("AccessToken >>> 正在获取access_token...")
+        async with get_session().post(
+            TOKEN_URL,
+            json={"appId": str(self.appid), "clientSecret": self.secret},
+        ) as response:
+            response.raise_for_status()
+            token_data = AccessTokenPayload(**(await response.json(content_type=None)))
+        if not token_data.access_token:
+            raise ValueError("开放平台返回的access_token为空")
+        self._publish(token_data)
+        return self.token
+
+    def _publish(self, token_data: AccessTokenPayload):
+        global ACCESS_TOKEN
+        self.token = ACCESS_TOKEN = token_data.access_token
+        self.expires_at = time.time() + token_data.expires_in
+        self._stats["refreshed"] += 1
+        self._ensure_events()
+        self._ready.set()
+        logger.debug(f"AccessToken >>> 获取成功，将于 {token_data.expires_in}s后过期")
+
+    def _next_refresh_delay(self) -> float:
+        remaining = self.expires_at - time.time()
+        # 在 [refresh_ahead, 2*refresh_ahead] 之间随机提前刷新，避免多实例同时刷新
+        ahead = self.refresh_ahead * (1 + random.random())
+        return max(1.0, remaining - ahead)
+
+    async def _refresh_loop(self):
+        failures = 0
+        while True:
+            try:
+                if self._refreshing is None:
+                    self._refreshing = asyncio.ensure_future(self._fetch())
+                    self._refreshing.add_done_callback(self._clear_refreshing)
+                await asyncio.shield(self._refreshing)
+                failures = 0
+            except Exception as e:
+                failures += 1
+                self._stats["failed"] += 1
+                delay = random.uniform(0, min(self.retry_max, 2 ** failures))
+                logger.error(f"AccessToken >>> 获取失败: {e}，{delay:.1f}s后重试")
+                await asyncio.sleep(delay)
+                continue
+            # 等待到下一次刷新时间；期间若被401触发了刷新，则按新的过期时间重新计时
+            while True:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self._next_refresh_delay())
+                except asyncio.TimeoutError:
+                    break
+
+    def get_stats(self):
+        """获取令牌刷新统计信息"""
+        stats = dict(self._stats)
+        stats.update({
+            "ready": self.ready,
+            "expires_in": max(0, round(self.expires_at - time.time())),
+        })
+        return stats
+
+
+token_manager = AccessTokenManager(
+    appid=config.Bot.appid,
+    secret=config.Bot.appsecret,
+    refresh_ahead=config.AccessToken.refresh_ahead,
+    retry_max=config.AccessToken.retry_max,
+)
+
 
 async def get_access_token():
-    # 启动线程
-    threading.Thread(target=token_manager, daemon=True, name="AccessToekn 鉴权获取线程").start()
\ No newline at end of file
+    """启动AccessToken管理器并等待首次获取完成"""
+    token_manager.start()
+    try:
+        await token_manager.wait_ready(timeout=config.AccessToken.ready_timeout or None)
+    except asyncio.TimeoutError:
+        logger.warning(f"AccessToken >>> {config.AccessToken.ready_timeout}s内未能获取access_token，发信将等待获取成功后进行")
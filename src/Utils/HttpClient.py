@@ -0,0 +1,60 @@
+import aiohttp
+from typing import Optional
+
+from src.Utils.Logger import logger
+from src.Utils.Config import config
+
+
+"""
+共享HTTP客户端
+
+整个应用共用一个aiohttp.ClientSession，由FastAPI生命周期负责创建与关闭，
+连接池复用到同一主机的TCP/TLS连接，并缓存DNS解析结果
+"""
+
+
+_session: Optional[aiohttp.ClientSession] = None
+
+
+def _create_session() -> aiohttp.ClientSession:
+    connector = aiohttp.TCPConnector(
+        limit=config.Http.limit,
+        limit_per_host=config.Http.limit_per_host,
+        ttl_dns_cache=config.Http.dns_cache_ttl,
+        keepalive_timeout=config.Http.keepalive_timeout,
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=config.Http.total_timeout or None,
+        connect=config.Http.connect_timeout or None,
+        sock_read=config.Http.read_timeout or None,
+    )
+    return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+
+async def start_http_client() -> aiohttp.ClientSession:
+    """创建共享客户端（需在事件循环中调用）"""
+    global _session
+    if _session is None or _session.closed:
+        _session = _create_session()
+        logger.info(f"HTTP客户端 >>> 已创建共享连接池，总连接数上限 {config.Http.limit}，单主机上限 {config.Http.limit_per_host}")
+    return _session
+
+
+def get_session() -> aiohttp.ClientSession:
+    """获取共享客户端
+
+    请勿对返回的session使用 async with 或调用close()，它由框架统一关闭；
+    未经生命周期启动（例如在独立脚本中）时会按需创建
+    """
+    global _session
+    if _session is None or _session.closed:
+        _session = _create_session()
+    return _session
+
+
+async def close_http_client():
+    """关闭共享客户端及其连接池"""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
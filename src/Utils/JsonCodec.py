@@ -0,0 +1,144 @@
+import json
+from typing import Any, Dict, Optional, Union
+
+try:
+    import msgspec
+except ImportError:  # 可选依赖 pip install msgspec
+    msgspec = None
+try:
+    import orjson
+except ImportError:  # 可选依赖 pip install orjson
+    orjson = None
+
+
+"""
+Webhook数据包解码
+
+按 msgspec > orjson > json 的顺序选择可用的后端，均直接解析bytes，无需先decode为str
+"""
+
+
+if msgspec is not None:
+    BACKEND = "msgspec"
+
+    class _Envelope(msgspec.Struct):
+        """仅解析外层字段，d字段保留为原始字节切片"""
+        op: Any = -1
+        s: Any = 0
+        t: Any = ""
+        id: Any = ""
+        d: msgspec.Raw = msgspec.Raw(b"null")
+
+    class _Author(msgspec.Struct):
+        union_openid: Any = ""
+
+    class _ConversationIds(msgspec.Struct):
+        """仅解析d字段中的会话ID，其余字段直接跳过"""
+        group_id: Any = ""
+        group_openid: Any = ""
+        channel_id: Any = ""
+        guild_id: Any = ""
+        author: Optional[_Author] = None
+
+    _envelope_decoder = msgspec.json.Decoder(_Envelope)
+    _ids_decoder = msgspec.json.Decoder(_ConversationIds)
+    loads = msgspec.json.Decoder().decode
+    dumps = msgspec.json.Encoder().encode
+elif orjson is not None:
+    BACKEND = "orjson"
+    loads = orjson.loads
+    dumps = orjson.dumps
+else:
+    BACKEND = "json"
+
+    def loads(data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+    def dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+class Envelope:
+    """Webhook数据包外层
+
+    op/s/t/id 在构造时即可用，d字段在首次访问时才解码
+    """
+    __slots__ = ("op", "s", "t", "id", "_d", "_d_raw")
+
+    def __init__(self, op: int = -1, s: int = 0, t: str = "", id: str = "", d: Any = None, d_raw: Any = None):
+        self.op = op
+        self.s = s
+        self.t = t
+        self.id = id
+        self._d = d
+        self._d_raw = d_raw
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Envelope":
+        """从已解析的字典创建"""
+        return cls(
+            op=data.get("op", -1),
+            s=data.get("s", 0),
+            t=data.get("t", ""),
+            id=data.get("id", ""),
+            d=data.get("d"),
+        )
+
+    @property
+    def d(self) -> Any:
+        """d字段（首次访问时解码）"""
+        if self._d_raw is not None:
+            self._d = loads(self._d_raw)
+            self._d_raw = None
+        return self._d if self._d is not None else {}
+
+    def peek_ids(self) -> Dict[str, Any]:
+        """读取d字段中的会话ID（group_id/group_openid/channel_id/guild_id与author.union_openid）
+
+        msgspec后端下d字段尚未解码时只解析这几个字段，不会解码整个d字段
+        """
+        if self._d_raw is not None and msgspec is not None:
+            try:
+                ids = _ids_decoder.decode(self._d_raw)
+            except msgspec.DecodeError:
+                pass  # 字段类型不符时按完整解码处理
+            else:
+                return {
+                    "group_id": ids.group_id,
+                    "group_openid": ids.group_openid,
+                    "channel_id": ids.channel_id,
+                    "guild_id": ids.guild_id,
+                    "union_openid": ids.author.union_openid if ids.author is not None else "",
+                }
+        d = self.d
+        if not isinstance(d, dict):
+            return {}
+        author = d.get("author")
+        return {
+            "group_id": d.get("group_id", ""),
+            "group_openid": d.get("group_openid", ""),
+            "channel_id": d.get("channel_id", ""),
+            "guild_id": d.get("guild_id", ""),
+            "union_openid": author.get("union_openid", "") if isinstance(author, dict) else "",
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"op": self.op, "s": self.s, "t": self.t, "id": self.id, "d": self.d}
+
+
+def decode_envelope(body: Union[bytes, bytearray, memoryview, str]) -> Envelope:
+    """解析Webhook数据包
+
+    msgspec后端下仅解析外层字段，d字段保持为原始字节直到首次访问；
+    其他后端会一次性解析全部内容，但同样不会构建任何事件对象
+
+    Raises:
+        ValueError: 数据包不是合法的JSON对象
+    """
+    if msgspec is not None:
+        raw = _envelope_decoder.decode(body)
+        return Envelope(raw.op, raw.s, raw.t, raw.id, d_raw=raw.d)
+    data = loads(body)
+    if not isinstance(data, dict):
+        raise ValueError("Webhook payload must be a JSON object")
+    return Envelope.from_dict(data)
@@ -0,0 +1,221 @@
+import asyncio, glob, os, re, time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Type
+
+from tortoise.models import Model
+from tortoise.transactions import in_transaction
+
+from src.Utils.Logger import logger
+from src.Utils.Config import config
+from src.Utils.MessageState import STAT_KINDS
+
+_CREATE_TABLE = re.compile(r'^CREATE TABLE (?:IF NOT EXISTS )?"?\w+"?', re.IGNORECASE)
+
+
+def _message_models() -> List[Type[Model]]:
+    models = []
+    for _, _, received_model, sent_model in STAT_KINDS.values():
+        models.extend((received_model, sent_model))
+    return models
+
+
+class MessageRetention:
+    """消息记录保留期与归档
+
+    后台协程每隔interval秒检查各消息表，将超过保留天数的记录按batch_size条一批处理：
+    - archive为True时，按记录所在月份移入归档目录下的月度数据库文件（如 message_202601.db），
+      归档库通过ATTACH挂载，表结构与原表一致，重复执行不会产生重复记录
+    - archive为False时直接删除
+    每批单独提交并在批次之间让出，不会长时间持有写锁；处理完后执行 PRAGMA incremental_vacuum 归还空闲页
+    """
+
+    def __init__(
+        self,
+        enable: bool = False,
+        default_days: int = 0,
+        tables: Optional[Dict[str, int]] = None,
+        archive: bool = True,
+        archive_dir: str = "data/archive",
+        interval: float = 3600,
+        batch_size: int = 500,
+        batch_pause: float = 0.05,
+        vacuum_pages: int = 1000,
+    ):
+        """
+        :param default_days: 默认保留天数，0表示永久保留
+        :param tables: 表名 -> 保留天数，覆盖默认值
+        """
+        self.enable = enable
+        self.default_days = default_days
+        self.tables = tables or {}
+        self.archive = archive
+        self.archive_dir = archive_dir
+        self.interval = interval
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+        self.vacuum_pages = vacuum_pages
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"runs": 0, "archived": 0, "deleted": 0, "errors": 0, "last_run": None, "last_duration": 0.0}
+        self._warned_auto_vacuum = set()
+
+    def retention_days(self, model: Type[Model]) -> int:
+        """获取表的保留天数（0表示永久保留）"""
+        return self.tables.get(model._meta.db_table, self.default_days)
+
+    def start(self):
+        """启动后台压缩协程（需在数据库初始化后调用）"""
+        if not self.enable or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        """停止后台压缩协程"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            await self.run()
+            await asyncio.sleep(self.interval)
+
+    async def run(self):
+        """执行一次保留期检查与压缩"""
+        started = time.monotonic()
+        touched = {}
+        for model in _message_models():
+            days = self.retention_days(model)
+            if days <= 0:
+                continue
+            cutoff = datetime.now() - timedelta(days=days)
+            try:
+                if await self._compact_table(model, cutoff):
+                    touched[model._meta.default_connection] = model._meta.db
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.error(f"消息归档 >>> 处理 {model._meta.db_table} 失败: {e}")
+        for name, client in touched.items():
+            await self._incremental_vacuum(name, client)
+        self._stats["runs"] += 1
+        self._stats["last_run"] = time.strftime("%Y-%m-%d %H:%M:%S")
+        self._stats["last_duration"] = round(time.monotonic() - started, 3)
+
+    async def _compact_table(self, model: Type[Model], cutoff: datetime) -> int:
+        """分批处理早于cutoff的记录，返回处理的记录数"""
+        client = model._meta.db
+        table = model._meta.db_table
+        total = 0
+        while True:
+            rows = await model.filter(timestamp__lt=cutoff).order_by("id").limit(self.batch_size).values_list("id", "timestamp")
+            if not rows:
+                break
+            if self.archive:
+                by_month: Dict[str, List[int]] = {}
+                for record_id, timestamp in rows:
+                    by_month.setdefault(timestamp.strftime("%Y%m"), []).append(record_id)
+                for month, ids in by_month.items():
+                    await self._archive_ids(client, model, month, ids)
+                self._stats["archived"] += len(rows)
+            else:
+                ids = [record_id for record_id, _ in rows]
+                await client.execute_query(
+                    f'DELETE FROM "{table}" WHERE id IN ({",".join("?" * len(ids))})', ids
+                )
+                self._stats["deleted"] += len(rows)
+            total += len(rows)
+            # 批次之间让出写锁，避免阻塞消息写入
+            await asyncio.sleep(self.batch_pause)
+        if total:
+            action = "归档" if self.archive else "删除"
+            logger.info(f"消息归档 >>> 已{action} {table} 中 {total} 条早于 {cutoff:%Y-%m-%d} 的记录")
+        return total
+
+    def archive_path(self, model: Type[Model], month: str) -> str:
+        """归档库文件路径：<归档目录>/<原库文件名>_<年月>.db"""
+        base = os.path.splitext(os.path.basename(model._meta.db.filename))[0]
+        return os.path.join(self.archive_dir, f"{base}_{month}.db")
+
+    async def _archive_ids(self, client, model: Type[Model], month: str, ids: List[int]):
+        table = model._meta.db_table
+        path = self.archive_path(model, month)
+        os.makedirs(self.archive_dir, exist_ok=True)
+        placeholders = ",".join("?" * len(ids))
+        # ATTACH不能在事务中执行，先挂载归档库，再在一个事务中复制并删除
+        await client.execute_query("ATTACH DATABASE ? AS archive", [path])
+        try:
+            _, schema = await client.execute_query(
+                "SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = ?", [table]
+            )
+            create_sql = _CREATE_TABLE.sub(f'CREATE TABLE IF NOT EXISTS archive."{table}"', schema[0][0], count=1)
+            await client.execute_script(create_sql)
+            async with in_transaction(model._meta.default_connection) as conn:
+                await conn.execute_query(
+                    f'INSERT OR IGNORE INTO archive."{table}" SELECT * FROM main."{table}" WHERE id IN ({placeholders})', ids
+                )
+                await conn.execute_query(f'DELETE FROM main."{table}" WHERE id IN ({placeholders})', ids)
+        finally:
+            await client.execute_query("DETACH DATABASE archive")
+
+    async def _incremental_vacuum(self, name: str, client):
+        try:
+            _, rows = await client.execute_query("PRAGMA auto_vacuum")
+            if rows[0][0] != 2:
+                if name not in self._warned_auto_vacuum:
+                    self._warned_auto_vacuum.add(name)
+                    logger.warning(
+                        f"消息归档 >>> 数据库 {name} 未启用 auto_vacuum=INCREMENTAL，删除记录后的空间不会归还；"
+                        f"可在停机时对该库执行一次 VACUUM 使配置档中的 auto_vacuum 生效"
+                    )
+                return
+            pages = f"({self.vacuum_pages})" if self.vacuum_pages else ""
+            # incremental_vacuum每执行一步只归还一页，execute_query只执行一步，需用execute_script执行到底
+            await client.execute_script(f"PRAGMA incremental_vacuum{pages};")
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.error(f"消息归档 >>> 数据库 {name} 执行 incremental_vacuum 失败: {e}")
+
+    def get_partitions(self) -> List[Dict[str, Any]]:
+        """列出当前数据库与各月度归档库的文件大小"""
+        partitions = []
+        seen = set()
+        for model in _message_models():
+            try:
+                path = model._meta.db.filename
+            except Exception:
+                continue
+            if path in seen:
+                continue
+            seen.add(path)
+            partitions.append(_file_info(path, "current"))
+        for path in sorted(glob.glob(os.path.join(self.archive_dir, "*.db"))):
+            partitions.append(_file_info(path, "archive"))
+        return partitions
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取归档统计信息"""
+        stats = dict(self._stats)
+        stats.update({
+            "enable": self.enable,
+            "archive": self.archive,
+            "retention": {model._meta.db_table: self.retention_days(model) for model in _message_models()},
+        })
+        return stats
+
+
+def _file_info(path: str, kind: str) -> Dict[str, Any]:
+    size = sum(os.path.getsize(p) for p in (path, path + "-wal") if os.path.exists(p))
+    return {"name": os.path.basename(path), "type": kind, "size": f"{size / (1024 * 1024):.2f} MB", "bytes": size}
+
+
+message_retention = MessageRetention(
+    enable=config.Retention.enable,
+    default_days=config.Retention.default_days,
+    tables=config.Retention.tables,
+    archive=config.Retention.archive,
+    archive_dir=config.Retention.archive_dir,
+    interval=config.Retention.interval,
+    batch_size=config.Retention.batch_size,
+    batch_pause=config.Retention.batch_pause,
+    vacuum_pages=config.Retention.vacuum_pages,
+)
@@ -0,0 +1,222 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from tortoise.functions import Sum
+from tortoise.transactions import in_transaction
+
+from src.Utils.Logger import logger
+from src.Utils.Config import config
+from src.Utils.EventSender import MessageRollupHourly, MessageRollupDaily, RollupState
+from src.Utils.MessageState import STAT_KINDS
+
+# 粒度 -> (汇总模型, 由时间计算桶起点的函数)
+GRANULARITIES = {
+    "hour": (MessageRollupHourly, lambda dt: dt.replace(minute=0, second=0, microsecond=0)),
+    "day": (MessageRollupDaily, lambda dt: dt.replace(hour=0, minute=0, second=0, microsecond=0)),
+}
+
+_UPSERT_SQL = (
+    "INSERT INTO {table} (bucket, direction, kind, target, count) VALUES (?, ?, ?, ?, ?) "
+    "ON CONFLICT (bucket, direction, kind, target) DO UPDATE SET count = count + excluded.count"
+)
+
+RollupKey = Tuple[int, str, str, str]
+
+
+def bucket_of(granularity: str, dt: datetime) -> int:
+    """计算时间所在汇总桶的起点时间戳
+
+    消息时间均为本地时间（datetime.now()），但Tortoise在SQLite上读出时会把它标为UTC，
+    因此先去掉时区信息，统一按本地时间计算，回填与incr()的同一时间落在同一个桶中
+    """
+    return int(GRANULARITIES[granularity][1](dt.replace(tzinfo=None)).timestamp())
+
+
+def to_local(dt: datetime) -> datetime:
+    """把带时区的查询时间换算为本地时间并去掉时区信息，不带时区的时间视为本地时间"""
+    return dt.astimezone().replace(tzinfo=None) if dt.tzinfo is not None else dt
+
+
+class MessageRollup:
+    """收发消息的小时/天汇总
+
+    消息入库或发出时调用incr()在内存中累加增量，后台协程每隔flush_interval秒
+    以 INSERT ... ON CONFLICT DO UPDATE SET count = count + excluded.count 合并进汇总表，
+    查询时间段统计只需读取汇总表，与原始消息表的大小无关。
+
+    首次启用时记录各消息表当前的最大ID，之后由后台协程按ID分块回填这之前的历史记录，
+    回填进度与汇总增量在同一个事务中提交，中断后从上次的进度继续
+    """
+
+    def __init__(self, enable: bool = True, connection: str = "message", flush_interval: float = 10, backfill_chunk: int = 5000):
+        self.enable = enable
+        self.connection = connection
+        self.flush_interval = flush_interval
+        self.backfill_chunk = backfill_chunk
+        self._pending: Dict[str, Dict[RollupKey, int]] = {name: {} for name in GRANULARITIES}
+        self._task: Optional[asyncio.Task] = None
+        self._backfill_task: Optional[asyncio.Task] = None
+        self._stats = {"flushes": 0, "upserts": 0, "backfilled": 0, "errors": 0}
+
+    def incr(self, direction: str, kind: str, target: str, dt: Optional[datetime] = None, count: int = 1):
+        """累加一条消息
+
+        :param direction: received/sent
+        :param kind: 记录类型 group/channel/dms/user
+        :param target: 统计目标（群ID/子频道ID/频道ID/用户ID）
+        :param dt: 消息时间，默认当前时间
+        """
+        if not self.enable:
+            return
+        dt = dt or datetime.now()
+        for name, pending in self._pending.items():
+            key = (bucket_of(name, dt), direction, kind, target)
+            pending[key] = pending.get(key, 0) + count
+
+    async def start(self):
+        """初始化回填进度并启动后台协程（需在数据库初始化后调用）"""
+        if not self.enable or self._task is not None:
+            return
+        await self._init_backfill()
+        self._task = asyncio.create_task(self._flush_loop())
+        self._backfill_task = asyncio.create_task(self._backfill())
+
+    async def stop(self):
+        """停止后台协程并写入剩余的增量"""
+        for task in (self._backfill_task, self._task):
+            if task is not None:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        self._task = self._backfill_task = None
+        await self.flush()
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def flush(self):
+        """将内存中的增量合并进汇总表"""
+        pending, self._pending = self._pending, {name: {} for name in GRANULARITIES}
+        if not any(pending.values()):
+            return
+        try:
+            async with in_transaction(self.connection) as conn:
+                await self._upsert(conn, pending)
+            self._stats["flushes"] += 1
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.error(f"消息汇总 >>> 写入汇总表失败，将在下次重试: {e}")
+            for name, deltas in pending.items():
+                current = self._pending[name]
+                for key, count in deltas.items():
+                    current[key] = current.get(key, 0) + count
+
+    async def _upsert(self, conn, pending: Dict[str, Dict[RollupKey, int]]):
+        for name, deltas in pending.items():
+            if not deltas:
+                continue
+            model = GRANULARITIES[name][0]
+            await conn.execute_many(
+                _UPSERT_SQL.format(table=model._meta.db_table),
+                [[*key, count] for key, count in deltas.items()],
+            )
+            self._stats["upserts"] += len(deltas)
+
+    def _sources(self):
+        for kind, (_, field, received_model, sent_model) in STAT_KINDS.items():
+            yield "received", kind, field, received_model
+            yield "sent", kind, field, sent_model
+
+    async def _init_backfill(self):
+        for direction, kind, field, model in self._sources():
+            table = model._meta.db_table
+            if await RollupState.exists(name=table):
+                continue
+            latest = await model.all().order_by("-id").first().values_list("id", flat=True)
+            await RollupState.create(name=table, upto_id=latest or 0, done_id=0)
+
+    async def _backfill(self):
+        """按ID分块回填启用汇总前的历史记录"""
+        for direction, kind, field, model in self._sources():
+            state = await RollupState.get(name=model._meta.db_table)
+            while state.done_id < state.upto_id:
+                rows = await model.filter(id__gt=state.done_id, id__lte=state.upto_id).order_by("id").limit(
+                    self.backfill_chunk
+                ).values_list("id", "timestamp", field)
+                if not rows:
+                    state.done_id = state.upto_id
+                else:
+                    state.done_id = rows[-1][0]
+                deltas = {name: {} for name in GRANULARITIES}
+                for _, timestamp, target in rows:
+                    for name, chunk in deltas.items():
+                        key = (bucket_of(name, timestamp), direction, kind, target)
+                        chunk[key] = chunk.get(key, 0) + 1
+                try:
+                    async with in_transaction(self.connection) as conn:
+                        await self._upsert(conn, deltas)
+                        await RollupState.filter(name=state.name).using_db(conn).update(done_id=state.done_id)
+                except Exception as e:
+                    self._stats["errors"] += 1
+                    logger.error(f"消息汇总 >>> 回填 {state.name} 失败，将在下次启动时继续: {e}")
+                    return
+                self._stats["backfilled"] += len(rows)
+                # 让出事件循环，避免回填影响消息处理
+                await asyncio.sleep(0)
+            logger.debug(f"消息汇总 >>> {state.name} 历史记录回填完毕")
+
+    async def query_range(
+        self,
+        start: datetime,
+        end: datetime,
+        granularity: str = "hour",
+        direction: Optional[str] = None,
+        kind: Optional[str] = None,
+        target: Optional[str] = None,
+        by_target: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """查询时间段内各汇总桶的消息数（包含尚未写入汇总表的增量）
+
+        :param start: 起始时间（end同理），带时区的时间先换算为本地时间
+        :param by_target: 是否按统计目标分别返回
+        :return: 按时间排序的 [{"time", "count", ("direction", "kind", "target")}]
+        """
+        model = GRANULARITIES[granularity][0]
+        start, end = to_local(start), to_local(end)
+        lower, upper = bucket_of(granularity, start), int(end.timestamp())
+        filters = {"bucket__gte": lower, "bucket__lt": upper}
+        for name, value in (("direction", direction), ("kind", kind), ("target", target)):
+            if value:
+                filters[name] = value
+        group_fields = ["bucket", "direction", "kind", "target"] if by_target else ["bucket"]
+        rows = await model.filter(**filters).annotate(total=Sum("count")).group_by(*group_fields).values(
+            *group_fields, "total"
+        )
+        merged: Dict[tuple, int] = {tuple(row[f] for f in group_fields): row["total"] for row in rows}
+        for (bucket, d, k, t), count in self._pending[granularity].items():
+            if not lower <= bucket < upper or (direction and d != direction) or (kind and k != kind) or (target and t != target):
+                continue
+            key = (bucket, d, k, t) if by_target else (bucket,)
+            merged[key] = merged.get(key, 0) + count
+        result = []
+        for key in sorted(merged):
+            item = {"time": datetime.fromtimestamp(key[0]).isoformat(), "count": merged[key]}
+            if by_target:
+                item.update({"direction": key[1], "kind": key[2], "target": key[3]})
+            result.append(item)
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取汇总统计信息"""
+        stats = dict(self._stats)
+        stats["pending"] = {name: len(pending) for name, pending in self._pending.items()}
+        return stats
+
+
+message_rollup = MessageRollup(
+    enable=config.Rollup.enable,
+    flush_interval=config.Rollup.flush_interval,
+    backfill_chunk=config.Rollup.backfill_chunk,
+)
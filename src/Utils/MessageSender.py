@@ -1,5 +1,6 @@
-import aiohttp
-from datetime import datetime, timedelta
+import asyncio, time
+from datetime import datetime
+from typing import Any, Optional, Tuple
 
 from src.Utils.EventClass import (
     MediaPayload,
@@ -9,235 +10,191 @@ from src.Utils.EventClass import (
     MediaUploadPayload,
 )
 from src.Utils.Logger import logger
+from src.Utils.Config import config
+from src.Utils.HttpClient import get_session
+from src.Utils.SendScheduler import SendJob, SendScheduler
 from src.Utils.EventSenderApp import SentMessageStore
+from src.Utils.GetAccessToken import token_manager
 
 open_url = "https://api.sgroup.qq.com"
 
+# 消息类型 -> 发信接口
+SEND_ENDPOINTS = {
+    "group": "/v2/groups/{target}/messages",
+    "user": "/v2/users/{target}/messages",
+    "channel": "/channels/{target}/messages",
+    "dms": "/dms/{target}/messages",
+}
 
-async def send_group_message(group_openid, payload: MessageSenderBasePayload) -> None:
-    logger.debug(f"发送群聊消息 -> {group_openid}: {payload.content}")
-    from src.Utils.GetAccessToken import ACCESS_TOKEN
-
-    record = await SentMessageStore.log_sent_group_message(
-        group_id=group_openid, message=payload.content
-    )
-    async with aiohttp.ClientSession() as session:
-        async with session.post(
-            f"{open_url}/v2/groups/{group_openid}/messages",
-            json=payload.to_dict(),
+# 消息类型 -> 被动回复有效期（秒）
+REPLY_WINDOWS = {
+    "group": config.Send.group_reply_window,
+    "user": config.Send.user_reply_window,
+    "channel": config.Send.channel_reply_window,
+    "dms": config.Send.channel_reply_window,
+}
+
+
+def _reply_deadline(kind: str, payload: MessageSenderBasePayload, timestamp=None) -> Optional[float]:
+    """计算被动回复的截止时间
+
+    带有msg_id或event_id的消息为被动回复，有效期从事件时间开始计算，
+    事件时间未知时从提交时开始计算；主动消息返回None
+    """
+    if not (payload.msg_id or payload.event_id):
+        return None
+    started = time.time()
+    if timestamp:
+        try:
+            if isinstance(timestamp, (int, float)) or str(timestamp).isdigit():
+                started = float(timestamp)
+            else:
+                started = datetime.fromisoformat(str(timestamp)).timestamp()
+        except ValueError:
+            pass
+    return started + REPLY_WINDOWS[kind]
+
+
+async def _wait_token() -> str:
+    """获取access_token，未就绪时最多等待send_wait_timeout秒
+
+    :raises asyncio.TimeoutError: 超时仍未获取到令牌（如AppSecret错误）
+    """
+    return token_manager.token or await token_manager.wait_ready(timeout=config.AccessToken.send_wait_timeout)
+
+
+async def _post_message(job: SendJob) -> Tuple[int, Any]:
+    """发送一次消息，返回 (HTTP状态码, 响应体)
+
+    令牌未就绪时等待首次获取完成，超时则判定发送失败（不重试）；
+    遇到401时刷新令牌（多个请求共用同一次刷新）后重发一次
+    """
+    url = open_url + SEND_ENDPOINTS[job.kind].format(target=job.target)
+    data = job.payload.to_dict()
+    try:
+        token = await _wait_token()
+    except asyncio.TimeoutError:
+        logger.error(f"发信 >>> {config.AccessToken.send_wait_timeout}s内未能获取access_token，放弃发送，请检查AppID与AppSecret")
+        return -1, {"message": "access_token未就绪", "code": -1}
+    for attempt in range(2):
+        async with get_session().post(
+            url,
+            json=data,
             headers={
-                "Authorization": f"QQBot {ACCESS_TOKEN}",
+                "Authorization": f"QQBot {token}",
                 "Content-Type": "application/json",
             },
         ) as response:
-            if response.status == 200:
-                response_json: MessageSenderOverPayload = await response.json()
-                await SentMessageStore.update_message_status(
-                    record_id=record.id,
-                    message_type="group",
-                    status="success",
-                    message_id=response_json["id"],
-                )
-                return
-            elif response.status == 204:
-                logger.debug(f"发信 >>> 操作成功，本请求无包体")
-                return
-            elif response.status in [201, 202]:
-                logger.debug(f"发信 >>> 异步操作成功，但本请求存在问题")
-                response_json = await response.json()
-                logger.debug(f"发信 >>> 异步操作结果 -> {response_json}")
-                return
-            elif response.status == 401:
-                logger.debug(f"发信 >>> 错误：未授权，请检查access_token")
-            elif response.status == 404:
-                logger.debug(f"发信 >>> 错误：未找到，请检查群组ID")
-            elif response.status == 405:
-                logger.debug(f"发信 >>> 错误：方法错误，请检查请求方法")
-            elif response.status == 429:
-                logger.debug(f"发信 >>> 错误：请求被限制，请检查请求频率")
-            elif response.status in [500, 504]:
-                logger.debug(f"发信 >>> 错误：开放平台处理失败")
-            errinfo = await response.json()
-            logger.error(f"发信 >>> 错误：{errinfo}")
-            await SentMessageStore.update_message_status(
-                record_id=record.id,
-                message_type="group",
-                status="failed",
-                error_info=str(errinfo),
-            )
-
-
-async def send_channel_message(channel_id, guild_id, payload: MessageSenderBasePayload):
-    """发送频道消息"""
+            try:
+                body = await response.json(content_type=None)
+            except ValueError:
+                body = None
+            if response.status != 401 or attempt:
+                return response.status, body
+        logger.warning("发信 >>> access_token已失效，正在刷新后重发")
+        token = await token_manager.refresh(stale=token)
+
+
+async def _finish_message(job: SendJob, status: int, body: Any):
+    """记录一条消息的最终发送结果（写入发信记录缓冲区，不等待落盘）"""
+    message_id = error_info = None
+    if status == 200:
+        response_json: MessageSenderOverPayload = body or {}
+        logger.debug(f"发信 >>> 返回结果 -> {response_json}")
+        result, message_id = "success", response_json.get("id")
+    elif status == 204:
+        logger.debug(f"发信 >>> 操作成功，本请求无包体")
+        result = "success"
+    elif status in [201, 202]:
+        logger.debug(f"发信 >>> 异步操作成功，但本请求存在问题")
+        logger.debug(f"发信 >>> 异步操作结果 -> {body}")
+        result = "pending"
+    else:
+        if status == 401:
+            logger.debug(f"发信 >>> 错误：未授权，请检查access_token")
+        elif status == 404:
+            logger.debug(f"发信 >>> 错误：未找到，请检查群组ID")
+        elif status == 405:
+            logger.debug(f"发信 >>> 错误：方法错误，请检查请求方法")
+        elif status == 429:
+            logger.debug(f"发信 >>> 错误：请求被限制，请检查请求频率")
+        elif status in [500, 504]:
+            logger.debug(f"发信 >>> 错误：开放平台处理失败")
+        logger.error(f"发信 >>> 错误（已尝试 {job.attempts} 次）：{body}")
+        result, error_info = "failed", str(body)
+    if job.record is not None:
+        SentMessageStore.record_sent(
+            job.kind,
+            status=result,
+            message_id=message_id,
+            error_info=error_info,
+            **job.record
+        )
+
+
+send_scheduler = SendScheduler(
+    send=_post_message,
+    finish=_finish_message,
+    workers=config.Send.workers,
+    global_rate=config.Send.global_rate,
+    global_burst=config.Send.global_burst,
+    target_rate=config.Send.target_rate,
+    target_burst=config.Send.target_burst,
+    max_retries=config.Send.max_retries,
+    backoff_base=config.Send.backoff_base,
+    backoff_max=config.Send.backoff_max,
+)
+
+
+async def send_group_message(group_openid, payload: MessageSenderBasePayload, timestamp=None) -> "asyncio.Future":
+    """发送群聊消息
+
+    消息放入发信队列后立即返回，不等待限流、重试与退避，避免拖慢处理事件的协程
+
+    :param timestamp: 被回复事件的时间，用于计算被动回复的有效期
+    :return: 发送结束后结果为是否发送成功的Future，需要发送结果时可以await它
+    """
+    logger.debug(f"发送群聊消息 -> {group_openid}: {payload.content}")
+    job = SendJob("group", group_openid, payload, deadline=_reply_deadline("group", payload, timestamp))
+    job.record = {"group_id": group_openid, "message": payload.content, "timestamp": datetime.now()}
+    return send_scheduler.submit(job)
+
+
+async def send_channel_message(channel_id, guild_id, payload: MessageSenderBasePayload, timestamp=None) -> "asyncio.Future":
+    """发送频道消息（放入发信队列后立即返回，见send_group_message）"""
     logger.debug(f"发送频道消息 -> {channel_id}: {payload.content}")
-    from src.Utils.GetAccessToken import ACCESS_TOKEN
-
-    record = await SentMessageStore.log_sent_channel_message(
-        channel_id=channel_id,
-        guild_id=guild_id,
-        message=payload.content,
-    )
-    async with aiohttp.ClientSession() as session:
-        async with session.post(
-            f"{open_url}/channels/{channel_id}/messages",
-            json=payload.to_dict(),
-            headers={
-                "Authorization": f"QQBot {ACCESS_TOKEN}",
-                "Content-Type": "application/json",
-            },
-        ) as response:
-            if response.status == 200:
-                response_json: MessageSenderOverPayload = await response.json()
-                await SentMessageStore.update_message_status(
-                    record_id=record.id,
-                    message_type="channel",
-                    status="success",
-                    message_id=response_json["id"],
-                )
-                logger.debug(f"发信 >>> 返回结果 -> {response_json}")
-                return
-            elif response.status == 204:
-                logger.debug(f"发信 >>> 操作成功，本请求无包体")
-                return
-            elif response.status in [201, 202]:
-                logger.debug(f"发信 >>> 异步操作成功，但本请求存在问题")
-                response_json = await response.json()
-                logger.debug(f"发信 >>> 异步操作结果 -> {response_json}")
-                return
-            elif response.status == 401:
-                logger.debug(f"发信 >>> 错误：未授权，请检查access_token")
-            elif response.status == 404:
-                logger.debug(f"发信 >>> 错误：未找到，请检查群组ID")
-            elif response.status == 405:
-                logger.debug(f"发信 >>> 错误：方法错误，请检查请求方法")
-            elif response.status == 429:
-                logger.debug(f"发信 >>> 错误：请求被限制，请检查请求频率")
-            elif response.status in [500, 504]:
-                logger.debug(f"发信 >>> 错误：开放平台处理失败")
-            errinfo = await response.json()
-            logger.error(f"发信 >>> 错误：{errinfo}")
-            await SentMessageStore.update_message_status(
-                record_id=record.id,
-                message_type="channel",
-                status="failed",
-                error_info=errinfo,
-            )
-
-
-async def send_channel_dms(guild_id, payload: MessageSenderBasePayload):
+    job = SendJob("channel", channel_id, payload, guild_id=guild_id,
+                  deadline=_reply_deadline("channel", payload, timestamp))
+    job.record = {
+        "channel_id": channel_id,
+        "guild_id": guild_id,
+        "message": payload.content,
+        "timestamp": datetime.now(),
+    }
+    return send_scheduler.submit(job)
+
+
+async def send_channel_dms(guild_id, payload: MessageSenderBasePayload, timestamp=None) -> "asyncio.Future":
+    """发送频道私信（放入发信队列后立即返回，见send_group_message）"""
     logger.debug(f"发送频道私聊消息 -> {guild_id}: {payload.content}")
-    from src.Utils.GetAccessToken import ACCESS_TOKEN
+    job = SendJob("dms", guild_id, payload, guild_id=guild_id, deadline=_reply_deadline("dms", payload, timestamp))
+    job.record = {"guild_id": guild_id, "message": payload.content, "timestamp": datetime.now()}
+    return send_scheduler.submit(job)
 
-    record = await SentMessageStore.log_sent_channel_private_message(
-        guild_id=guild_id,
-        message=payload.content,
-    )
 
-    async with aiohttp.ClientSession() as session:
-        async with session.post(
-            f"{open_url}/dms/{guild_id}/messages",
-            json=payload.to_dict(),
-            headers={
-                "Authorization": f"QQBot {ACCESS_TOKEN}",
-                "Content-Type": "application/json",
-            },
-        ) as response:
-            if response.status == 200:
-                response_json: MessageSenderOverPayload = await response.json()
-                logger.debug(f"发信 >>> 返回结果 -> {response_json}")
-                await SentMessageStore.update_message_status(
-                    record_id=record.id,
-                    message_type="dms",
-                    status="success",
-                    message_id=response_json["id"],
-                )
-
-                return
-            elif response.status == 204:
-                logger.debug(f"发信 >>> 操作成功，本请求无包体")
-                return
-            elif response.status in [201, 202]:
-                logger.debug(f"发信 >>> 异步操作成功，但本请求存在问题")
-                response_json = await response.json()
-                logger.debug(f"发信 >>> 异步操作结果 -> {response_json}")
-                return
-            elif response.status == 401:
-                logger.debug(f"发信 >>> 错误：未授权，请检查access_token")
-            elif response.status == 404:
-                logger.debug(f"发信 >>> 错误：未找到，请检查群组ID")
-            elif response.status == 405:
-                logger.debug(f"发信 >>> 错误：方法错误，请检查请求方法")
-            elif response.status == 429:
-                logger.debug(f"发信 >>> 错误：请求被限制，请检查请求频率")
-            elif response.status in [500, 504]:
-                logger.debug(f"发信 >>> 错误：开放平台处理失败")
-            errinfo = await response.json()
-            logger.error(f"发信 >>> 错误：{errinfo}")
-            await SentMessageStore.update_message_status(
-                record_id=record.id,
-                message_type="dms",
-                status="failed",
-                error_info=errinfo,
-            )
-
-
-async def send_private_message(user_id, payload: MessageSenderBasePayload):
+async def send_private_message(user_id, payload: MessageSenderBasePayload, timestamp=None) -> "asyncio.Future":
+    """发送QQ私聊消息（放入发信队列后立即返回，见send_group_message）"""
     logger.debug(f"发送QQ私聊消息 -> {user_id}: {payload.content}")
-    from src.Utils.GetAccessToken import ACCESS_TOKEN
+    job = SendJob("user", user_id, payload, deadline=_reply_deadline("user", payload, timestamp))
+    job.record = {"user_id": user_id, "message": payload.content, "timestamp": datetime.now()}
+    return send_scheduler.submit(job)
 
-    record = await SentMessageStore.log_sent_user_message(
-        message=payload.content, user_id=user_id
-    )
 
-    async with aiohttp.ClientSession() as session:
-        async with session.post(
-            f"{open_url}/v2/users/{user_id}/messages",
-            json=payload.to_dict(),
-            headers={
-                "Authorization": f"QQBot {ACCESS_TOKEN}",
-                "Content-Type": "application/json",
-            },
-        ) as response:
-            if response.status == 200:
-                response_json: MessageSenderOverPayload = await response.json()
-                logger.debug(f"发信 >>> 返回结果 -> {response_json}")
-                await SentMessageStore.update_message_status(
-                    record_id=record.id,
-                    message_type="user",
-                    status="success",
-                    message_id=response_json["id"],
-                )
-                return
-            elif response.status == 204:
-                logger.debug(f"发信 >>> 操作成功，本请求无包体")
-                return
-            elif response.status in [201, 202]:
-                logger.debug(f"发信 >>> 异步操作成功，但本请求存在问题")
-                response_json = await response.json()
-                logger.debug(f"发信 >>> 异步操作结果 -> {response_json}")
-                return
-            elif response.status == 401:
-                logger.debug(f"发信 >>> 错误：未授权，请检查access_token")
-            elif response.status == 404:
-                logger.debug(f"发信 >>> 错误：未找到，请检查群组ID")
-            elif response.status == 405:
-                logger.debug(f"发信 >>> 错误：方法错误，请检查请求方法")
-            elif response.status == 429:
-                logger.debug(f"发信 >>> 错误：请求被限制，请检查请求频率")
-            elif response.status in [500, 504]:
-                logger.debug(f"发信 >>> 错误：开放平台处理失败")
-            errinfo = await response.json()
-            logger.error(f"发信 >>> 错误：{errinfo}")
-            await SentMessageStore.update_message_status(
-                record_id=record.id,
-                message_type="user",
-                status="failed",
-                error_info=errinfo,
-            )
-
-
-async def send_auto_reply(payload: AutoReplyPayload) -> None:
-    """发送自动填充的消息"""
+async def send_auto_reply(payload: AutoReplyPayload) -> Optional["asyncio.Future"]:
+    """发送自动填充的消息（放入发信队列后立即返回）
+
+    :return: 发送结束后结果为是否发送成功的Future，没有可回复的目标时为None
+    """
     base_payload = MessageSenderBasePayload()
     if payload.markdown:
         base_payload.markdown = payload.markdown
@@ -251,6 +208,8 @@ async def send_auto_reply(payload: AutoReplyPayload) -> None:
         base_payload.msg_type = 7
     if payload.image:
         base_payload.image = payload.image
+    timestamp = getattr(payload.event, "timestamp", None)
+    logger.debug(base_payload.to_dict())
     if payload.group_id:
         if payload.markdown or payload.ark:
             base_payload.content = " "
@@ -259,18 +218,17 @@ async def send_auto_reply(payload: AutoReplyPayload) -> None:
             base_payload.content = payload.content
         else:
             base_payload.content = "\n" + payload.content
-        await send_group_message(payload.group_id, base_payload)
+        return await send_group_message(payload.group_id, base_payload, timestamp)
     elif payload.channel_id and payload.is_direct_message == False:
         base_payload.content = payload.content
-        await send_channel_message(payload.channel_id, payload.guild_id, base_payload)
-        pass
+        return await send_channel_message(payload.channel_id, payload.guild_id, base_payload, timestamp)
     elif payload.guild_id:
         base_payload.content = payload.content
-        await send_channel_dms(payload.guild_id, base_payload)
+        return await send_channel_dms(payload.guild_id, base_payload, timestamp)
     elif payload.user_id:
         base_payload.content = payload.content
-        await send_private_message(payload.user_id, base_payload)
-    logger.debug(base_payload.to_dict())
+        return await send_private_message(payload.user_id, base_payload, timestamp)
+    return None
 
 
 async def upload_file(payload: MediaUploadPayload):
@@ -300,17 +258,20 @@ async def upload_file(payload: MediaUploadPayload):
     else:
         logger.error(f"上传文件失败: 不支持的消息类型 {payload.event.event_type}")
         return None
-    async with aiohttp.ClientSession() as session:
-        from src.Utils.GetAccessToken import ACCESS_TOKEN
-        async with session.post(
-            url,
-            json=payload.to_dict(),
-            headers={"Authorization": f"QQBot {ACCESS_TOKEN}"},
-        ) as response:
-            if response.status == 200:
-                file_info = await response.json()
-                return MediaPayload(file_info)
-            else:
-                message = await response.json()
-                logger.error("上传文件失败: " + str(message))
-            logger.debug(str(payload.to_dict()) + "，请求URL为：" + url)
+    try:
+        token = await _wait_token()
+    except asyncio.TimeoutError:
+        logger.error(f"上传文件失败: {config.AccessToken.send_wait_timeout}s内未能获取access_token")
+        return None
+    async with get_session().post(
+        url,
+        json=payload.to_dict(),
+        headers={"Authorization": f"QQBot {token}"},
+    ) as response:
+        if response.status == 200:
+            file_info = await response.json()
+            return MediaPayload(file_info)
+        else:
+            message = await response.json()
+            logger.error("上传文件失败: " + str(message))
+        logger.debug(str(payload.to_dict()) + "，请求URL为：" + url)
@@ -1,6 +1,13 @@
-from datetime import datetime, timedelta
+import asyncio, json, os
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from tortoise.exceptions import OperationalError
 from tortoise.functions import Count
 
+from src.Utils.Logger import logger
+from src.Utils.Config import config
+
 from src.Utils.EventSender import (
     GroupMessage,
     UserMessage,
@@ -12,96 +19,196 @@ from src.Utils.EventSender import (
     SentChannelPrivateMessage
 )
 
+# 记录类型 -> (统计项名称, 统计目标字段, 接收消息模型, 发送消息模型)
+STAT_KINDS = {
+    "group": ("group", "group_id", GroupMessage, SentGroupMessage),
+    "channel": ("channel", "channel_id", ChannelMessage, SentChannelMessage),
+    "dms": ("channel_private", "guild_id", ChannelPrivateMessage, SentChannelPrivateMessage),
+    "user": ("private", "user_id", UserMessage, SentUserMessage),
+}
+DIRECTIONS = ("received", "sent")
+
+
+def time_index(model, field: str) -> Optional[str]:
+    """获取模型上 (timestamp, 统计目标字段) 复合索引的名称"""
+    return next((index.name for index in model._meta.indexes if list(index.fields) == ["timestamp", field]), None)
+
+
+async def _count_since(model, field: str, since: datetime):
+    """按统计目标统计since之后的记录数
+
+    没有范围统计信息时，SQLite会沿统计目标字段的单列索引扫描整张表（省去分组排序），
+    这里用 INDEXED BY 指定 (timestamp, 统计目标字段) 复合索引，只读取since之后的一段索引；
+    数据库尚未建立该索引（未执行迁移）时退回普通查询，由SQLite自行选择索引
+    """
+    index = time_index(model, field)
+    if index is not None:
+        table = model._meta.db_table
+        try:
+            _, rows = await model._meta.db.execute_query(
+                f'SELECT "{field}", COUNT(*) FROM "{table}" INDEXED BY "{index}" '
+                f'WHERE "timestamp" > ? GROUP BY "{field}"',
+                [model._meta.fields_map["timestamp"].to_db_value(since, model)],
+            )
+            return [tuple(row) for row in rows]
+        except OperationalError as e:
+            if "no such index" not in str(e):
+                raise
+            logger.warning(f"消息统计 >>> {table} 缺少索引 {index}，请执行数据库迁移；本次改用普通查询统计")
+    return await model.filter(timestamp__gt=since).annotate(count=Count("id")).group_by(field).values_list(field, "count")
+
+
+class MessageCounters:
+    """收发消息计数器
+
+    消息入库或发出时调用incr()累加计数，查询统计时直接读取内存中的计数，不再扫描消息表。
+    计数为自数据库建立以来的累计值，定期与关闭时写入快照文件；
+    启动时读回快照并只统计快照之后写入的记录，没有快照时（冷启动）才对消息表做一次完整统计。
+    本次启动以来的统计 = 当前累计值 - 启动时的累计值
+    """
+
+    def __init__(self, snapshot_path: Optional[str] = None, snapshot_interval: float = 60):
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval
+        self._totals: Dict[Tuple[str, str], int] = {}
+        self._details: Dict[Tuple[str, str], Dict[str, int]] = {}
+        self._base_totals: Dict[Tuple[str, str], int] = {}
+        self._base_details: Dict[Tuple[str, str], Dict[str, int]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._reset()
+
+    def _reset(self):
+        for direction in DIRECTIONS:
+            for kind in STAT_KINDS:
+                self._totals[(direction, kind)] = 0
+                self._details[(direction, kind)] = {}
+
+    def incr(self, direction: str, kind: str, target: str, count: int = 1):
+        """累加一条消息的计数
+
+        :param direction: received/sent
+        :param kind: 记录类型 group/channel/dms/user
+        :param target: 统计目标（群ID/子频道ID/频道ID/用户ID）
+        """
+        key = (direction, kind)
+        self._totals[key] += count
+        details = self._details[key]
+        details[target] = details.get(target, 0) + count
+
+    async def start(self):
+        """恢复计数并启动定期快照协程（需在数据库初始化后调用）"""
+        saved_at = self.load_snapshot()
+        try:
+            if saved_at is None:
+                logger.info("消息统计 >>> 未找到统计快照，正在从数据库重建消息计数...")
+                await self._count_from_db(None)
+            else:
+                await self._count_from_db(saved_at)
+        except Exception as e:
+            logger.error(f"消息统计 >>> 从数据库统计消息数失败: {e}")
+        self._base_totals = dict(self._totals)
+        self._base_details = {key: dict(details) for key, details in self._details.items()}
+        if self.snapshot_path and self._task is None:
+            self._task = asyncio.create_task(self._snapshot_loop())
+
+    async def stop(self):
+        """停止定期快照并写入最终快照"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self.save_snapshot()
+
+    async def _count_from_db(self, since: Optional[datetime]):
+        """统计数据库中（since之后写入的）记录并累加到计数中"""
+        for kind, (_, field, received_model, sent_model) in STAT_KINDS.items():
+            for direction, model in (("received", received_model), ("sent", sent_model)):
+                if since is None:
+                    rows = await model.annotate(count=Count("id")).group_by(field).values_list(field, "count")
+                else:
+                    rows = await _count_since(model, field, since)
+                for target, count in rows:
+                    self.incr(direction, kind, target, count)
+
+    async def _snapshot_loop(self):
+        while True:
+            await asyncio.sleep(self.snapshot_interval)
+            self.save_snapshot()
+
+    def load_snapshot(self) -> Optional[datetime]:
+        """读回快照，返回快照的写入时间（没有可用快照时返回None）"""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return None
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            saved_at = datetime.fromisoformat(data["saved_at"])
+            self._reset()
+            for name, details in data["details"].items():
+                direction, kind = name.split(":", 1)
+                for target, count in details.items():
+                    self.incr(direction, kind, target, count)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"消息统计 >>> 读取快照失败，将从数据库重建: {e}")
+            self._reset()
+            return None
+        return saved_at
+
+    def save_snapshot(self):
+        """将累计计数写入快照"""
+        if not self.snapshot_path:
+            return
+        data = {
+            "saved_at": datetime.now().isoformat(),
+            "details": {f"{direction}:{kind}": details for (direction, kind), details in self._details.items()},
+        }
+        tmp_path = self.snapshot_path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_path) or ".", exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            logger.error(f"消息统计 >>> 写入快照失败: {e}")
+
+    def get_stats(self, since_start: bool = True) -> Dict[str, Any]:
+        """获取收发消息统计
+
+        :param since_start: True返回本次启动以来的统计，False返回累计统计
+        """
+        stats = {}
+        for direction in DIRECTIONS:
+            stats[direction] = {}
+            for kind, (name, field, _, _) in STAT_KINDS.items():
+                key = (direction, kind)
+                total = self._totals[key]
+                details = self._details[key]
+                if since_start:
+                    total -= self._base_totals.get(key, 0)
+                    base = self._base_details.get(key, {})
+                    details = {target: count - base.get(target, 0) for target, count in details.items()}
+                stats[direction][name] = {
+                    "total": total,
+                    "details": [{field: target, "count": count} for target, count in details.items() if count],
+                }
+        return stats
+
+
+message_counters = MessageCounters(
+    snapshot_path=config.Statistics.snapshot_path,
+    snapshot_interval=config.Statistics.snapshot_interval,
+)
+
+
 class MessageStatistics:
-    def __init__(self, start_time: datetime):
+    """消息统计（兼容旧接口，数据来自message_counters，不再查询数据库）"""
+
+    def __init__(self, start_time: datetime = None):
         self.start_time = start_time
-        self._cache = None
-        self._cache_time = None
-    
+
     async def get_stats(self, use_cache=True):
-        """获取统计信息，可选用缓存"""
-        if use_cache and self._cache and datetime.now() - self._cache_time < timedelta(minutes=5):
-            return self._cache
-        
-        stats = await self._calculate_stats()
-        
-        # 缓存结果
-        self._cache = stats
-        self._cache_time = datetime.now()
-        return stats
-    async def _calculate_stats(self):
         """获取本次启动后的消息统计"""
-        return {
-            "received": {
-                "group": await self._get_received_group_stats(),
-                "channel": await self._get_received_channel_stats(),
-                "channel_private": await self._get_received_channel_private_stats(),
-                "private": await self._get_received_private_stats()
-            },
-            "sent": {
-                "group": await self._get_sent_group_stats(),
-                "channel": await self._get_sent_channel_stats(),
-                "channel_private": await self._get_sent_channel_private_stats(),
-                "private": await self._get_sent_private_stats()
-            }
-        }
-    
-    async def _get_received_group_stats(self):
-        count = await GroupMessage.filter(timestamp__gte=self.start_time).count()
-        details = await GroupMessage.filter(timestamp__gte=self.start_time).annotate(
-            count=Count("id")
-        ).group_by("group_id").values("group_id", "count")
-        return {"total": count, "details": details}
-    
-    async def _get_received_channel_stats(self):
-        count = await ChannelMessage.filter(timestamp__gte=self.start_time).count()
-        details = await ChannelMessage.filter(timestamp__gte=self.start_time).annotate(
-            count=Count("id")
-        ).group_by("channel_id").values("channel_id", "count")
-        return {"total": count, "details": details}
-    
-    async def _get_received_channel_private_stats(self):
-        count = await ChannelPrivateMessage.filter(timestamp__gte=self.start_time).count()
-        details = await ChannelPrivateMessage.filter(timestamp__gte=self.start_time).annotate(
-            count=Count("id")
-        ).group_by("guild_id").values("guild_id", "count")
-        return {"total": count, "details": details}
-    
-    async def _get_received_private_stats(self):
-        count = await UserMessage.filter(timestamp__gte=self.start_time).count()
-        details = await UserMessage.filter(timestamp__gte=self.start_time).annotate(
-            count=Count("id")
-        ).group_by("user_id").values("user_id", "count")
-        return {"total": count, "details": details}
-    
-    async def _get_sent_group_stats(self):
-        count = await SentGroupMessage.filter(timestamp__gte=self.start_time).count()
-        details = await SentGroupMessage.filter(timestamp__gte=self.start_time).annotate(
-            count=Count("id")
-        ).group_by("group_id").values("group_id", "count")
-        return {"total": count, "details": details}
-    
-    async def _get_sent_channel_stats(self):
-        count = await SentChannelMessage.filter(timestamp__gte=self.start_time).count()
-        details = await SentChannelMessage.filter(timestamp__gte=self.start_time).annotate(
-            count=Count("id")
-        ).group_by("channel_id").values("channel_id", "count")
-        return {"total": count, "details": details}
-    
-    async def _get_sent_channel_private_stats(self):
-        count = await SentChannelPrivateMessage.filter(timestamp__gte=self.start_time).count()
-        details = await SentChannelPrivateMessage.filter(timestamp__gte=self.start_time).annotate(
-            count=Count("id")
-        ).group_by("guild_id").values("guild_id", "count")
-        return {"total": count, "details": details}
-    
-    async def _get_sent_private_stats(self):
-        count = await SentUserMessage.filter(timestamp__gte=self.start_time).count()
-        details = await SentUserMessage.filter(timestamp__gte=self.start_time).annotate(
-            count=Count("id")
-        ).group_by("user_id").values("user_id", "count")
-        return {"total": count, "details": details}
-    
+        return message_counters.get_stats()
 
 
 class AppState:
@@ -1,35 +1,217 @@
-import sys, os, importlib.util
-from typing import Dict, Callable, Optional
+import sys, os, time, asyncio, importlib.util
+from typing import Any, Dict, Callable, Optional, Sequence, Tuple
 from pathlib import Path
 
 from src.Utils.Logger import logger
 from src.Utils.Config import config
+from src.Utils.EventClass import EVENT_ROUTES, CommandArgs, register_event_type
 
 
-# 全局命令注册表
+# 全局命令注册表（键为去除/前缀并转为小写后的命令名）
 COMMAND_REGISTRY: Dict[str, Dict] = {}
 # 全局加群事件注册表
 GROUP_ADD_REGISTRY: Dict[str, Dict] = {}
 PLUGIN_DIR: Optional[str] = None
 
-def command(names, event_type: type = None):
+# 全局命令执行统计（键为命令的首个名称，别名共用同一份统计）
+COMMAND_STATS: Dict[str, "CommandLimit"] = {}
+
+# 参数类型转换器
+_ARG_CONVERTERS: Dict[str, Callable[[str], Any]] = {"str": str, "int": int, "float": float}
+
+
+class _TrieNode:
+    __slots__ = ("children", "name")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.name: Optional[str] = None
+
+
+class CommandTrie:
+    """命令字符前缀树
+
+    按字符逐级匹配消息开头，返回最长的已注册命令，匹配耗时只与命令长度有关。
+    命令名之后必须是空白或消息结尾（与按空格切分出命令名时一致），
+    “mchead”不会被匹配为“mc”，普通聊天“摸鱼”也不会触发“摸”命令
+    """
+
+    def __init__(self):
+        self._root = _TrieNode()
+
+    def insert(self, name: str):
+        node = self._root
+        for ch in name:
+            node = node.children.setdefault(ch, _TrieNode())
+        node.name = name
+
+    def remove(self, name: str):
+        path = [self._root]
+        for ch in name:
+            node = path[-1].children.get(ch)
+            if node is None:
+                return
+            path.append(node)
+        path[-1].name = None
+        # 自下而上清理空节点
+        for depth in range(len(name), 0, -1):
+            node = path[depth]
+            if node.children or node.name is not None:
+                break
+            del path[depth - 1].children[name[depth - 1]]
+
+    def clear(self):
+        self._root = _TrieNode()
+
+    def match(self, text: str) -> Optional[Tuple[str, int]]:
+        """匹配text开头的最长命令
+
+        Returns:
+            (命令名, 命令在text中的结束位置)，未匹配时返回None
+        """
+        node = self._root
+        best = None
+        length = len(text)
+        for index in range(length):
+            node = node.children.get(text[index].lower())
+            if node is None:
+                break
+            if node.name is not None:
+                end = index + 1
+                if end == length or text[end].isspace():
+                    best = (node.name, end)
+        return best
+
+
+COMMAND_TRIE = CommandTrie()
+
+
+def normalize_command(name: str) -> str:
+    """统一命令名格式：去除开头的/并转为小写"""
+    name = name.strip()
+    if name.startswith("/"):
+        name = name[1:]
+    return name.lower()
+
+
+def compile_args(spec: Optional[Sequence[str]]) -> Tuple[Tuple[str, Callable[[str], Any], bool], ...]:
+    """预编译命令参数表
+
+    参数声明格式：
+
+    - "name": 一个以空白分隔的参数
+    - "name:int" / "name:float": 转换为对应类型，转换失败时为None
+    - "*name": 剩余的全部文本（只能作为最后一个参数）
+    """
+    compiled = []
+    for index, item in enumerate(spec or ()):
+        is_rest = item.startswith("*")
+        name, _, type_name = item.lstrip("*").partition(":")
+        converter = _ARG_CONVERTERS.get(type_name or "str")
+        if not name or converter is None:
+            raise ValueError(f"无效的命令参数声明: {item!r}")
+        if is_rest and index != len(spec) - 1:
+            raise ValueError(f"剩余参数只能作为最后一个参数: {item!r}")
+        compiled.append((name, converter, is_rest))
+    return tuple(compiled)
+
+
+def parse_args(schema: Tuple[Tuple[str, Callable[[str], Any], bool], ...], raw: str) -> CommandArgs:
+    """按预编译的参数表解析命令参数"""
+    tokens = tuple(raw.split())
+    values = {}
+    for index, (name, converter, is_rest) in enumerate(schema):
+        if index >= len(tokens):
+            values[name] = None
+            continue
+        value = raw.split(maxsplit=index)[index] if is_rest else tokens[index]
+        if converter is not str:
+            try:
+                value = converter(value)
+            except ValueError:
+                value = None
+        values[name] = value
+    return CommandArgs(raw, tokens, values)
+
+
+class CommandLimit:
+    """单个命令（含其别名）的并发与超时限制及执行统计"""
+    __slots__ = ("name", "max_concurrency", "timeout", "running", "stats")
+
+    def __init__(self, name: str, max_concurrency: int, timeout: float):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        """最大同时执行数，为0时不限制"""
+        self.timeout = timeout
+        """单次执行时限（秒），为0时不限制"""
+        self.running = 0
+        self.stats = {
+            "invoked": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "cancelled": 0,
+            "max_running": 0,
+            "total_time": 0.0,
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        total_time = stats.pop("total_time")
+        finished = stats["completed"] + stats["failed"] + stats["cancelled"]
+        stats.update({
+            "running": self.running,
+            "max_concurrency": self.max_concurrency,
+            "timeout": self.timeout,
+            "avg_time_ms": round(total_time / finished * 1000, 3) if finished else 0.0,
+        })
+        return stats
+
+
+def command(
+    names,
+    event_type: type = None,
+    args: Optional[Sequence[str]] = None,
+    max_concurrency: Optional[int] = None,
+    timeout: Optional[float] = None,
+):
     """命令注册装饰器（支持多个命令名）
+
+    命令名开头的/会被统一去除，“/help”与“help”视为同一命令，
+    消息以/开头或不以/开头均可触发
     
     Args:
         names: 命令名或命令名列表
         event_type: 支持的事件类型
+        args: 参数声明列表，例如 ["host", "count:int", "*rest"]，
+            解析结果在处理函数中通过 event.args 访问
+        max_concurrency: 最大同时执行数，超出时直接拒绝并回复繁忙提示，为空时使用配置文件中的默认值
+        timeout: 单次执行时限（秒），超时的处理函数会被取消并回复超时提示，为空时使用配置文件中的默认值
         
     Returns:
         装饰器函数
     """
+    schema = compile_args(args)
+
     def decorator(func):
         # 确保 names 是列表类型
         name_list = [names] if isinstance(names, str) else names
         
         # 获取当前模块名，用于日志记录
         module_name = func.__module__
+        # 所有别名共用同一个并发限制
+        limit = CommandLimit(
+            normalize_command(name_list[0]) or func.__name__,
+            config.Command.max_concurrency if max_concurrency is None else max_concurrency,
+            config.Command.timeout if timeout is None else timeout,
+        )
+        COMMAND_STATS[limit.name] = limit
         
-        for name in name_list:
+        for raw_name in name_list:
+            name = normalize_command(raw_name)
+            if not name:
+                logger.warning(f"⚠️ 模块 {module_name} 中的命令名 '{raw_name}' 无效，已忽略")
+                continue
             if name in COMMAND_REGISTRY:
                 # 检查是否是同一个模块的命令
                 existing_module = COMMAND_REGISTRY[name]['handler'].__module__
@@ -45,8 +227,53 @@ def command(names, event_type: type = None):
             # 为每个命令名注册相同的处理函数和事件类型
             COMMAND_REGISTRY[name] = {
                 'handler': func,
-                'event_type': event_type
+                'event_type': event_type,
+                'args': schema,
+                'limit': limit,
             }
+            COMMAND_TRIE.insert(name)
+        return func
+    return decorator
+
+def unregister_command(name: str) -> bool:
+    """移除命令
+
+    Returns:
+        bool: 命令是否存在
+    """
+    name = normalize_command(name)
+    if name not in COMMAND_REGISTRY:
+        return False
+    limit = COMMAND_REGISTRY.pop(name)['limit']
+    COMMAND_TRIE.remove(name)
+    if not any(info['limit'] is limit for info in COMMAND_REGISTRY.values()):
+        COMMAND_STATS.pop(limit.name, None)
+    return True
+
+def on_event(names):
+    """事件处理器注册装饰器（支持多个事件类型）
+
+    同一事件类型可注册多个处理器，按注册顺序依次执行；
+    未内置的事件类型会自动注册，使用MessageEventPayload构建事件对象
+
+    Args:
+        names: 事件类型名或事件类型名列表，例如 "GROUP_DEL_ROBOT"、["GUILD_CREATE", "GUILD_DELETE"]
+
+    Returns:
+        装饰器函数
+    """
+    def decorator(func):
+        name_list = [names] if isinstance(names, str) else names
+        module_name = func.__module__
+        for name in name_list:
+            route = EVENT_ROUTES.get(name) or register_event_type(name)
+            # 同一模块的同名函数重复注册时直接覆盖
+            route.handlers = [
+                h for h in route.handlers
+                if not (h.__module__ == module_name and h.__qualname__ == func.__qualname__)
+            ]
+            route.handlers.append(func)
+            logger.debug(f"插件管理器 >>> 注册事件处理器: '{name}' 在模块 {module_name} 中")
         return func
     return decorator
 
@@ -61,16 +288,19 @@ def group_add(func):
     """
     # 获取当前模块名，用于日志记录
     module_name = func.__module__
+    route = EVENT_ROUTES["GROUP_ADD_ROBOT"]
     
     if "group_add" in GROUP_ADD_REGISTRY:
         # 检查是否是同一个模块的处理器
-        existing_module = GROUP_ADD_REGISTRY["group_add"]['handler'].__module__
+        existing = GROUP_ADD_REGISTRY["group_add"]['handler']
+        existing_module = existing.__module__
         if existing_module == module_name:
             # 同一模块重复注册，直接覆盖
             logger.debug(f"插件管理器 >>> 更新加群事件处理器在模块 {module_name} 中")
         else:
             # 不同模块的处理器冲突，发出警告
             logger.warning(f"⚠️ 加群事件处理器冲突: 已在模块 {existing_module} 中注册，现在被模块 {module_name} 覆盖")
+        route.handlers = [h for h in route.handlers if h is not existing]
     else:
         logger.debug(f"插件管理器 >>> 注册加群事件处理器在模块 {module_name} 中")
     
@@ -78,10 +308,12 @@ def group_add(func):
     GROUP_ADD_REGISTRY["group_add"] = {
         'handler': func
     }
+    route.handlers.append(func)
     return func
 
 async def get_command_handler(cmd: str, event_class: type) -> Optional[Callable]:
     """获取命令处理函数（添加事件类型检查）"""
+    cmd = normalize_command(cmd)
     if cmd not in COMMAND_REGISTRY:
         return None
     
@@ -95,6 +327,83 @@ async def get_command_handler(cmd: str, event_class: type) -> Optional[Callable]
     
     return None  # 事件类型不匹配
 
+async def invoke_command(info: Dict, payload) -> None:
+    """在并发与超时限制下执行命令处理函数
+
+    Raises:
+        Exception: 处理函数自身抛出的异常（包括其内部的asyncio.TimeoutError）
+    """
+    limit: CommandLimit = info['limit']
+    stats = limit.stats
+    if limit.max_concurrency and limit.running >= limit.max_concurrency:
+        stats["rejected"] += 1
+        logger.warning(f"插件管理器 >>> 命令 {limit.name} 同时执行数已达上限 {limit.max_concurrency}，拒绝本次调用")
+        await _reply_notice(payload, config.Command.busy_reply)
+        return
+    limit.running += 1
+    stats["invoked"] += 1
+    if limit.running > stats["max_running"]:
+        stats["max_running"] = limit.running
+    started = time.monotonic()
+    try:
+        if limit.timeout:
+            # 在单独的任务中执行，以区分命令超时与处理函数内部抛出的asyncio.TimeoutError
+            task = asyncio.ensure_future(info['handler'](payload))
+            try:
+                done, _ = await asyncio.wait({task}, timeout=limit.timeout)
+            except asyncio.CancelledError:
+                task.cancel()
+                raise
+            if not done:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                stats["cancelled"] += 1
+                logger.warning(f"插件管理器 >>> 命令 {limit.name} 执行超过 {limit.timeout}s，已取消")
+                await _reply_notice(payload, config.Command.timeout_reply)
+                return
+            task.result()
+        else:
+            await info['handler'](payload)
+        stats["completed"] += 1
+    except Exception:
+        stats["failed"] += 1
+        raise
+    finally:
+        limit.running -= 1
+        stats["total_time"] += time.monotonic() - started
+
+async def _reply_notice(payload, content: str):
+    """回复繁忙/超时提示（内容为空时不回复）"""
+    if not content or not hasattr(payload, "reply"):
+        return
+    try:
+        await payload.reply(content)
+    except Exception as e:
+        logger.error(f"插件管理器 >>> 发送提示消息失败: {str(e)}")
+
+def get_command_stats() -> Dict[str, Dict[str, Any]]:
+    """获取各命令的执行统计"""
+    return {name: limit.get_stats() for name, limit in COMMAND_STATS.items()}
+
+def resolve_command(content: str, event_class: type) -> Optional[Tuple[str, Dict, str]]:
+    """按最长前缀匹配消息开头的命令
+
+    Returns:
+        (命令名, 命令信息, 命令名之后的文本)，未匹配或事件类型不支持时返回None
+    """
+    text = content.lstrip()
+    if text.startswith("/"):
+        text = text[1:]
+    matched = COMMAND_TRIE.match(text)
+    if matched is None:
+        return None
+    name, end = matched
+    info = COMMAND_REGISTRY[name]
+    supported_event = info['event_type']
+    if supported_event is not None and not issubclass(event_class, supported_event):
+        return None  # 事件类型不匹配
+    return name, info, text[end:].strip()
+
 async def get_group_add_handler() -> Optional[Callable]:
     """获取加群事件处理函数"""
     if "group_add" not in GROUP_ADD_REGISTRY:
@@ -104,6 +413,20 @@ async def get_group_add_handler() -> Optional[Callable]:
     handler = handler_info['handler']
     return handler
 
+def _unregister_module(module_name: str):
+    """清除指定插件注册的命令与事件处理器"""
+    commands_to_remove = [cmd for cmd, info in COMMAND_REGISTRY.items() if info['handler'].__module__ == module_name]
+    for cmd in commands_to_remove:
+        logger.info(f"插件管理器 >>> 移除命令: {cmd}")
+        unregister_command(cmd)
+    for route in EVENT_ROUTES.values():
+        if any(h.__module__ == module_name for h in route.handlers):
+            logger.info(f"插件管理器 >>> 移除事件处理器: {route.name}")
+            route.handlers = [h for h in route.handlers if h.__module__ != module_name]
+    group_add_info = GROUP_ADD_REGISTRY.get("group_add")
+    if group_add_info and group_add_info['handler'].__module__ == module_name:
+        del GROUP_ADD_REGISTRY["group_add"]
+
 # 新增插件API处理函数
 async def get_plugins_list():
     """获取插件列表"""
@@ -224,15 +547,8 @@ async def toggle_plugin(name: str, enable: bool):
                 if hasattr(module, "shutdown"):
                     module.shutdown()
                 
-                # 清除该插件注册的命令
-                commands_to_remove = []
-                for cmd, info in COMMAND_REGISTRY.items():
-                    if info['handler'].__module__ == name:
-                        commands_to_remove.append(cmd)
-                
-                for cmd in commands_to_remove:
-                    logger.info(f"插件管理器 >>> 移除命令: {cmd}")
-                    del COMMAND_REGISTRY[cmd]
+                # 清除该插件注册的命令与事件处理器
+                _unregister_module(name)
                 
                 del sys.modules[name]
         
@@ -291,15 +607,8 @@ async def install_plugin(url: str, version: str = None):
         if plugin_path.exists():
             # 如果插件已加载，先卸载
             if plugin_name in sys.modules:
-                # 清除该插件注册的命令
-                commands_to_remove = []
-                for cmd, info in COMMAND_REGISTRY.items():
-                    if info['handler'].__module__ == plugin_name:
-                        commands_to_remove.append(cmd)
-                
-                for cmd in commands_to_remove:
-                    logger.info(f"插件管理器 >>> 移除命令: {cmd}")
-                    del COMMAND_REGISTRY[cmd]
+                # 清除该插件注册的命令与事件处理器
+                _unregister_module(plugin_name)
                 
                 # 调用插件的shutdown函数
                 module = sys.modules[plugin_name]
@@ -369,15 +678,8 @@ async def uninstall_plugin(name: str):
             if hasattr(module, "shutdown"):
                 module.shutdown()
             
-            # 清除该插件注册的命令
-            commands_to_remove = []
-            for cmd, info in COMMAND_REGISTRY.items():
-                if info['handler'].__module__ == name:
-                    commands_to_remove.append(cmd)
-            
-            for cmd in commands_to_remove:
-                logger.info(f"插件管理器 >>> 移除命令: {cmd}")
-                del COMMAND_REGISTRY[cmd]
+            # 清除该插件注册的命令与事件处理器
+            _unregister_module(name)
             
             del sys.modules[name]
         
@@ -457,5 +759,10 @@ async def shutdown_plugins():
                 logger.error(f"插件管理器 >>>   - 关闭失败: {module.__name__} - {str(e)}")
     # 清理命令注册表
     COMMAND_REGISTRY.clear()
+    COMMAND_TRIE.clear()
+    COMMAND_STATS.clear()
     # 清理加群事件注册表
-    GROUP_ADD_REGISTRY.clear()
\ No newline at end of file
+    GROUP_ADD_REGISTRY.clear()
+    # 清理事件处理器链
+    for route in EVENT_ROUTES.values():
+        route.handlers = []
\ No newline at end of file
@@ -1,45 +1,291 @@
-from typing import Union
+import asyncio, json, os, time, zlib
+from typing import Any, Dict, List, Tuple, Union
 
-from src.Utils.EventClass import MessageEventPayload, GroupEvent
-from src.Utils.PluginBase import get_command_handler, get_group_add_handler
+from src.Utils.EventClass import EVENT_ROUTES, MessageEventPayload, GroupEvent, create_payload
+from src.Utils.PluginBase import resolve_command, parse_args, invoke_command
 from src.Utils.Logger import logger
 from src.Utils.EventSenderApp import MessageStore
+from src.Utils.Config import config
+from src.Utils.Dedup import dedup
+from src.Utils.RateLimiter import rate_limiter
 
 async def handle_event(payload: Union[MessageEventPayload, GroupEvent]):
     """处理消息事件"""
-    # 获取命令处理器（使用全局状态）
-    if payload.t in ["MESSAGE_CREATE","AT_MESSAGE_CREATE","DIRECT_MESSAGE_CREATE","C2C_MESSAGE_CREATE","GROUP_AT_MESSAGE_CREATE"]:
+    payload.log_event()
+    route = EVENT_ROUTES.get(payload.t)
+    if route is None:
+        logger.debug(f"插件管理器 >>> 未注册的事件: {payload.event_type}")
+        return
+    if route.is_message:
+        if config.Dedup.enable and dedup.seen(f"msg:{payload.msg_id}"):
+            logger.debug(f"插件管理器 >>> 消息 {payload.msg_id} 已处理过，跳过重复消息")
+            return
+        matched = resolve_command(payload.content, type(payload))
+        if config.RateLimit.enable:
+            limited_by = rate_limiter.acquire((
+                ("user", payload.user_id),
+                ("group", getattr(payload, "group_id", None) or getattr(payload, "channel_id", None)),
+                ("command", matched[0] if matched else None),
+            ))
+            if limited_by is not None:
+                logger.debug(f"插件管理器 >>> 消息 {payload.msg_id} 触发{limited_by}限流，已丢弃")
+                return
         logger.debug(f"插件管理器 >>> 处理消息: {payload.content}")
-        await MessageStore.save_from_event(payload)
-        # 解析命令
-        parts = payload.content.strip().split(maxsplit=1)
-        if not parts:
-            return "错误: 空消息"
-        command = parts[0].lower()
-        # 获取命令处理器
-        handler = await get_command_handler(command, type(payload))
-        if not handler:
-            return f"未知命令: {command}"
+        MessageStore.enqueue_from_event(payload)
+    else:
+        logger.debug(f"插件管理器 >>> 处理事件: {payload.event_type}")
+    # 依次执行事件处理器链，单个处理器出错不影响后续处理器
+    for handler in route.handlers:
         try:
             await handler(payload)
-            return
         except Exception as e:
-            error_msg = f"执行命令 {command} 出错: {str(e)}"
-            logger.error(f"插件管理器 >>> {error_msg}")
-            raise # 受不了了，直接抛出异常方便debug。。。
-    else:
-        logger.debug(f"插件管理器 >>> 处理事件: {payload.event_type}")
-        if payload.t == "GROUP_ADD_ROBOT":
-            handler = await get_group_add_handler()
-            try:
-                await handler(payload)
-                return
-            except Exception as e:
-                error_msg = f"处理事件 {payload.event_type} 出错: {str(e)}"
-                logger.error(f"插件管理器 >>> {error_msg}")
-                raise
-        elif payload.t == "GROUP_DEL_ROBOT":
-            # 目前不处理退群事件
-            return
+            logger.error(f"插件管理器 >>> 处理事件 {payload.event_type} 出错: {str(e)}")
+    if not route.is_message:
+        return
+    # 解析命令
+    if not payload.content.strip():
+        return "错误: 空消息"
+    if matched is None:
+        return "未知命令"
+    command, info, rest = matched
+    payload.command = command
+    payload.args = parse_args(info['args'], rest)
+    try:
+        await invoke_command(info, payload)
+        return
+    except Exception as e:
+        error_msg = f"执行命令 {command} 出错: {str(e)}"
+        logger.error(f"插件管理器 >>> {error_msg}")
+        raise # 受不了了，直接抛出异常方便debug。。。
+
+# 会话键名 -> 依次读取的d字段（GroupEvent的群ID为group_openid，消息事件的用户ID为author.union_openid）
+_LANE_FIELDS = (
+    ("group_id", ("group_id", "group_openid")),
+    ("channel_id", ("channel_id",)),
+    ("guild_id", ("guild_id",)),
+    ("user_id", ("union_openid",)),
+)
+
+class _Lane:
+    """单个执行通道：一个有界FIFO队列 + 一个工作协程"""
+
+    def __init__(self, index: int, capacity: int):
+        self.index = index
+        self.capacity = capacity
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=capacity)
+        self.pending: Dict[str, int] = {}
+        self.processed = 0
+        self.dropped = 0
+        self.max_depth = 0
+
+    def put(self, key: str, payload):
+        self.queue.put_nowait((time.monotonic(), key, payload))
+        self.pending[key] = self.pending.get(key, 0) + 1
+        depth = self.queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    def release(self, key: str):
+        count = self.pending.get(key, 0) - 1
+        if count > 0:
+            self.pending[key] = count
         else:
-            pass
\ No newline at end of file
+            self.pending.pop(key, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        hot_keys = sorted(self.pending.items(), key=lambda item: item[1], reverse=True)[:3]
+        return {
+            "lane": self.index,
+            "depth": self.queue.qsize(),
+            "capacity": self.capacity,
+            "max_depth": self.max_depth,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "hot_keys": [{"key": key, "pending": count} for key, count in hot_keys],
+        }
+
+
+class EventDispatcher:
+    """事件分发器
+
+    事件按会话（群/频道/用户）哈希分配到固定数量的执行通道，
+    每个通道是一个有界FIFO队列并只由一个工作协程消费，
+    因此同一会话内的事件严格按到达顺序处理，不同通道之间并行执行，
+    单个热点群最多占满自己所在的通道，不会拖慢其他通道。
+
+    通道满载时按配置的策略处理：
+
+    - drop_oldest: 丢弃该通道中最早的事件，为新事件腾出位置
+    - reject: 拒绝新事件，Webhook返回503，由开放平台稍后重发
+    - spill: 将新事件写入溢出文件，通道空闲后再读回处理（读回的事件不保证与后续事件的先后顺序）
+    """
+
+    def __init__(self, queue_size: int, lanes: int, full_policy: str, spill_path: str):
+        self.queue_size = queue_size
+        self.lane_count = lanes
+        self.lane_capacity = max(1, queue_size // lanes)
+        self.full_policy = full_policy
+        self.spill_path = spill_path
+        self._lanes: List[_Lane] = []
+        self._tasks: List[asyncio.Task] = []
+        self._stats = {
+            "enqueued": 0,
+            "processed": 0,
+            "failed": 0,
+            "dropped": 0,
+            "rejected": 0,
+            "spilled": 0,
+            "restored": 0,
+            "wait_total": 0.0,
+            "wait_max": 0.0,
+        }
+
+    def start(self):
+        """启动各通道的工作协程（需在事件循环中调用）"""
+        if self._lanes:
+            return
+        self._lanes = [_Lane(index, self.lane_capacity) for index in range(self.lane_count)]
+        for lane in self._lanes:
+            self._tasks.append(asyncio.create_task(self._worker(lane)))
+        if self.full_policy == "spill":
+            self._tasks.append(asyncio.create_task(self._restore_spilled()))
+        logger.info(f"事件分发器 >>> 已启动 {self.lane_count} 个执行通道，每通道队列长度 {self.lane_capacity}，满载策略 {self.full_policy}")
+
+    async def stop(self, timeout: float = 5.0):
+        """等待各通道中的事件处理完毕后关闭工作协程"""
+        if not self._lanes:
+            return
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(lane.queue.join() for lane in self._lanes)),
+                timeout=timeout,
+            )
+        except asyncio.TimeoutError:
+            remaining = sum(lane.queue.qsize() for lane in self._lanes)
+            logger.warning(f"事件分发器 >>> 关闭超时，仍有 {remaining} 个事件未处理")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._lanes = []
+
+    @staticmethod
+    def lane_key(payload) -> str:
+        """获取事件的会话键：群ID > 子频道ID > 频道ID > 用户ID > 事件ID
+
+        在返回ACK之前调用，只读取d字段中的几个ID字段，不会解码整个事件
+        """
+        ids = payload.peek_ids()
+        for attr, fields in _LANE_FIELDS:
+            for field in fields:
+                value = ids.get(field)
+                if value:
+                    return f"{attr}:{value}"
+        return f"id:{payload.id}"
+
+    def submit(self, payload: Union[MessageEventPayload, GroupEvent]) -> bool:
+        """提交事件
+
+        Returns:
+            bool: 事件是否被接收（drop_oldest与spill策略下总为True）
+        """
+        if not self._lanes:
+            self.start()
+        key, lane = self._route(payload)
+        if lane.queue.full():
+            if self.full_policy == "reject":
+                self._stats["rejected"] += 1
+                logger.warning(f"事件分发器 >>> 通道 {lane.index} 已满，拒绝事件 {payload.id}")
+                return False
+            if self.full_policy == "spill":
+                self._spill(payload)
+                return True
+            _, dropped_key, dropped = lane.queue.get_nowait()
+            lane.queue.task_done()
+            lane.release(dropped_key)
+            lane.dropped += 1
+            self._stats["dropped"] += 1
+            logger.warning(f"事件分发器 >>> 通道 {lane.index} 已满，丢弃最早的事件 {dropped.id}")
+        lane.put(key, payload)
+        self._stats["enqueued"] += 1
+        return True
+
+    def _route(self, payload) -> Tuple[str, _Lane]:
+        key = self.lane_key(payload)
+        return key, self._lanes[zlib.crc32(key.encode("utf-8")) % self.lane_count]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取分发统计信息（含各通道积压情况）"""
+        stats = dict(self._stats)
+        processed = stats.pop("processed")
+        wait_total = stats.pop("wait_total")
+        lanes = [lane.get_stats() for lane in self._lanes]
+        stats.update({
+            "depth": sum(lane["depth"] for lane in lanes),
+            "capacity": self.lane_capacity * self.lane_count,
+            "full_policy": self.full_policy,
+            "processed": processed,
+            "avg_wait_ms": round(wait_total / processed * 1000, 3) if processed else 0.0,
+            "max_wait_ms": round(stats.pop("wait_max") * 1000, 3),
+            "lanes": lanes,
+        })
+        return stats
+
+    async def _worker(self, lane: _Lane):
+        while True:
+            enqueued_at, key, payload = await lane.queue.get()
+            wait = time.monotonic() - enqueued_at
+            self._stats["wait_total"] += wait
+            if wait > self._stats["wait_max"]:
+                self._stats["wait_max"] = wait
+            try:
+                await handle_event(payload)
+            except Exception:
+                self._stats["failed"] += 1
+                logger.exception(f"事件分发器 >>> 通道 {lane.index} 处理事件 {payload.id} 出错")
+            finally:
+                lane.release(key)
+                lane.processed += 1
+                self._stats["processed"] += 1
+                lane.queue.task_done()
+
+    def _spill(self, payload):
+        try:
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(payload._raw_data, ensure_ascii=False) + "\n")
+            self._stats["spilled"] += 1
+        except OSError as e:
+            self._stats["dropped"] += 1
+            logger.error(f"事件分发器 >>> 写入溢出文件失败，事件 {payload.id} 已丢弃: {e}")
+
+    async def _restore_spilled(self):
+        """各通道平均空闲过半时将溢出文件中的事件读回"""
+        reading_path = self.spill_path + ".reading"
+        while True:
+            await asyncio.sleep(1)
+            if not os.path.exists(self.spill_path):
+                continue
+            if sum(lane.queue.qsize() for lane in self._lanes) > self.lane_capacity * self.lane_count // 2:
+                continue
+            os.replace(self.spill_path, reading_path)
+            with open(reading_path, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+            os.remove(reading_path)
+            for line in lines:
+                if not line.strip():
+                    continue
+                payload = create_payload(json.loads(line))
+                key, lane = self._route(payload)
+                if lane.queue.full():
+                    self._spill(payload)
+                    continue
+                lane.put(key, payload)
+                self._stats["restored"] += 1
+
+
+dispatcher = EventDispatcher(
+    queue_size=config.Dispatch.queue_size,
+    lanes=config.Dispatch.lanes,
+    full_policy=config.Dispatch.full_policy,
+    spill_path=config.Dispatch.spill_path,
+)
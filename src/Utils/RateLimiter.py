@@ -0,0 +1,105 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from src.Utils.Config import config
+
+
+class RateLimiter:
+    """令牌桶限流器
+
+    每个维度（用户/群/命令）有独立的速率与容量，同一维度下按ID各持有一个令牌桶。
+    所有令牌桶保存在同一个按最近访问排序的OrderedDict中：
+    每次访问只涉及对应的几个桶，并从队首淘汰长时间未访问或超出数量上限的桶，
+    长时间未访问的桶本就已经回满，淘汰后重新创建不会改变限流结果
+    """
+
+    def __init__(self, limits: Dict[str, Tuple[float, float]], max_buckets: int = 10000, idle_ttl: float = 600):
+        """
+        :param limits: 维度 -> (每秒补充的令牌数, 桶容量)，速率为0的维度不限流
+        :param max_buckets: 最多保留的令牌桶数量
+        :param idle_ttl: 令牌桶的最长闲置时间（秒），超过后被淘汰
+        """
+        self.limits = {dim: limit for dim, limit in limits.items() if limit[0] > 0}
+        self.max_buckets = max_buckets
+        self.idle_ttl = idle_ttl
+        self._buckets: "OrderedDict[Tuple[str, str], list]" = OrderedDict()  # (维度, ID) -> [令牌数, 上次补充时间]
+        self._stats = {"allowed": 0, "limited": 0, "evicted": 0}
+        self._limited_by: Dict[str, int] = {dim: 0 for dim in self.limits}
+
+    def acquire(self, keys: Iterable[Tuple[str, str]], now: Optional[float] = None) -> Optional[str]:
+        """尝试从各个令牌桶中各取一个令牌
+
+        只有所有桶都有令牌时才会扣除，任一桶不足时均不扣除
+
+        :param keys: (维度, ID) 列表，ID为空或维度未启用时跳过
+        :return: 被限流的维度，未被限流时返回None
+        """
+        now = time.monotonic() if now is None else now
+        buckets = self._buckets
+        acquired = []
+        for dim, ident in keys:
+            limit = self.limits.get(dim)
+            if limit is None or not ident:
+                continue
+            rate, burst = limit
+            key = (dim, ident)
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = [burst, now]
+            else:
+                bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+                buckets.move_to_end(key)
+            if bucket[0] < 1:
+                self._stats["limited"] += 1
+                self._limited_by[dim] += 1
+                self._evict(now)
+                return dim
+            acquired.append(bucket)
+        for bucket in acquired:
+            bucket[0] -= 1
+        self._stats["allowed"] += 1
+        self._evict(now)
+        return None
+
+    def retry_after(self, dim: str, ident: str, now: Optional[float] = None) -> float:
+        """距离指定令牌桶可再取出一个令牌还需等待的秒数"""
+        limit = self.limits.get(dim)
+        bucket = self._buckets.get((dim, ident))
+        if limit is None or bucket is None:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        rate, burst = limit
+        tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+        return max(0.0, (1 - tokens) / rate)
+
+    def _evict(self, now: float):
+        buckets = self._buckets
+        while buckets:
+            _, bucket = next(iter(buckets.items()))
+            if now - bucket[1] <= self.idle_ttl and len(buckets) <= self.max_buckets:
+                break
+            buckets.popitem(last=False)
+            self._stats["evicted"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取限流统计信息"""
+        stats = dict(self._stats)
+        stats.update({
+            "buckets": len(self._buckets),
+            "max_buckets": self.max_buckets,
+            "limited_by": dict(self._limited_by),
+        })
+        return stats
+
+
+rate_limiter = RateLimiter(
+    limits={
+        "user": (config.RateLimit.user_rate, config.RateLimit.user_burst),
+        "group": (config.RateLimit.group_rate, config.RateLimit.group_burst),
+        "command": (config.RateLimit.command_rate, config.RateLimit.command_burst),
+    },
+    max_buckets=config.RateLimit.max_buckets,
+    idle_ttl=config.RateLimit.idle_ttl,
+)
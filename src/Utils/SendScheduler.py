@@ -0,0 +1,233 @@
+import asyncio, itertools, random, time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from src.Utils.Logger import logger
+from src.Utils.RateLimiter import RateLimiter
+
+
+# 可重试的HTTP状态码（0表示网络错误或请求超时）
+RETRYABLE_STATUS = frozenset({0, 429, 500, 502, 503, 504})
+
+
+class SendJob:
+    """一条待发送的消息
+
+    - kind: 消息类型 group/user/channel/dms
+    - target: 群openid/用户openid/子频道ID/频道ID
+    - guild_id: 频道ID（仅频道消息记录使用）
+    - deadline: 被动回复窗口的截止时间（time.time()），主动消息为None
+    """
+    __slots__ = ("kind", "target", "guild_id", "payload", "deadline", "attempts", "record", "future", "enqueued_at")
+
+    def __init__(self, kind: str, target: str, payload, guild_id: str = None, deadline: Optional[float] = None):
+        self.kind = kind
+        self.target = target
+        self.guild_id = guild_id
+        self.payload = payload
+        self.deadline = deadline
+        self.attempts = 0
+        self.record = None
+        """发信记录的字段（发送结束后与结果一起写入发信记录）"""
+        self.future: Optional[asyncio.Future] = None
+        self.enqueued_at = 0.0
+
+    @property
+    def is_passive(self) -> bool:
+        """是否为被动回复（带有msg_id或event_id）"""
+        return self.deadline is not None
+
+
+class SendScheduler:
+    """发信调度器
+
+    所有待发送的消息进入同一个优先队列：被动回复优先，并按回复窗口截止时间先后排序，
+    主动消息按提交顺序排在其后。工作协程取出消息后先检查全局与单个目标（群/用户/频道）的令牌桶，
+    额度不足时用call_later延迟放回队列而不占用工作协程；
+    遇到429/5xx或网络错误时按带随机抖动的指数退避重试，
+    被动回复在窗口截止前仍未发出时直接判定失败，不会再发送
+    """
+
+    def __init__(
+        self,
+        send: Callable[[SendJob], Awaitable[Tuple[int, Any]]],
+        finish: Callable[[SendJob, int, Any], Awaitable[None]],
+        workers: int = 4,
+        global_rate: float = 20,
+        global_burst: int = 20,
+        target_rate: float = 2,
+        target_burst: int = 5,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 10,
+    ):
+        """
+        :param send: 执行一次发送，返回 (HTTP状态码, 响应体)，网络错误时应抛出异常
+        :param finish: 发送结束（成功或最终失败）后的回调，用于记录发送结果
+        """
+        self._send = send
+        self._finish = finish
+        self.workers = workers
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._limiter = RateLimiter(
+            {"global": (global_rate, global_burst), "target": (target_rate, target_burst)},
+            idle_ttl=60,
+        )
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._delayed: Dict[asyncio.TimerHandle, SendJob] = {}
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._stats = {
+            "enqueued": 0,
+            "sent": 0,
+            "failed": 0,
+            "expired": 0,
+            "retried": 0,
+            "throttled": 0,
+            "wait_total": 0.0,
+            "wait_max": 0.0,
+        }
+        self._retry_hist: Dict[int, int] = {}
+
+    def start(self):
+        """启动工作协程（需在事件循环中调用）"""
+        if self._tasks:
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info(f"发信调度器 >>> 已启动 {self.workers} 个发信协程")
+
+    async def stop(self, timeout: float = 5.0):
+        """等待队列中的消息发送完毕后关闭工作协程"""
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self._drain(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"发信调度器 >>> 关闭超时，仍有 {self._queue.qsize() + len(self._delayed)} 条消息未发送")
+        for handle in list(self._delayed):
+            handle.cancel()
+        self._delayed.clear()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _drain(self):
+        while self._delayed or self._queue.qsize() or self._in_flight:
+            await asyncio.sleep(0.05)
+
+    def submit(self, job: SendJob) -> asyncio.Future:
+        """提交一条消息
+
+        Returns:
+            asyncio.Future: 发送结束后结果为是否发送成功，调用方可不等待
+        """
+        if not self._tasks:
+            self.start()
+        job.future = asyncio.get_running_loop().create_future()
+        job.enqueued_at = time.monotonic()
+        self._stats["enqueued"] += 1
+        self._put(job)
+        return job.future
+
+    def _put(self, job: SendJob):
+        # 被动回复优先，按截止时间排序；主动消息按提交顺序排序
+        if job.is_passive:
+            key = (0, job.deadline, next(self._seq))
+        else:
+            key = (1, 0.0, next(self._seq))
+        self._queue.put_nowait((key, job))
+
+    def _put_later(self, delay: float, job: SendJob):
+        loop = asyncio.get_running_loop()
+        handle = None
+
+        def requeue():
+            self._delayed.pop(handle, None)
+            self._put(job)
+
+        handle = loop.call_later(delay, requeue)
+        self._delayed[handle] = job
+
+    async def _worker(self):
+        while True:
+            _, job = await self._queue.get()
+            try:
+                await self._process(job)
+            except Exception:
+                logger.exception(f"发信调度器 >>> 处理 {job.kind}:{job.target} 的消息时出错")
+                # _complete中的记录回调出错时消息已经计入统计，不能再次完成
+                if job.future is not None and not job.future.done():
+                    await self._complete(job, -1, None)
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, job: SendJob):
+        if job.is_passive and time.time() >= job.deadline:
+            self._stats["expired"] += 1
+            logger.warning(f"发信调度器 >>> 发往 {job.kind}:{job.target} 的被动回复已超过回复窗口，放弃发送")
+            await self._complete(job, -1, {"message": "被动回复窗口已过期", "code": -1})
+            return
+        target_key = f"{job.kind}:{job.target}"
+        limited_by = self._limiter.acquire((("global", "*"), ("target", target_key)))
+        if limited_by is not None:
+            self._stats["throttled"] += 1
+            ident = "*" if limited_by == "global" else target_key
+            self._put_later(self._limiter.retry_after(limited_by, ident), job)
+            return
+
+        if job.attempts == 0:
+            wait = time.monotonic() - job.enqueued_at
+            self._stats["wait_total"] += wait
+            if wait > self._stats["wait_max"]:
+                self._stats["wait_max"] = wait
+        job.attempts += 1
+        self._in_flight += 1
+        try:
+            status, body = await self._send(job)
+        except Exception as e:
+            status, body = 0, {"message": f"{type(e).__name__}: {e}", "code": 0}
+        finally:
+            self._in_flight -= 1
+
+        if status in RETRYABLE_STATUS and job.attempts <= self.max_retries:
+            delay = self._backoff(job.attempts)
+            if not job.is_passive or time.time() + delay < job.deadline:
+                self._stats["retried"] += 1
+                logger.warning(f"发信调度器 >>> 发往 {target_key} 的消息失败（{status}），{delay:.2f}s后进行第 {job.attempts} 次重试")
+                self._put_later(delay, job)
+                return
+        await self._complete(job, status, body)
+
+    def _backoff(self, attempt: int) -> float:
+        """带随机抖动的指数退避：在 [0, min(上限, 基数*2^(n-1))] 内均匀取值"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1))))
+
+    async def _complete(self, job: SendJob, status: int, body: Any):
+        success = 200 <= status < 300
+        self._stats["sent" if success else "failed"] += 1
+        retries = max(0, job.attempts - 1)
+        self._retry_hist[retries] = self._retry_hist.get(retries, 0) + 1
+        try:
+            await self._finish(job, status, body)
+        finally:
+            if job.future is not None and not job.future.done():
+                job.future.set_result(success)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取发信统计信息（含队列深度与重试次数分布）"""
+        stats = dict(self._stats)
+        wait_total = stats.pop("wait_total")
+        started = stats["sent"] + stats["failed"]
+        stats.update({
+            "depth": self._queue.qsize() if self._queue is not None else 0,
+            "delayed": len(self._delayed),
+            "in_flight": self._in_flight,
+            "avg_wait_ms": round(wait_total / started * 1000, 3) if started else 0.0,
+            "max_wait_ms": round(stats.pop("wait_max") * 1000, 3),
+            "retry_histogram": {str(k): v for k, v in sorted(self._retry_hist.items())},
+        })
+        return stats
@@ -0,0 +1,115 @@
+import binascii, time
+from typing import Optional, Union
+from nacl.signing import SigningKey
+from nacl.exceptions import BadSignatureError
+
+from src.Utils.Config import config
+
+
+"""
+Webhook签名校验
+
+密钥种子、签名器与验签器在首次使用时（启动时由lifespan触发）由appsecret派生一次，之后所有请求复用
+详见：https://bot.q.qq.com/wiki/develop/api-v2/dev-prepare/interface-framework/sign.html
+"""
+
+
+class SignatureError(ValueError):
+    """签名校验失败"""
+
+
+def derive_seed(secret: str) -> bytes:
+    """由appsecret派生32字节的Ed25519密钥种子
+
+    开放平台要求将secret重复拼接至32字节以上后截取前32字节
+    """
+    seed = secret.encode("utf-8")
+    if not seed:
+        raise ValueError("appsecret不能为空")
+    while len(seed) < 32:
+        seed += seed
+    return seed[:32]
+
+
+class SignatureVerifier:
+    """Ed25519签名校验器"""
+    __slots__ = ("seed", "signing_key", "verify_key", "max_skew")
+
+    def __init__(self, secret: str, max_skew: int = 300):
+        """
+        :param secret: 机器人appsecret
+        :param max_skew: 允许的时间戳偏差（秒），为0时不校验时间戳
+        """
+        self.seed = derive_seed(secret)
+        self.signing_key = SigningKey(self.seed)
+        self.verify_key = self.signing_key.verify_key
+        self.max_skew = max_skew
+
+    def verify(
+        self,
+        signature: Optional[Union[str, bytes]],
+        timestamp: Optional[Union[str, bytes]],
+        body: bytes,
+        now: Optional[float] = None,
+    ) -> None:
+        """校验 X-Signature-Ed25519 与 X-Signature-Timestamp
+
+        Args:
+            signature: 请求头中的hex签名
+            timestamp: 请求头中的时间戳
+            body: 原始请求体
+            now: 当前时间戳（默认为time.time()）
+
+        Raises:
+            SignatureError: 缺少请求头、签名格式错误、时间戳超出允许范围或签名不匹配
+        """
+        if not signature or not timestamp:
+            raise SignatureError("缺少X-Signature-Ed25519或X-Signature-Timestamp请求头")
+        if isinstance(timestamp, str):
+            timestamp = timestamp.encode("utf-8")
+        if self.max_skew > 0:
+            try:
+                ts = int(timestamp)
+            except ValueError:
+                raise SignatureError(f"X-Signature-Timestamp格式错误：{timestamp!r}")
+            skew = abs((time.time() if now is None else now) - ts)
+            if skew > self.max_skew:
+                raise SignatureError(f"时间戳偏差{skew:.0f}s超出允许范围{self.max_skew}s")
+        try:
+            raw_signature = binascii.unhexlify(signature)
+        except (binascii.Error, ValueError):
+            raise SignatureError("X-Signature-Ed25519不是合法的hex字符串")
+        if len(raw_signature) != 64:  # 官方文档提出解码后应该为64 bytes
+            raise SignatureError(
+                "X-Signature-Ed25519 must be 64 bytes long, but received %d bytes."
+                % len(raw_signature)
+            )
+        try:
+            self.verify_key.verify(timestamp + body, raw_signature)
+        except BadSignatureError:
+            raise SignatureError("Signature verification failed! Please check your variable QQ_BOT_SECRET.")
+
+    def sign(self, timestamp: Union[str, bytes], message: Union[str, bytes]) -> str:
+        """对 时间戳+消息 进行签名，返回hex字符串"""
+        if isinstance(timestamp, str):
+            timestamp = timestamp.encode("utf-8")
+        if isinstance(message, str):
+            message = message.encode("utf-8")
+        return self.signing_key.sign(timestamp + message).signature.hex()
+
+
+_verifier: Optional[SignatureVerifier] = None
+
+
+def get_verifier() -> SignatureVerifier:
+    """获取由配置文件中的appsecret派生的签名校验器（首次调用时创建）
+
+    Raises:
+        ValueError: 配置文件中的appsecret为空
+    """
+    global _verifier
+    if _verifier is None:
+        if not config.Bot.appsecret:
+            raise ValueError("配置文件 config.yaml 中的 Bot.appsecret 为空，无法校验Webhook签名，请填写机器人的AppSecret后重启")
+        _verifier = SignatureVerifier(config.Bot.appsecret, config.Signature.max_skew)
+    return _verifier
@@ -7,7 +7,17 @@ from src.Utils.Config import config  # 导入配置模块
 from src.Utils.ConfigCli import load_config
 from src.Utils.AutoUpdate import check_update
 from src.Utils.PluginBase import initialize_plugins, shutdown_plugins
-from src.Utils.GetAccessToken import get_access_token
+from src.Utils.GetAccessToken import get_access_token, token_manager
+from src.Utils.Processer import dispatcher
+from src.Utils.Dedup import dedup
+from src.Utils.HttpClient import start_http_client, close_http_client
+from src.Utils.MessageSender import send_scheduler
+from src.Utils.EventSenderApp import message_writer, sent_writer
+from src.Utils.DatabaseMaintenance import db_maintenance
+from src.Utils.MessageState import message_counters
+from src.Utils.MessageRollup import message_rollup
+from src.Utils.MessageRetention import message_retention
+from src.Utils.Signature import get_verifier
 
 @asynccontextmanager
 async def startup_event(app: FastAPI):
@@ -16,6 +26,12 @@ async def startup_event(app: FastAPI):
     logger.info("框架 前置处理 >>> Tortoise ORM数据库已启动")
     load_config(config_path=Path("config.yaml"))
     logger.debug(f"框架 前置处理 >>> 配置文件：{config}")
+    if config.Signature.verify:
+        try:
+            get_verifier()
+        except ValueError as e:
+            logger.error(f"框架 前置处理 >>> {e}")
+            raise
     logger.debug("------------------更新检查------------------")
     if config.Advanced.update:
         logger.info("版本检查 >>> 正在检查更新...")
@@ -32,18 +48,46 @@ async def startup_event(app: FastAPI):
     logger.debug("----------------加载插件结束----------------")
 
 
-    logger.debug("----------正在启动AccessToken线程-----------")
+    await start_http_client()
+    logger.debug("----------正在获取AccessToken-----------")
     await get_access_token()
-    logger.debug("----------AccessToken线程启动完毕-----------")
+    logger.debug("----------AccessToken获取完毕-----------")
 
 
+    message_writer.start()
+    sent_writer.start()
+    await message_counters.start()
+    await message_rollup.start()
+    db_maintenance.start()
+    message_retention.start()
+    send_scheduler.start()
+    if config.Dedup.enable:
+        dedup.start()
+    dispatcher.start()
     logger.debug("===========框架 startup 事件结束===========")
     head = "https://" if config.Network.ssl else "http://"
     logger.info(f"框架已启动，监听地址：{head}{config.Network.host}:{config.Network.port}{config.Network.path}")
     yield
 
+    logger.info("框架 前置处理>>> 正在等待事件队列处理完毕...")
+    await dispatcher.stop()
+    if config.Dedup.enable:
+        await dedup.stop()
     logger.info("框架 前置处理>>> 正在关闭插件处理器...")
     await shutdown_plugins()
+    logger.info("框架 前置处理>>> 正在等待发信队列发送完毕...")
+    await send_scheduler.stop()
+    await token_manager.stop()
+    logger.info("框架 前置处理>>> 正在写入剩余的收发消息记录...")
+    await message_retention.stop()
+    await message_writer.stop()
+    await sent_writer.stop()
+    await message_counters.stop()
+    await message_rollup.stop()
+    logger.info("框架 前置处理>>> 正在整理数据库...")
+    await db_maintenance.stop()
+    logger.info("框架 前置处理>>> 正在关闭HTTP连接池...")
+    await close_http_client()
     logger.info("框架 前置处理>>> 正在关闭日志记录器...")
     shutdown_logging()
     logger.info("框架 前置处理>>> 框架已关闭")
@@ -1,16 +1,25 @@
-from fastapi import APIRouter, Request, Form, status, BackgroundTasks, Depends, HTTPException
+from fastapi import APIRouter, Request, Form, status, Depends, HTTPException
 from fastapi.responses import JSONResponse, FileResponse
 from tortoise.exceptions import IntegrityError
-import json, psutil, os, jwt, glob, zipfile, shutil, re
+import logging, psutil, os, jwt, glob, zipfile, shutil, re
 from datetime import datetime, timedelta
 
 from src.Utils.Database import LoginForm
 from src.Utils.EventClass import create_payload
-from src.Utils.Processer import handle_event
+from src.Utils.JsonCodec import decode_envelope
+from src.Utils.Processer import dispatcher
+from src.Utils.Dedup import dedup
+from src.Utils.RateLimiter import rate_limiter
+from src.Utils.MessageSender import send_scheduler
+from src.Utils.EventSenderApp import message_writer, sent_writer
+from src.Utils.DatabaseMaintenance import db_maintenance
+from src.Utils.Signature import get_verifier, SignatureError
 from src.Utils.Config import config
 from src.Utils.Logger import logger
-from src.Utils.MessageState import AppState, MessageStatistics
-from src.Utils.PluginBase import get_plugins_list, toggle_plugin, install_plugin, uninstall_plugin
+from src.Utils.MessageState import message_counters, STAT_KINDS
+from src.Utils.MessageRollup import message_rollup, to_local, GRANULARITIES
+from src.Utils.MessageRetention import message_retention
+from src.Utils.PluginBase import get_plugins_list, toggle_plugin, install_plugin, uninstall_plugin, get_command_stats
 
 
 router = APIRouter()
@@ -230,24 +239,41 @@ if config.Network.webui:
                 status_code=500)
 
 @router.post(config.Network.path)
-async def bot_callback(request: Request, background_tasks: BackgroundTasks):
+async def bot_callback(request: Request):
     """处理机器人回调
 
     该块用于处理机器人回调请求
     """
     body = await request.body()
+    if config.Signature.verify:
+        try:
+            get_verifier().verify(request.headers.get("X-Signature-Ed25519"), request.headers.get("X-Signature-Timestamp"), body)
+        except SignatureError as e: # 在解析数据包之前拒绝伪造的请求
+            logger.warning(f"Webhook >>> 签名校验失败，已拒绝来自 {request.client.host if request.client else '未知地址'} 的请求：{e}")
+            return JSONResponse({"message": "Invalid signature", "code": 401}, status_code=status.HTTP_401_UNAUTHORIZED)
     try:
-        data = json.loads(body.decode("utf-8"))
-    except json.JSONDecodeError:
+        envelope = decode_envelope(body)  # 仅解析外层字段，d字段在需要时才解码
+    except ValueError:
         # return JSONResponse("Invalid JSON", status_code=status.HTTP_400_BAD_REQUEST)
         return JSONResponse({"message": "Invalid JSON", "code":400}, status_code=status.HTTP_400_BAD_REQUEST)
-    payload = create_payload(data)
-    logger.debug("=========================传入数据=========================")
-    logger.debug(str(data))
-    logger.debug("=======================传入数据结束=======================")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("=========================传入数据=========================")
+        logger.debug(body.decode("utf-8", errors="replace"))
+        logger.debug("=======================传入数据结束=======================")
+    if config.Dedup.enable and envelope.op == 0 and dedup.contains(f"event:{envelope.id}"):
+        logger.debug(f"Webhook >>> 事件 {envelope.id} 已处理过，跳过重复推送")
+        return {"op_code": 12, "d": {"event_id": envelope.id, "status": 0, "message": "success"}} # 重复推送同样ACK，避免开放平台继续重发
+    payload = create_payload(envelope)
     if payload.is_validation():
-        return await payload.generate_validation_response(request)
-    background_tasks.add_task(handle_event, payload) # 交付后台执行其他耗时操作
+        try:
+            return await payload.generate_validation_response(request, body)
+        except SignatureError as e:
+            logger.warning(f"Webhook >>> 回调地址验证失败：{e}")
+            return JSONResponse({"message": "Invalid signature", "code": 401}, status_code=status.HTTP_401_UNAUTHORIZED)
+    if not dispatcher.submit(payload): # 交付事件队列执行其他耗时操作
+        return JSONResponse({"message": "Event queue is full", "code": 503}, status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+    if config.Dedup.enable and payload.is_dispatch():
+        dedup.add(f"event:{payload.id}") # 仅记录已接收的事件，被拒绝的事件重发时仍会处理
     return {"op_code": 12, "d": {"event_id": payload.id, "status": 0, "message": "success"}} # 立即返回Code12
 
 @router.get("/api/heartbeat")
@@ -261,12 +287,83 @@ async def heartbeat(request: Request):
 
 @router.get("/bot/get_message_info")
 async def get_message_info(request: Request, current_user: str = Depends(get_current_user)):
-    start_time = AppState.get_start_time()
-    stats_service = MessageStatistics(start_time)
-    stats = await stats_service.get_stats()
+    stats = message_counters.get_stats()
     response = {"code": 200, "data": stats}
     return JSONResponse(response)
 
+@router.get("/bot/stats/range")
+async def get_stats_range(
+    start: str = None,
+    end: str = None,
+    granularity: str = "hour",
+    direction: str = None,
+    kind: str = None,
+    target: str = None,
+    by_target: bool = False,
+    current_user: str = Depends(get_current_user),
+):
+    """按时间段查询收发消息数接口
+
+    数据来自小时/天汇总表，默认返回最近24小时（按小时）或最近30天（按天）
+
+    - start/end: ISO格式时间，不带时区时按本地时间处理
+    - granularity: hour/day
+    - direction: received/sent，留空则合计
+    - kind: group/user/channel/dms，留空则合计
+    - target: 群ID/用户ID/子频道ID/频道ID，留空则合计
+    - by_target: 是否按统计目标分别返回
+    """
+    if granularity not in GRANULARITIES:
+        return JSONResponse({"code": 400, "message": f"granularity只能为 {'/'.join(GRANULARITIES)}"}, status_code=400)
+    if direction and direction not in ("received", "sent"):
+        return JSONResponse({"code": 400, "message": "direction只能为 received/sent"}, status_code=400)
+    if kind and kind not in STAT_KINDS:
+        return JSONResponse({"code": 400, "message": f"kind只能为 {'/'.join(STAT_KINDS)}"}, status_code=400)
+    if not config.Rollup.enable:
+        return JSONResponse({"code": 400, "message": "消息汇总未启用"}, status_code=400)
+    try:
+        # 带时区的时间先换算为本地时间，与汇总表的时间保持一致，也避免与不带时区的时间比较出错
+        end_time = to_local(datetime.fromisoformat(end)) if end else datetime.now()
+        start_time = to_local(datetime.fromisoformat(start)) if start else end_time - timedelta(days=1 if granularity == "hour" else 30)
+    except (ValueError, OverflowError, OSError):
+        return JSONResponse({"code": 400, "message": "start/end须为ISO格式时间"}, status_code=400)
+    if start_time >= end_time or end_time - start_time > timedelta(days=config.Rollup.max_range_days):
+        return JSONResponse({"code": 400, "message": f"时间范围无效或超过 {config.Rollup.max_range_days} 天"}, status_code=400)
+    series = await message_rollup.query_range(start_time, end_time, granularity, direction, kind, target, by_target)
+    response = {"code": 200, "data": {
+        "start": start_time.isoformat(),
+        "end": end_time.isoformat(),
+        "granularity": granularity,
+        "total": sum(item["count"] for item in series),
+        "series": series,
+    }}
+    return JSONResponse(response)
+
+@router.get("/bot/get_dispatch_info")
+async def get_dispatch_info(current_user: str = Depends(get_current_user)):
+    """获取事件队列信息接口
+
+    返回事件队列深度、等待时间、丢弃/拒绝计数、去重缓存命中情况、限流统计、发信队列及收发消息记录的批量写入统计
+    """
+    response = {"code": 200, "data": {
+        **dispatcher.get_stats(),
+        "dedup": dedup.get_stats(),
+        "rate_limit": rate_limiter.get_stats(),
+        "send": send_scheduler.get_stats(),
+        "message_writer": message_writer.get_stats(),
+        "sent_writer": sent_writer.get_stats(),
+    }}
+    return JSONResponse(response)
+
+@router.get("/bot/get_command_stats")
+async def get_command_stats_info(current_user: str = Depends(get_current_user)):
+    """获取命令执行统计接口
+
+    返回各命令的调用、拒绝、超时取消次数及平均耗时
+    """
+    response = {"code": 200, "data": get_command_stats()}
+    return JSONResponse(response)
+
 @router.get("/bot/get_system_info")
 async def get_system_info(current_user: str = Depends(get_current_user)):
     info = {}
@@ -417,7 +514,10 @@ async def get_data_stats(current_user: str = Depends(get_current_user)):
     
     stats = {
         "totalSize": f"{total_size / (1024 * 1024):.2f} MB",
-        "logSize": f"{log_size / (1024 * 1024):.2f} MB"
+        "logSize": f"{log_size / (1024 * 1024):.2f} MB",
+        "database": db_maintenance.get_stats(),
+        "partitions": message_retention.get_partitions(),
+        "retention": message_retention.get_stats()
     }
     
     response = {"code": 200, "data": stats}
@@ -464,6 +564,9 @@ async def create_backup(current_user: str = Depends(get_current_user)):
             shutil.rmtree(temp_dir)
         os.makedirs(temp_dir, exist_ok=True)
         
+        # 将WAL中的内容合并回数据库文件，保证复制出的数据库完整
+        await db_maintenance.checkpoint()
+
         # 复制需要备份的文件到临时目录
         # 复制配置文件
         if os.path.exists("config.yaml"):
@@ -0,0 +1,37 @@
+import pytest
+from tortoise import Tortoise
+
+from src.Utils.ConfigClass import DatabaseConfig
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def db(tmp_path):
+    """在临时目录中建立与正式配置相同的 message / messagesent 数据库（默认性能配置档）"""
+    database = DatabaseConfig(
+        connections={
+            "message": f"sqlite://{tmp_path / 'message.db'}",
+            "messagesent": f"sqlite://{tmp_path / 'message_sent.db'}",
+        },
+        apps={
+            "message": {"models": ["src.Utils.EventSender"], "default_connection": "message"},
+            "messagesent": {"models": ["src.Utils.EventSender"], "default_connection": "messagesent"},
+        },
+    )
+    await Tortoise.init(config=database.TORTOISE_ORM)
+    await Tortoise.generate_schemas()
+    yield
+    await Tortoise.close_connections()
+
+
+@pytest.fixture
+async def http_client():
+    """测试结束后关闭共享HTTP连接池，避免连接池跨事件循环复用"""
+    from src.Utils.HttpClient import close_http_client
+
+    yield
+    await close_http_client()
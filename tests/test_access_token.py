@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from src.Utils import GetAccessToken, MessageSender
+from src.Utils.EventClass import MessageSenderBasePayload
+from src.Utils.GetAccessToken import AccessTokenManager
+from src.Utils.SendScheduler import SendJob
+
+pytestmark = pytest.mark.anyio
+
+
+class TokenServer:
+    """本地模拟的令牌接口与发信接口
+
+    每次获取令牌依次签发 t1、t2……，发信接口只接受未被吊销的令牌
+    """
+
+    def __init__(self):
+        self.issued = 0
+        self.fail = 0
+        """接下来的几次获取令牌请求返回500"""
+        self.delay = 0.0
+        self.expires_in = 7200
+        self.valid = set()
+        self.bodies = []
+
+    async def token(self, request):
+        self.bodies.append(await request.json())
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            self.fail -= 1
+            return web.json_response({"message": "internal error"}, status=500)
+        self.issued += 1
+        token = f"t{self.issued}"
+        self.valid.add(token)
+        return web.json_response({"access_token": token, "expires_in": str(self.expires_in)})
+
+    async def message(self, request):
+        if request.headers.get("Authorization", "").replace("QQBot ", "") not in self.valid:
+            return web.json_response({"message": "token not exist or expire", "code": 11244}, status=401)
+        return web.json_response({"id": "msg", "timestamp": 0})
+
+
+@pytest.fixture
+async def server(http_client, monkeypatch):
+    stand_in = TokenServer()
+    app = web.Application()
+    app.router.add_post("/app/getAppAccessToken", stand_in.token)
+    app.router.add_post("/v2/groups/{group}/messages", stand_in.message)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    base = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+    monkeypatch.setattr(GetAccessToken, "TOKEN_URL", base + "/app/getAppAccessToken")
+    monkeypatch.setattr(MessageSender, "open_url", base)
+    monkeypatch.setattr(GetAccessToken, "ACCESS_TOKEN", GetAccessToken.ACCESS_TOKEN)
+    yield stand_in
+    await runner.cleanup()
+
+
+@pytest.fixture
+async def manager():
+    manager = AccessTokenManager("appid", "secret", retry_max=0.01)
+    yield manager
+    await manager.stop()
+
+
+async def test_wait_ready_returns_the_first_token(server, manager):
+    assert not manager.ready
+    assert await asyncio.wait_for(manager.wait_ready(), timeout=2) == "t1"
+    assert manager.ready
+    assert GetAccessToken.ACCESS_TOKEN == "t1"
+    assert server.bodies == [{"appId": "appid", "clientSecret": "secret"}]
+    assert manager.get_stats()["refreshed"] == 1
+
+
+async def test_wait_ready_times_out_while_the_server_fails(server, manager):
+    server.fail = 1000
+    with pytest.raises(asyncio.TimeoutError):
+        await manager.wait_ready(timeout=0.1)
+    assert manager.get_stats()["failed"] >= 1
+
+
+async def test_failed_fetches_are_retried(server, manager):
+    server.fail = 2
+    assert await asyncio.wait_for(manager.wait_ready(), timeout=2) == "t1"
+    stats = manager.get_stats()
+    assert (stats["failed"], stats["refreshed"]) == (2, 1)
+
+
+async def test_concurrent_refreshes_share_one_request(server, manager):
+    await manager.wait_ready(timeout=2)
+    server.delay = 0.05
+    tokens = await asyncio.gather(*(manager.refresh(stale="t1") for _ in range(10)))
+    assert tokens == ["t2"] * 10
+    assert server.issued == 2
+    # 令牌已被其他调用方刷新，直接返回新令牌
+    assert await manager.refresh(stale="t1") == "t2"
+    assert server.issued == 2
+    assert manager.get_stats()["forced"] == 1
+
+
+async def test_token_is_refreshed_before_it_expires(server, manager):
+    server.expires_in = 1
+    manager.refresh_ahead = 0
+    await manager.wait_ready(timeout=2)
+    for _ in range(60):
+        if manager.token != "t1":
+            break
+        await asyncio.sleep(0.05)
+    assert manager.token == "t2"
+
+
+async def test_rejected_send_refreshes_once_and_retries(server, manager, monkeypatch):
+    monkeypatch.setattr(MessageSender, "token_manager", manager)
+    await manager.wait_ready(timeout=2)
+    server.valid.clear()  # 模拟令牌在过期前被开放平台作废
+    server.delay = 0.05
+    results = await asyncio.gather(*(
+        MessageSender._post_message(SendJob("group", f"g{i}", MessageSenderBasePayload())) for i in range(5)
+    ))
+    assert [status for status, _ in results] == [200] * 5
+    assert server.issued == 2
+    assert manager.token == "t2"
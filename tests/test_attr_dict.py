@@ -0,0 +1,78 @@
+import pickle
+
+import pytest
+
+from src.Utils.EventClass import AttrDict, AttrList
+
+
+@pytest.fixture
+def data():
+    return {
+        "id": "m1",
+        "author": {"union_openid": "u1"},
+        "mentions": [{"id": "a"}, {"id": "b"}, "plain"],
+        "nested": {"list": [[1, 2], {"x": 1}]},
+    }
+
+
+def test_nested_values_are_wrapped_on_access(data):
+    view = AttrDict(data)
+    assert view.id == "m1"
+    assert isinstance(view.author, AttrDict)
+    assert view.author.union_openid == "u1"
+    assert view["author"]["union_openid"] == "u1"
+    assert isinstance(view.mentions, AttrList)
+    assert view.nested.list[1].x == 1
+    assert view.nested.list[0].to_list() == [1, 2]
+
+
+def test_child_views_are_cached_and_share_data(data):
+    view = AttrDict(data)
+    assert view.author is view.author
+    assert view.mentions[0] is view.mentions[0]
+    assert view.author.to_dict() is data["author"]
+    assert view.to_dict() is data  # 不复制原始数据
+
+
+def test_view_is_read_only(data):
+    view = AttrDict(data)
+    with pytest.raises(AttributeError):
+        view.id = "m2"
+    assert data["id"] == "m1"
+
+
+def test_missing_keys(data):
+    view = AttrDict(data)
+    with pytest.raises(AttributeError):
+        view.missing
+    with pytest.raises(KeyError):
+        view["missing"]
+    assert view.get("missing") is None
+    assert view.get("missing", "x") == "x"
+    assert isinstance(view.get("author"), AttrDict)
+
+
+def test_mapping_protocol(data):
+    view = AttrDict(data)
+    assert "author" in view and "missing" not in view
+    assert list(view) == list(data)
+    assert list(view.keys()) == list(data.keys())
+    assert len(view) == len(data)
+
+
+def test_list_indexing_and_slicing(data):
+    mentions = AttrDict(data).mentions
+    assert len(mentions) == 3
+    assert mentions[-1] == "plain"
+    assert mentions[-3] is mentions[0]
+    assert [m.id for m in mentions[:2]] == ["a", "b"]
+    assert isinstance(mentions[1:], AttrList)
+    assert mentions[1:].to_list() == data["mentions"][1:]
+    with pytest.raises(IndexError):
+        mentions[3]
+
+
+def test_view_survives_pickling(data):
+    view = pickle.loads(pickle.dumps(AttrDict(data)))
+    assert view.author.union_openid == "u1"
+    assert view.to_dict() == data
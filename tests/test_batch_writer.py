@@ -0,0 +1,135 @@
+import json
+from datetime import datetime
+
+import pytest
+from tortoise.exceptions import OperationalError
+
+from src.Utils.BatchWriter import BatchWriter
+from src.Utils.EventSender import GroupMessage, SentGroupMessage
+
+pytestmark = pytest.mark.anyio
+
+
+def make_writer(tmp_path, **kwargs) -> BatchWriter:
+    return BatchWriter(
+        name="测试",
+        connection="messagesent",
+        models={"group": SentGroupMessage},
+        spill_path=str(tmp_path / "spill.jsonl"),
+        dead_letter_path=str(tmp_path / "dead.jsonl"),
+        **kwargs,
+    )
+
+
+def sent_row(i, message="内容"):
+    return {"group_id": f"group{i}", "message": message, "status": "success", "timestamp": datetime(2026, 1, 1, 12, i)}
+
+
+def read_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+async def test_flush_writes_batch(db, tmp_path):
+    writer = make_writer(tmp_path)
+    for i in range(5):
+        writer.add("group", **sent_row(i))
+    assert await writer.flush()
+    assert await SentGroupMessage.all().count() == 5
+    assert writer.get_stats()["written"] == 5
+
+
+async def test_poison_row_goes_to_dead_letter(db, tmp_path):
+    writer = make_writer(tmp_path)
+    for i in range(7):
+        writer.add("group", **sent_row(i, message=None if i == 3 else "内容"))
+    assert await writer.flush()
+
+    assert sorted(await SentGroupMessage.all().values_list("group_id", flat=True)) == [
+        f"group{i}" for i in range(7) if i != 3
+    ]
+    dead = read_lines(tmp_path / "dead.jsonl")
+    assert len(dead) == 1
+    assert dead[0]["fields"]["group_id"] == "group3"
+    assert dead[0]["error"]
+    assert not (tmp_path / "spill.jsonl").exists()
+    stats = writer.get_stats()
+    assert stats["dead_lettered"] == 1
+    assert stats["written"] == 6
+    assert stats["spilled"] == 0
+
+
+async def test_operational_error_spills_whole_batch(db, tmp_path, monkeypatch):
+    writer = make_writer(tmp_path)
+    for i in range(4):
+        writer.add("group", **sent_row(i))
+
+    async def locked(batch):
+        raise OperationalError("database is locked")
+
+    monkeypatch.setattr(writer, "_write", locked)
+    assert not await writer.flush()
+    spilled = read_lines(tmp_path / "spill.jsonl")
+    assert [item["fields"]["group_id"] for item in spilled] == [f"group{i}" for i in range(4)]
+    assert not (tmp_path / "dead.jsonl").exists()
+
+
+async def test_spill_is_recovered_on_start(db, tmp_path):
+    writer = make_writer(tmp_path, max_buffer=2)
+    for i in range(5):
+        writer.add("group", **sent_row(i))
+    assert writer.get_stats()["spilled"] == 3
+
+    restarted = make_writer(tmp_path)
+    restarted.start()
+    await restarted.stop()
+    assert restarted.get_stats()["recovered"] == 3
+    assert not (tmp_path / "spill.jsonl").exists()
+    rows = await SentGroupMessage.filter(group_id__in=["group2", "group3", "group4"]).order_by("id")
+    assert [row.timestamp.minute for row in rows] == [2, 3, 4]
+
+
+async def test_recovered_poison_row_is_not_replayed(db, tmp_path):
+    with open(tmp_path / "spill.jsonl", "w", encoding="utf-8") as f:
+        for i in range(3):
+            row = sent_row(i, message=None if i == 1 else "内容")
+            row["timestamp"] = {"$datetime": row["timestamp"].isoformat()}
+            f.write(json.dumps({"kind": "group", "fields": row}, ensure_ascii=False) + "\n")
+
+    writer = make_writer(tmp_path)
+    writer.start()
+    await writer.stop()
+    assert await SentGroupMessage.all().count() == 2
+    assert not (tmp_path / "spill.jsonl").exists()
+    assert len(read_lines(tmp_path / "dead.jsonl")) == 1
+
+    # 再次启动时死信文件中的记录不会被读回
+    writer = make_writer(tmp_path)
+    writer.start()
+    await writer.stop()
+    assert writer.get_stats()["recovered"] == 0
+    assert await SentGroupMessage.all().count() == 2
+
+
+async def test_unique_field_deduplicates_and_ignores_conflicts(db, tmp_path):
+    writer = BatchWriter(name="测试", connection="message", models={"group": GroupMessage}, overflow="drop", unique_field="message_id")
+    row = {"group_id": "g", "user_id": "u", "message": "m"}
+    writer.add("group", message_id="a", **row)
+    writer.add("group", message_id="a", **row)
+    writer.add("group", message_id="b", **row)
+    assert await writer.flush()
+    writer.add("group", message_id="b", **row)
+    assert await writer.flush()
+    assert await GroupMessage.all().count() == 2
+    assert writer.get_stats()["deduplicated"] == 1
+
+
+async def test_record_sent_stores_empty_message_for_content_less_sends():
+    from src.Utils.EventSenderApp import SentMessageStore, sent_writer
+
+    buffered = len(sent_writer._buffer)
+    try:
+        SentMessageStore.record_sent("group", status="success", group_id="g", message=None, timestamp=datetime.now())
+        assert sent_writer._buffer[-1][1]["message"] == ""
+    finally:
+        del sent_writer._buffer[buffered:]
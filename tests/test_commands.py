@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+
+from src.Utils import PluginBase
+from src.Utils.EventClass import GroupMessageEvent, PrivateMessageEvent
+from src.Utils.PluginBase import (
+    CommandLimit, CommandTrie, command, compile_args, invoke_command, parse_args, resolve_command, unregister_command,
+)
+
+
+@pytest.fixture
+def trie():
+    trie = CommandTrie()
+    for name in ("mc", "mchead", "摸", "help"):
+        trie.insert(name)
+    return trie
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("mc Steve", ("mc", 2)),
+    ("mchead Steve", ("mchead", 6)),
+    ("MC Steve", ("mc", 2)),
+    ("mc\tSteve", ("mc", 2)),
+    ("摸 123", ("摸", 1)),
+    ("mc", ("mc", 2)),
+    ("mcSteve", None),  # 命令名之后必须是空白或消息结尾
+    ("摸123", None),
+    ("摸鱼", None),
+    ("mch", None),
+    ("unknown", None),
+    ("", None),
+])
+def test_trie_matches_longest_command(trie, text, expected):
+    assert trie.match(text) == expected
+
+
+def test_trie_remove_keeps_other_commands(trie):
+    trie.remove("mc")
+    assert trie.match("mc Steve") is None
+    assert trie.match("mchead Steve") == ("mchead", 6)
+    trie.remove("not-registered")
+
+
+def test_parse_args_converts_declared_types():
+    schema = compile_args(["host", "count:int", "*rest"])
+    args = parse_args(schema, "example.com  4  the rest  of it")
+    assert (args.host, args.count, args.rest) == ("example.com", 4, "the rest  of it")
+    assert args.tokens == ("example.com", "4", "the", "rest", "of", "it")
+    assert args[0] == "example.com" and args["count"] == 4
+
+
+def test_parse_args_missing_and_invalid_values_are_none():
+    schema = compile_args(["host", "count:int"])
+    args = parse_args(schema, "example.com many")
+    assert (args.host, args.count) == ("example.com", None)
+    assert parse_args(schema, "").host is None
+    with pytest.raises(AttributeError):
+        args.undeclared
+
+
+@pytest.mark.parametrize("spec", [["*rest", "host"], ["count:bool"], [":int"]])
+def test_compile_args_rejects_invalid_specs(spec):
+    with pytest.raises(ValueError):
+        compile_args(spec)
+
+
+def test_registered_command_is_resolved_with_its_arguments():
+    @command(["/测试命令", "测试别名"], event_type=GroupMessageEvent, args=["target"])
+    async def handler(event):
+        pass
+
+    try:
+        name, info, rest = resolve_command("/测试命令 abc def", GroupMessageEvent)
+        assert (name, rest) == ("测试命令", "abc def")
+        assert parse_args(info["args"], rest).target == "abc"
+        assert resolve_command("测试别名", GroupMessageEvent)[0] == "测试别名"
+        assert resolve_command("测试命令", PrivateMessageEvent) is None  # 事件类型不匹配
+    finally:
+        assert unregister_command("测试命令") and unregister_command("测试别名")
+    assert resolve_command("测试命令", GroupMessageEvent) is None
+    assert "测试命令" not in PluginBase.COMMAND_STATS
+
+
+class Event:
+    def __init__(self):
+        self.replies = []
+
+    async def reply(self, content):
+        self.replies.append(content)
+
+
+def run_command(handler, limit, event=None):
+    return invoke_command({"handler": handler, "limit": limit}, event or Event())
+
+
+@pytest.mark.anyio
+async def test_invoke_command_cancels_handlers_past_the_deadline():
+    async def slow(event):
+        await asyncio.sleep(1)
+
+    limit = CommandLimit("slow", 0, 0.05)
+    event = Event()
+    await run_command(slow, limit, event)
+    assert limit.stats["cancelled"] == 1
+    timeout_reply = PluginBase.config.Command.timeout_reply
+    assert event.replies == ([timeout_reply] if timeout_reply else [])
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("timeout", [0, 5])
+async def test_handler_timeouts_are_not_mistaken_for_the_deadline(timeout):
+    async def upstream_timeout(event):
+        raise asyncio.TimeoutError()
+
+    limit = CommandLimit("upstream", 0, timeout)
+    event = Event()
+    with pytest.raises(asyncio.TimeoutError):
+        await run_command(upstream_timeout, limit, event)
+    assert (limit.stats["failed"], limit.stats["cancelled"]) == (1, 0)
+    assert event.replies == []
+
+
+@pytest.mark.anyio
+async def test_invoke_command_rejects_over_concurrency_limit():
+    limit = CommandLimit("busy", 1, 0)
+    release = asyncio.Event()
+
+    async def handler(event):
+        await release.wait()
+
+    first = asyncio.create_task(run_command(handler, limit))
+    await asyncio.sleep(0)
+    await run_command(handler, limit)
+    release.set()
+    await first
+    assert (limit.stats["completed"], limit.stats["rejected"]) == (1, 1)
@@ -0,0 +1,59 @@
+import pytest
+from tortoise import Tortoise, connections
+
+from src.Utils.ConfigClass import DatabaseConfig
+from src.Utils.DatabaseMaintenance import DatabaseMaintenance
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def profile_db(request, tmp_path):
+    """按指定配置档在临时目录中新建 message 数据库"""
+    database = DatabaseConfig(
+        profile=request.param,
+        connections={"message": f"sqlite://{tmp_path / 'message.db'}"},
+        apps={"message": {"models": ["src.Utils.EventSender"], "default_connection": "message"}},
+    )
+    await Tortoise.init(config=database.TORTOISE_ORM)
+    await Tortoise.generate_schemas()
+    yield connections.get("message")
+    await Tortoise.close_connections()
+
+
+async def pragma(client, name):
+    _, rows = await client.execute_query(f"PRAGMA {name}")
+    return rows[0][0]
+
+
+@pytest.mark.parametrize("profile_db", ["performance", "durable"], indirect=True)
+async def test_new_databases_use_incremental_auto_vacuum(profile_db):
+    assert await pragma(profile_db, "auto_vacuum") == 2
+    assert await pragma(profile_db, "journal_mode") == "wal"
+
+
+@pytest.mark.parametrize("profile_db", ["performance"], indirect=True)
+async def test_profile_pragmas_are_applied(profile_db):
+    assert await pragma(profile_db, "synchronous") == 1  # NORMAL
+    assert await pragma(profile_db, "busy_timeout") == 5000
+    assert await pragma(profile_db, "cache_size") == -16000
+
+
+def test_auto_vacuum_runs_before_other_pragmas():
+    database = DatabaseConfig(
+        profile="default",
+        pragmas={"journal_mode": "WAL", "auto_vacuum": "FULL"},
+        connections={"message": "sqlite://data/message.db"},
+    )
+    credentials = database.TORTOISE_ORM["connections"]["message"]["credentials"]
+    assert list(credentials)[0] == "auto_vacuum"
+    assert credentials["file_path"] == "data/message.db"
+
+
+@pytest.mark.parametrize("profile_db", ["performance"], indirect=True)
+async def test_maintenance_checkpoints_and_optimizes(profile_db):
+    maintenance = DatabaseMaintenance(["message"], checkpoint_interval=0, optimize_interval=0)
+    assert await maintenance.checkpoint() == {"message": [(0, 0, 0)]}
+    await maintenance.optimize()
+    stats = maintenance.get_stats()
+    assert (stats["checkpoints"], stats["optimizes"], stats["errors"]) == (1, 1, 0)
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from src.Utils import Dedup
+from src.Utils.Dedup import DedupCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(Dedup.time, "time", lambda: now[0])
+    return now
+
+
+def test_seen_records_first_occurrence(clock):
+    cache = DedupCache(max_size=10, ttl=60)
+    assert cache.seen("event:1") is False
+    assert cache.seen("event:1") is True
+    assert cache.seen("") is False
+    assert cache.get_stats()["hits"] == 1
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = DedupCache(max_size=10, ttl=60)
+    cache.add("event:1")
+    clock[0] += 59
+    assert cache.contains("event:1")  # 命中时刷新有效期
+    clock[0] += 59
+    assert cache.contains("event:1")
+    clock[0] += 61
+    assert not cache.contains("event:1")
+    assert cache.get_stats()["expired"] == 1
+
+
+def test_least_recently_seen_entries_are_evicted(clock):
+    cache = DedupCache(max_size=3, ttl=60)
+    for key in ("a", "b", "c"):
+        cache.add(key)
+    assert cache.contains("a")
+    cache.add("d")
+    assert [cache.contains(key) for key in ("a", "b", "c", "d")] == [True, False, True, True]
+    assert cache.get_stats()["evicted"] == 1
+
+
+def test_snapshot_roundtrip_skips_expired_entries(clock, tmp_path):
+    path = tmp_path / "dedup.json"
+    cache = DedupCache(max_size=10, ttl=60, snapshot_path=str(path))
+    cache.add("old")
+    clock[0] += 30
+    cache.add("new")
+    cache.save_snapshot()
+    assert set(json.loads(path.read_text())) == {"old", "new"}
+
+    clock[0] += 40
+    restored = DedupCache(max_size=10, ttl=60, snapshot_path=str(path))
+    restored.load_snapshot()
+    assert not restored.contains("old")
+    assert restored.contains("new")
+
+
+def test_corrupt_snapshot_is_ignored(clock, tmp_path):
+    path = tmp_path / "dedup.json"
+    path.write_text("{not json")
+    cache = DedupCache(max_size=10, ttl=60, snapshot_path=str(path))
+    cache.load_snapshot()
+    assert cache.get_stats()["size"] == 0
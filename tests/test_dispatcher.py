@@ -0,0 +1,103 @@
+import asyncio, json
+
+import pytest
+
+from src.Utils import Processer
+from src.Utils.EventClass import create_payload
+from src.Utils.Processer import EventDispatcher
+
+pytestmark = pytest.mark.anyio
+
+
+def group_event(index: int, group: str = "g1"):
+    return create_payload({
+        "id": f"e{index}", "op": 0, "s": index, "t": "GROUP_AT_MESSAGE_CREATE",
+        "d": {"id": f"m{index}", "group_id": group, "content": "hi", "author": {"union_openid": "u1"}},
+    })
+
+
+@pytest.fixture
+def handled(monkeypatch):
+    """把事件处理替换为记录事件ID"""
+    events = []
+
+    async def handle_event(payload):
+        events.append(payload.id)
+
+    monkeypatch.setattr(Processer, "handle_event", handle_event)
+    return events
+
+
+async def test_drop_oldest_keeps_newest_events(handled, tmp_path):
+    dispatcher = EventDispatcher(queue_size=2, lanes=1, full_policy="drop_oldest", spill_path=str(tmp_path / "spill.jsonl"))
+    # 工作协程在让出事件循环之前不会取走事件，三个事件都落在同一个容量为2的通道中
+    assert all(dispatcher.submit(group_event(i)) for i in range(3))
+    assert dispatcher.get_stats()["dropped"] == 1
+    await dispatcher.stop()
+    assert handled == ["e1", "e2"]
+
+
+async def test_reject_refuses_new_events(handled, tmp_path):
+    dispatcher = EventDispatcher(queue_size=2, lanes=1, full_policy="reject", spill_path=str(tmp_path / "spill.jsonl"))
+    assert [dispatcher.submit(group_event(i)) for i in range(3)] == [True, True, False]
+    assert dispatcher.get_stats()["rejected"] == 1
+    await dispatcher.stop()
+    assert handled == ["e0", "e1"]
+
+
+async def test_spill_writes_overflow_and_restores_it(handled, tmp_path):
+    spill_path = tmp_path / "spill.jsonl"
+    dispatcher = EventDispatcher(queue_size=2, lanes=1, full_policy="spill", spill_path=str(spill_path))
+    assert all(dispatcher.submit(group_event(i)) for i in range(3))
+    with open(spill_path, encoding="utf-8") as f:
+        assert [json.loads(line)["id"] for line in f] == ["e2"]
+
+    for _ in range(60):  # 溢出文件每秒检查一次
+        if len(handled) == 3:
+            break
+        await asyncio.sleep(0.05)
+    await dispatcher.stop()
+    assert handled == ["e0", "e1", "e2"]
+    stats = dispatcher.get_stats()
+    assert (stats["spilled"], stats["restored"]) == (1, 1)
+    assert not spill_path.exists()
+
+
+async def test_same_conversation_is_processed_in_order(monkeypatch, tmp_path):
+    order = {}
+
+    async def handle_event(payload):
+        await asyncio.sleep(0.001 * (int(payload.id[1:]) % 3))
+        order.setdefault(payload.group_id, []).append(int(payload.id[1:]))
+
+    monkeypatch.setattr(Processer, "handle_event", handle_event)
+    dispatcher = EventDispatcher(queue_size=400, lanes=4, full_policy="reject", spill_path=str(tmp_path / "spill.jsonl"))
+    for i in range(40):
+        assert dispatcher.submit(group_event(i, group=f"g{i % 5}"))
+    await dispatcher.stop()
+    assert {group: events == sorted(events) for group, events in order.items()} == {f"g{i}": True for i in range(5)}
+    assert sum(len(events) for events in order.values()) == 40
+
+
+def test_lane_key_prefers_conversation():
+    assert EventDispatcher.lane_key(group_event(1, group="g9")) == "group_id:g9"
+
+
+@pytest.mark.parametrize("event, expected", [
+    ({"t": "GROUP_ADD_ROBOT", "d": {"group_openid": "g2", "op_member_openid": "u"}}, "group_id:g2"),
+    ({"t": "AT_MESSAGE_CREATE", "d": {"channel_id": "c1", "guild_id": "s1", "author": {"union_openid": "u"}}}, "channel_id:c1"),
+    ({"t": "C2C_MESSAGE_CREATE", "d": {"content": "hi", "author": {"union_openid": "u3"}}}, "user_id:u3"),
+    ({"t": "GUILD_CREATE", "d": {"id": "s1", "name": "guild"}}, "id:e0"),
+])
+def test_lane_key_by_event_type(event, expected):
+    payload = create_payload(json.dumps({"id": "e0", "op": 0, "s": 1, **event}).encode())
+    assert EventDispatcher.lane_key(payload) == expected
+
+
+def test_lane_key_does_not_decode_the_payload():
+    body = {"id": "e1", "op": 0, "s": 1, "t": "GROUP_AT_MESSAGE_CREATE",
+            "d": {"id": "m1", "group_id": "g1", "content": "hi", "author": {"union_openid": "u1"}}}
+    payload = create_payload(json.dumps(body).encode())
+    assert EventDispatcher.lane_key(payload) == "group_id:g1"
+    assert payload._envelope._d_raw is not None  # d字段仍未解码
+    assert payload.group_id == "g1"
@@ -0,0 +1,113 @@
+import pytest
+
+from src.Utils import EventClass
+from src.Utils.EventClass import (
+    EVENT_ROUTES,
+    GroupEvent,
+    GroupMessageEvent,
+    GuildEvent,
+    GuildMessageEvent,
+    MessageEventPayload,
+    PrivateMessageEvent,
+    ValidationEvent,
+    create_payload,
+    register_event_type,
+)
+from src.Utils.PluginBase import on_event
+from src.Utils.Processer import handle_event
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def routes(monkeypatch):
+    """测试结束后恢复事件路由表与各路由的处理器链"""
+    saved = {name: (route, list(route.handlers)) for name, route in EVENT_ROUTES.items()}
+    monkeypatch.setattr(EventClass, "MESSAGE_EVENT_TYPES", EventClass.MESSAGE_EVENT_TYPES)
+    yield EVENT_ROUTES
+    EVENT_ROUTES.clear()
+    for name, (route, handlers) in saved.items():
+        route.handlers = handlers
+        EVENT_ROUTES[name] = route
+
+
+def event(t, op=0, d=None):
+    return {"id": "e1", "op": op, "s": 1, "t": t, "d": d or {}}
+
+
+@pytest.mark.parametrize("t, cls", [
+    ("AT_MESSAGE_CREATE", GuildMessageEvent),
+    ("DIRECT_MESSAGE_CREATE", GuildMessageEvent),
+    ("GROUP_AT_MESSAGE_CREATE", GroupMessageEvent),
+    ("C2C_MESSAGE_CREATE", PrivateMessageEvent),
+    ("GUILD_MEMBER_ADD", GuildEvent),
+    ("GROUP_ADD_ROBOT", GroupEvent),
+    ("SOMETHING_NEW", MessageEventPayload),
+])
+def test_dispatch_events_are_routed_by_type(t, cls):
+    payload = create_payload(event(t))
+    assert type(payload) is cls
+    assert payload._d is None  # 仅依据外层字段选择子类
+
+
+def test_validation_event_ignores_type():
+    payload = create_payload(event("GROUP_AT_MESSAGE_CREATE", op=13, d={"plain_token": "p", "event_ts": "1"}))
+    assert type(payload) is ValidationEvent
+    assert payload.plain_token == "p"
+
+
+def test_message_event_types(routes):
+    assert EventClass.MESSAGE_EVENT_TYPES == {
+        "MESSAGE_CREATE", "AT_MESSAGE_CREATE", "DIRECT_MESSAGE_CREATE",
+        "GROUP_AT_MESSAGE_CREATE", "C2C_MESSAGE_CREATE",
+    }
+    assert create_payload(event("C2C_MESSAGE_CREATE")).is_message_create()
+    assert not create_payload(event("GROUP_ADD_ROBOT")).is_message_create()
+
+
+def test_register_event_type_updates_existing_route(routes):
+    route = register_event_type("CUSTOM_EVENT", GroupEvent)
+    assert type(create_payload(event("CUSTOM_EVENT"))) is GroupEvent
+    assert "CUSTOM_EVENT" not in EventClass.MESSAGE_EVENT_TYPES
+
+    route.handlers.append(print)
+    assert register_event_type("CUSTOM_EVENT", GroupMessageEvent, is_message=True) is route
+    assert route.handlers == [print]  # 处理器链保持不变
+    assert type(create_payload(event("CUSTOM_EVENT"))) is GroupMessageEvent
+    assert "CUSTOM_EVENT" in EventClass.MESSAGE_EVENT_TYPES
+
+
+async def test_handlers_run_in_order_and_errors_do_not_stop_the_chain(routes):
+    calls = []
+
+    async def first(payload):
+        calls.append(("first", payload.group_id))
+        raise RuntimeError("boom")
+
+    async def second(payload):
+        calls.append(("second", payload.group_id))
+
+    on_event("GROUP_DEL_ROBOT")(first)
+    on_event(["GROUP_DEL_ROBOT", "GROUP_MSG_REJECT"])(second)
+    await handle_event(create_payload(event("GROUP_DEL_ROBOT", d={"group_openid": "g1"})))
+    assert calls == [("first", "g1"), ("second", "g1")]
+
+    # 同一模块的同名函数重复注册时覆盖原处理器
+    on_event("GROUP_DEL_ROBOT")(first)
+    assert [h.__name__ for h in routes["GROUP_DEL_ROBOT"].handlers] == ["second", "first"]
+
+
+async def test_on_event_registers_unknown_types(routes):
+    calls = []
+
+    async def handler(payload):
+        calls.append(payload.id)
+
+    on_event("BRAND_NEW_EVENT")(handler)
+    assert routes["BRAND_NEW_EVENT"].payload_class is MessageEventPayload
+    assert await handle_event(create_payload(event("BRAND_NEW_EVENT"))) is None
+    assert calls == ["e1"]
+
+
+async def test_unregistered_event_is_ignored(routes):
+    assert await handle_event(create_payload(event("NOT_REGISTERED"))) is None
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from uapis_extension import hotboard as hotboard_module
+from uapis_extension.client import UapisClient
+from uapis_extension.hotboard import HotboardRefresher
+
+pytestmark = pytest.mark.anyio
+
+
+class Upstream:
+    """本地模拟的热榜接口，每次请求返回的标题带递增的版本号"""
+
+    def __init__(self):
+        self.hits = 0
+        self.delay = 0.0
+        self.down = False
+
+    async def handler(self, request):
+        self.hits += 1
+        await asyncio.sleep(self.delay)
+        if self.down:
+            return web.json_response({"code": 502, "message": "bad gateway"}, status=502)
+        board = request.query["type"]
+        return web.json_response({
+            "list": [{"index": 1, "title": f"{board}-{self.hits}", "hot_value": 100}],
+            "update_time": f"v{self.hits}",
+        })
+
+
+@pytest.fixture
+async def upstream(http_client, monkeypatch):
+    stand_in = Upstream()
+    app = web.Application()
+    app.router.add_get("/api/v1/misc/hotboard", stand_in.handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    monkeypatch.setattr(hotboard_module, "uapis_client", UapisClient(f"http://127.0.0.1:{port}/"))
+    yield stand_in
+    await runner.cleanup()
+
+
+@pytest.fixture
+def refresher():
+    refresher = HotboardRefresher({"weibo": "微博-热搜榜", "zhihu": "知乎-热搜榜"}, interval=60, retry_interval=10)
+    yield refresher
+    refresher.stop()
+
+
+async def test_cold_board_is_fetched_once_for_concurrent_callers(upstream, refresher):
+    upstream.delay = 0.05
+    results = await asyncio.gather(*(refresher.get("weibo") for _ in range(5)))
+    assert upstream.hits == 1
+    assert results == [results[0]] * 5
+    assert results[0].startswith("===微博-热搜榜===\n1 - weibo-1 | 100\n")
+    # 之后直接返回内存中的内容
+    assert await refresher.get("weibo") == results[0]
+    assert upstream.hits == 1
+
+
+async def test_cold_board_without_upstream_returns_none(upstream, refresher):
+    upstream.down = True
+    assert await refresher.get("weibo") is None
+    assert refresher.get_stats()["failures"] == 1
+
+
+async def test_background_loop_refreshes_every_board(upstream, refresher):
+    refresher.interval = 0.05
+    refresher.start()
+    for _ in range(60):
+        if upstream.hits >= 4:
+            break
+        await asyncio.sleep(0.05)
+    assert upstream.hits >= 4
+    assert set(refresher.get_stats()["age"]) == {"weibo", "zhihu"}
+    assert "weibo-" in await refresher.get("weibo")
+
+
+async def test_failed_refresh_keeps_serving_the_last_content(upstream, refresher):
+    first = await refresher.get("weibo")
+    upstream.down = True
+    assert await refresher.refresh("weibo") is False
+    assert await refresher.get("weibo") == first
+
+
+async def test_stale_board_is_served_while_it_revalidates(upstream, refresher):
+    first = await refresher.get("weibo")
+    refresher._updated_at["weibo"] -= refresher.interval + refresher.retry_interval + 1
+    upstream.delay = 0.2
+    # 不等待上游，直接返回旧内容并在后台刷新
+    assert await asyncio.wait_for(refresher.get("weibo"), timeout=0.1) == first
+    assert refresher.get_stats()["stale_served"] == 1
+    await refresher.refresh("weibo")
+    assert "weibo-2" in await refresher.get("weibo")
+    assert upstream.hits == 2
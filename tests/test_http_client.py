@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from src.Utils import HttpClient
+from src.Utils.Config import config
+from src.Utils.HttpClient import close_http_client, get_session, start_http_client
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def server(http_client):
+    """本地HTTP服务，记录每个请求的客户端端口（即所用的TCP连接）"""
+    peers = []
+
+    async def handler(request):
+        peers.append(request.transport.get_extra_info("peername")[1])
+        await asyncio.sleep(float(request.query.get("delay", 0)))
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_get("/", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}/", peers
+    await runner.cleanup()
+
+
+async def test_session_is_shared_and_configured(http_client):
+    session = await start_http_client()
+    assert await start_http_client() is session
+    assert get_session() is session
+    assert session.connector.limit == config.Http.limit
+    assert session.connector.limit_per_host == config.Http.limit_per_host
+
+
+async def test_sequential_requests_reuse_one_connection(server):
+    url, peers = server
+    for _ in range(5):
+        async with get_session().get(url) as response:
+            assert (await response.json()) == {"ok": True}
+    assert len(peers) == 5
+    assert len(set(peers)) == 1
+
+
+async def test_concurrent_requests_respect_per_host_limit(server, monkeypatch):
+    url, peers = server
+    monkeypatch.setattr(config.Http, "limit_per_host", 2)
+    await close_http_client()
+
+    async def fetch():
+        async with get_session().get(url + "?delay=0.05") as response:
+            return response.status
+
+    assert await asyncio.gather(*(fetch() for _ in range(6))) == [200] * 6
+    assert len(set(peers)) == 2
+
+
+async def test_closed_session_is_recreated_on_demand(http_client):
+    session = get_session()
+    await close_http_client()
+    assert session.closed
+    assert HttpClient._session is None
+    assert get_session() is not session
+    await close_http_client()
+    await close_http_client()  # 重复关闭不报错
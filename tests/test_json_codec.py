@@ -0,0 +1,58 @@
+import pytest
+
+from src.Utils import JsonCodec
+from src.Utils.EventClass import create_payload
+from src.Utils.JsonCodec import decode_envelope
+
+BODY = (
+    '{"id":"e1","op":0,"s":7,"t":"GROUP_AT_MESSAGE_CREATE",'
+    '"d":{"id":"m1","group_id":"g1","content":"你好","author":{"union_openid":"u1"},'
+    '"attachments":[{"filename":"a.png","url":"http://x/a.png","content_type":"image/png"}]}}'
+).encode("utf-8")
+
+
+@pytest.fixture(params=["msgspec", "fallback"])
+def backend(request, monkeypatch):
+    """分别在msgspec与其他后端（一次性解析全部内容）下运行"""
+    if request.param == "msgspec":
+        if JsonCodec.msgspec is None:
+            pytest.skip("msgspec 未安装")
+    else:
+        monkeypatch.setattr(JsonCodec, "msgspec", None)
+    return request.param
+
+
+def test_outer_fields_are_decoded_without_d(backend):
+    envelope = decode_envelope(BODY)
+    assert (envelope.op, envelope.s, envelope.t, envelope.id) == (0, 7, "GROUP_AT_MESSAGE_CREATE", "e1")
+    if backend == "msgspec":
+        assert envelope._d_raw is not None  # d字段保持为原始字节
+    assert envelope.d["content"] == "你好"
+    assert envelope._d_raw is None
+
+
+def test_str_and_bytes_bodies_decode_alike(backend):
+    assert decode_envelope(BODY.decode("utf-8")).to_dict() == decode_envelope(BODY).to_dict()
+    assert decode_envelope(memoryview(BODY)).to_dict()["d"]["group_id"] == "g1"
+
+
+def test_missing_d_reads_as_empty_dict(backend):
+    envelope = decode_envelope(b'{"op":12,"d":null}')
+    assert envelope.op == 12
+    assert envelope.d == {}
+
+
+@pytest.mark.parametrize("body", [b"[1, 2]", b"{not json", b""])
+def test_invalid_body_raises_value_error(backend, body):
+    with pytest.raises(ValueError):
+        decode_envelope(body)
+
+
+def test_payload_decodes_d_on_first_access(backend):
+    payload = create_payload(BODY)
+    assert payload.id == "e1"
+    assert payload._d is None
+    if backend == "msgspec":
+        assert payload._envelope._d_raw is not None
+    assert payload.content == "你好 [图片:a.png][URL: http://x/a.png]"
+    assert payload.to_dict()["d"]["author"]["union_openid"] == "u1"
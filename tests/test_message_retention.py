@@ -0,0 +1,86 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.Utils.EventSender import GroupMessage, SentGroupMessage
+from src.Utils.MessageRetention import MessageRetention
+
+pytestmark = pytest.mark.anyio
+
+
+async def seed(now):
+    old = [now - timedelta(days=90), now - timedelta(days=60), now - timedelta(days=45)]
+    for index, timestamp in enumerate(old + [now - timedelta(days=1), now]):
+        await GroupMessage.create(group_id="g", user_id="u", message=f"m{index}", message_id=f"id{index}", timestamp=timestamp)
+    return old
+
+
+def archived(path, table="group_messages"):
+    with sqlite3.connect(path) as db:
+        return sorted(row[0] for row in db.execute(f'SELECT message_id FROM "{table}"'))
+
+
+async def test_old_rows_move_to_monthly_archives(db, tmp_path):
+    now = datetime.now().replace(microsecond=0)
+    old = await seed(now)
+    retention = MessageRetention(enable=True, default_days=30, archive_dir=str(tmp_path / "archive"), batch_size=2, batch_pause=0)
+    await retention.run()
+
+    assert sorted(await GroupMessage.all().values_list("message_id", flat=True)) == ["id3", "id4"]
+    expected = {}
+    for index, timestamp in enumerate(old):
+        expected.setdefault(retention.archive_path(GroupMessage, timestamp.strftime("%Y%m")), []).append(f"id{index}")
+    assert {path: archived(path) for path in expected} == expected
+    assert retention.get_stats()["archived"] == 3
+
+    # 再次执行不会产生重复记录
+    await retention.run()
+    assert sum(len(archived(path)) for path in expected) == 3
+
+
+async def test_archived_rows_keep_their_columns(db, tmp_path):
+    now = datetime.now().replace(microsecond=0)
+    old = await seed(now)
+    retention = MessageRetention(enable=True, default_days=30, archive_dir=str(tmp_path / "archive"), batch_pause=0)
+    await retention.run()
+    path = retention.archive_path(GroupMessage, old[0].strftime("%Y%m"))
+    with sqlite3.connect(path) as conn:
+        row = conn.execute('SELECT group_id, user_id, message FROM group_messages WHERE message_id = ?', ("id0",)).fetchone()
+    assert row == ("g", "u", "m0")
+
+
+async def test_delete_mode_and_per_table_override(db, tmp_path):
+    now = datetime.now()
+    await seed(now)
+    await SentGroupMessage.create(group_id="g", message="old", status="success", timestamp=now - timedelta(days=90))
+    retention = MessageRetention(
+        enable=True, default_days=30, tables={"sent_group_messages": 0}, archive=False,
+        archive_dir=str(tmp_path / "archive"), batch_pause=0,
+    )
+    await retention.run()
+    assert await GroupMessage.all().count() == 2
+    assert await SentGroupMessage.all().count() == 1  # 保留天数为0的表永久保留
+    assert retention.get_stats()["deleted"] == 3
+    assert not (tmp_path / "archive").exists()
+
+
+async def test_compaction_returns_free_pages(db, tmp_path):
+    client = GroupMessage._meta.db
+    old = datetime.now() - timedelta(days=90)
+    await GroupMessage.bulk_create([
+        GroupMessage(group_id="g", user_id="u", message="x" * 1000, message_id=f"id{index}", timestamp=old)
+        for index in range(500)
+    ])
+
+    async def pragma(name):
+        _, rows = await client.execute_query(f"PRAGMA {name}")
+        return rows[0][0]
+
+    assert await pragma("auto_vacuum") == 2
+    pages = await pragma("page_count")
+    retention = MessageRetention(enable=True, default_days=30, archive_dir=str(tmp_path / "archive"), batch_pause=0, vacuum_pages=0)
+    await retention.run()
+    assert await GroupMessage.all().count() == 0
+    assert await pragma("freelist_count") == 0
+    assert await pragma("page_count") < pages / 4
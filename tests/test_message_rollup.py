@@ -0,0 +1,91 @@
+import json, time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.Utils.EventSender import GroupMessage
+from src.Utils.MessageRollup import MessageRollup, bucket_of
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def local_tz(monkeypatch):
+    """把本地时区设为UTC+8，使本地时间与UTC不同"""
+    monkeypatch.setenv("TZ", "Asia/Shanghai")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_bucket_of_truncates_to_hour_and_day(local_tz):
+    dt = datetime(2026, 3, 5, 14, 37, 12)
+    assert datetime.fromtimestamp(bucket_of("hour", dt)) == datetime(2026, 3, 5, 14)
+    assert datetime.fromtimestamp(bucket_of("day", dt)) == datetime(2026, 3, 5)
+
+
+def test_bucket_of_ignores_tzinfo_label(local_tz):
+    dt = datetime(2026, 3, 5, 23, 30)
+    for granularity in ("hour", "day"):
+        assert bucket_of(granularity, dt.replace(tzinfo=timezone.utc)) == bucket_of(granularity, dt)
+
+
+async def test_backfill_and_incr_share_buckets(db, local_tz):
+    dt = datetime(2026, 3, 5, 23, 30)
+    await GroupMessage.create(group_id="g1", user_id="u1", message="m", message_id="1", timestamp=dt)
+
+    rollup = MessageRollup(connection="message")
+    await rollup._init_backfill()
+    await rollup._backfill()
+    rollup.incr("received", "group", "g1", dt)
+    await rollup.flush()
+
+    start, end = dt - timedelta(days=1), dt + timedelta(days=1)
+    assert await rollup.query_range(start, end, "hour") == [{"time": "2026-03-05T23:00:00", "count": 2}]
+    assert await rollup.query_range(start, end, "day") == [{"time": "2026-03-05T00:00:00", "count": 2}]
+    assert rollup.get_stats()["backfilled"] == 1
+
+
+async def test_query_range_merges_pending_increments(db):
+    dt = datetime(2026, 3, 5, 10, 15)
+    rollup = MessageRollup(connection="message")
+    rollup.incr("received", "group", "g1", dt)
+    await rollup.flush()
+    rollup.incr("received", "group", "g1", dt, count=2)
+    rollup.incr("sent", "group", "g1", dt + timedelta(hours=1))
+
+    rows = await rollup.query_range(dt - timedelta(hours=1), dt + timedelta(hours=3), "hour", direction="received")
+    assert rows == [{"time": "2026-03-05T10:00:00", "count": 3}]
+    rows = await rollup.query_range(dt - timedelta(hours=1), dt + timedelta(hours=3), "hour", by_target=True)
+    assert [(row["direction"], row["count"]) for row in rows] == [("received", 3), ("sent", 1)]
+
+
+async def test_query_range_converts_aware_bounds_to_local_time(db, local_tz):
+    dt = datetime(2026, 3, 5, 10, 15)
+    rollup = MessageRollup(connection="message")
+    rollup.incr("received", "group", "g1", dt)
+    await rollup.flush()
+    # 本地10:15即UTC 02:15，以UTC表示的02:00~03:00应当包含这条记录
+    start = datetime(2026, 3, 5, 2, tzinfo=timezone.utc)
+    assert await rollup.query_range(start, start + timedelta(hours=1), "hour") == [{"time": "2026-03-05T10:00:00", "count": 1}]
+    assert await rollup.query_range(start.replace(hour=10), start.replace(hour=11), "hour") == []
+
+
+@pytest.mark.parametrize("start, end, status", [
+    ("2026-03-05T02:00:00+00:00", None, 200),  # 带时区的start与默认的本地end
+    (None, "2026-03-05T12:00:00+08:00", 200),
+    ("2026-03-05T02:00:00+00:00", "2026-03-05T10:30:00", 200),
+    ("2026-03-05T12:00:00+08:00", "2026-03-05T03:00:00+00:00", 400),  # 换算后start晚于end
+    ("not-a-time", None, 400),
+    ("9999-12-31T23:59:59-14:00", None, 400),
+])
+async def test_stats_range_endpoint_accepts_mixed_timezones(db, local_tz, start, end, status):
+    from src.app.routes import get_stats_range
+
+    response = await get_stats_range(start=start, end=end, current_user="admin")
+    assert response.status_code == status
+    if status == 200:
+        data = json.loads(response.body)["data"]
+        assert datetime.fromisoformat(data["start"]).tzinfo is None
+        assert datetime.fromisoformat(data["end"]).tzinfo is None
@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+from src.Utils import MessageSender
+from src.Utils.EventClass import MessageSenderBasePayload
+from src.Utils.GetAccessToken import AccessTokenManager
+from src.Utils.SendScheduler import SendJob, SendScheduler
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_send_returns_before_the_message_is_sent(monkeypatch):
+    release = asyncio.Event()
+    sent = []
+
+    async def send(job):
+        await release.wait()
+        sent.append(job.target)
+        return 200, {"id": "msg"}
+
+    async def finish(job, status, body):
+        pass
+
+    scheduler = SendScheduler(send=send, finish=finish, workers=1)
+    monkeypatch.setattr(MessageSender, "send_scheduler", scheduler)
+    payload = MessageSenderBasePayload()
+    payload.content = "hi"
+    future = await asyncio.wait_for(MessageSender.send_group_message("g1", payload), timeout=1)
+    assert not future.done()
+    release.set()
+    assert await future
+    await scheduler.stop()
+    assert sent == ["g1"]
+
+
+async def test_unready_token_fails_the_job_instead_of_blocking(monkeypatch):
+    manager = AccessTokenManager("appid", "secret")
+    manager.start = lambda: None  # 模拟凭证一直获取失败
+    monkeypatch.setattr(MessageSender, "token_manager", manager)
+    monkeypatch.setattr(MessageSender.config.AccessToken, "send_wait_timeout", 0.05)
+    status, body = await asyncio.wait_for(
+        MessageSender._post_message(SendJob("group", "g1", MessageSenderBasePayload())), timeout=1
+    )
+    assert status == -1 and body["code"] == -1
@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.Utils.EventSender import GroupMessage, SentUserMessage
+from src.Utils.MessageState import MessageCounters, _count_since
+
+pytestmark = pytest.mark.anyio
+
+
+def details(stats, direction, name):
+    return {tuple(item.values())[0]: item["count"] for item in stats[direction][name]["details"]}
+
+
+async def test_cold_start_counts_the_database(db):
+    for index, group in enumerate(("g1", "g1", "g2")):
+        await GroupMessage.create(group_id=group, user_id="u", message="m", message_id=f"id{index}")
+    await SentUserMessage.create(user_id="u1", message="m", status="success")
+
+    counters = MessageCounters()
+    await counters.start()
+    stats = counters.get_stats(since_start=False)
+    assert stats["received"]["group"]["total"] == 3
+    assert details(stats, "received", "group") == {"g1": 2, "g2": 1}
+    assert details(stats, "sent", "private") == {"u1": 1}
+    # 启动时已有的记录不计入本次启动以来的统计
+    assert counters.get_stats()["received"]["group"]["total"] == 0
+
+    counters.incr("received", "group", "g2")
+    stats = counters.get_stats()
+    assert (stats["received"]["group"]["total"], details(stats, "received", "group")) == (1, {"g2": 1})
+
+
+async def test_restart_counts_only_records_after_the_snapshot(db, tmp_path):
+    path = str(tmp_path / "counters.json")
+    counters = MessageCounters(snapshot_path=path)
+    await counters.start()
+    counters.incr("received", "group", "g1", 5)
+    await counters.stop()
+
+    await GroupMessage.create(group_id="g1", user_id="u", message="m", message_id="id")
+    restarted = MessageCounters(snapshot_path=path)
+    await restarted.start()
+    await restarted.stop()
+    assert details(restarted.get_stats(since_start=False), "received", "group") == {"g1": 6}
+
+
+async def test_count_since_works_without_the_composite_index(db):
+    now = datetime.now()
+    rows = [("g1", now), ("g1", now), ("g2", now), ("g2", now - timedelta(days=2))]
+    for index, (group, timestamp) in enumerate(rows):
+        await GroupMessage.create(group_id=group, user_id="u", message="m", message_id=f"id{index}", timestamp=timestamp)
+    since = now - timedelta(days=1)
+    assert sorted(await _count_since(GroupMessage, "group_id", since)) == [("g1", 2), ("g2", 1)]
+
+    # 未执行迁移的旧数据库没有 (timestamp, group_id) 复合索引
+    await GroupMessage._meta.db.execute_script('DROP INDEX "idx_group_messages_timestamp_group_id"')
+    assert sorted(await _count_since(GroupMessage, "group_id", since)) == [("g1", 2), ("g2", 1)]
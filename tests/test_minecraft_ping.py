@@ -0,0 +1,208 @@
+import asyncio, json, struct
+
+import pytest
+
+from uapis_extension.minecraft_ping import (
+    MinecraftPinger, encode_varint, read_varint, parse_address, _pack_packet, _pack_string, _RAKNET_MAGIC,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+async def java_server(status):
+    """返回固定状态响应的Java版服务器，Ping包原样返回"""
+    body = status if isinstance(status, str) else json.dumps(status)
+
+    async def handle(reader, writer):
+        await reader.read(1024)  # 握手与状态请求
+        writer.write(_pack_packet(0x00, _pack_string(body)))
+        await writer.drain()
+        ping = await reader.read(1024)
+        if ping:
+            writer.write(ping)
+            await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+
+
+class BedrockServer(asyncio.DatagramProtocol):
+    def __init__(self, reply):
+        self.reply = reply
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.transport.sendto(self.reply, addr)
+
+
+async def bedrock_server(reply: bytes):
+    transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+        lambda: BedrockServer(reply), local_addr=("127.0.0.1", 0)
+    )
+    return transport, transport.get_extra_info("sockname")[1]
+
+
+def bedrock_pong(info: str) -> bytes:
+    data = info.encode("utf-8")
+    return bytes([0x1C]) + bytes(16) + _RAKNET_MAGIC + struct.pack(">H", len(data)) + data
+
+
+def test_varint_roundtrip():
+    async def read(data):
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        return await read_varint(reader)
+
+    for value in (0, 1, 127, 128, 25565, 2 ** 31 - 1, -1):
+        assert asyncio.run(read(encode_varint(value))) == value
+
+
+def test_parse_address():
+    assert parse_address("mc,hypixel,net") == ("mc.hypixel.net", None)
+    assert parse_address("example.com:25566") == ("example.com", 25566)
+    assert parse_address("[2001:db8::1]:19132") == ("2001:db8::1", 19132)
+    with pytest.raises(ValueError):
+        parse_address("example.com:abc")
+
+
+async def test_java_status_is_parsed():
+    server, port = await java_server({
+        "description": {"text": "§aAxT ", "extra": [{"text": "测试"}]},
+        "players": {"online": 7, "max": 100},
+        "version": {"name": "1.21.1"},
+    })
+    async with server:
+        result = await MinecraftPinger(timeout=2, allow_private=True).ping(f"127.0.0.1:{port}")
+    assert result["online"]
+    assert (result["motd_clean"], result["players"], result["max_players"], result["version"]) == (
+        "§aAxT 测试", 7, 100, "1.21.1"
+    )
+
+
+@pytest.mark.parametrize("status", ["[]", '"hello"', "not json"])
+async def test_java_non_object_status_is_offline(status):
+    server, port = await java_server(status)
+    async with server:
+        result = await MinecraftPinger(timeout=2, allow_private=True).ping(f"127.0.0.1:{port}")
+    assert result["online"] is False
+
+
+async def test_java_malformed_fields_fall_back():
+    server, port = await java_server({"description": 5, "players": "many", "version": ["1.21"]})
+    async with server:
+        result = await MinecraftPinger(timeout=2, allow_private=True).ping(f"127.0.0.1:{port}")
+    assert result["online"]
+    assert (result["players"], result["max_players"], result["version"]) == (0, 0, "未知")
+
+
+async def test_bedrock_pong_is_parsed():
+    transport, port = await bedrock_server(
+        bedrock_pong("MCPE;AxT 基岩版;594;1.20.80;3;20;123;子标题;Survival;1;19132;19133;")
+    )
+    try:
+        result = await MinecraftPinger(timeout=2, allow_private=True).ping(f"127.0.0.1:{port}", "be")
+    finally:
+        transport.close()
+    assert result["online"]
+    assert (result["motd_clean"], result["players"], result["max_players"]) == ("AxT 基岩版\n子标题", 3, 20)
+
+
+@pytest.mark.parametrize("reply", [
+    bytes([0x1C]) + bytes(16) + _RAKNET_MAGIC,  # 缺少字符串长度
+    bytes([0x1C]) + bytes(16) + _RAKNET_MAGIC + b"\x00",
+    bytes([0x1C]) + bytes(32),  # MAGIC不匹配
+], ids=["no-length", "short-length", "bad-magic"])
+async def test_bedrock_truncated_pong_is_offline(reply):
+    transport, port = await bedrock_server(reply)
+    try:
+        result = await MinecraftPinger(timeout=2, allow_private=True).ping(f"127.0.0.1:{port}", "be")
+    finally:
+        transport.close()
+    assert result["online"] is False
+
+
+async def test_concurrent_pings_share_one_query():
+    connections = 0
+
+    async def handle(reader, writer):
+        nonlocal connections
+        connections += 1
+        await reader.read(1024)
+        await asyncio.sleep(0.05)
+        writer.write(_pack_packet(0x00, _pack_string(json.dumps({"players": {"online": 1, "max": 2}}))))
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    pinger = MinecraftPinger(timeout=2, allow_private=True)
+    async with server:
+        results = await asyncio.gather(*(pinger.ping(f"127.0.0.1:{port}") for _ in range(20)))
+        await pinger.ping(f"127.0.0.1:{port}")
+    assert connections == 1
+    assert all(result["online"] for result in results)
+    assert pinger.get_stats()["hits"] == 1
+
+
+async def test_cancelled_ping_does_not_cancel_other_waiters():
+    async def handle(reader, writer):
+        await reader.read(1024)
+        await asyncio.sleep(0.1)
+        writer.write(_pack_packet(0x00, _pack_string(json.dumps({"players": {"online": 1, "max": 2}}))))
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    pinger = MinecraftPinger(timeout=2, allow_private=True)
+    async with server:
+        first = asyncio.ensure_future(pinger.ping(f"127.0.0.1:{port}"))
+        await asyncio.sleep(0.02)
+        others = [asyncio.ensure_future(pinger.ping(f"127.0.0.1:{port}")) for _ in range(3)]
+        await asyncio.sleep(0.02)
+        first.cancel()  # 如第一个发起查询的命令超时
+        results = await asyncio.gather(*others)
+    assert all(result["online"] for result in results)
+    assert first.cancelled()
+    assert pinger.get_stats()["inflight"] == 0
+
+
+@pytest.mark.parametrize("address, edition", [
+    ("127.0.0.1", "java"),
+    ("localhost", "java"),
+    ("10.0.0.1:25565", "java"),
+    ("169.254.169.254:80", "java"),
+    ("[::1]:25565", "java"),
+    ("192.168.1.1", "be"),
+])
+async def test_private_addresses_are_refused(address, edition, monkeypatch):
+    async def no_connect(*args, **kwargs):
+        raise AssertionError("不应连接非公网地址")
+
+    monkeypatch.setattr(asyncio, "open_connection", no_connect)
+    pinger = MinecraftPinger(timeout=2)
+    result = await pinger.ping(address, edition)
+    assert result["online"] is False
+    assert "公网" in result["error"]
+    assert pinger.get_stats()["refused"] == 1
+
+
+async def test_srv_target_is_checked(monkeypatch):
+    pinger = MinecraftPinger(timeout=2)
+
+    async def srv(host):
+        return "internal.example", 25565
+
+    async def getaddrinfo(host, port, **kwargs):
+        assert host == "internal.example"
+        return [(2, 1, 6, "", ("10.1.2.3", port))]
+
+    monkeypatch.setattr(pinger, "_resolve_srv", srv)
+    monkeypatch.setattr(asyncio.get_running_loop(), "getaddrinfo", getaddrinfo)
+    result = await pinger.ping("mc.example.com")
+    assert result["online"] is False
+    assert pinger.get_stats()["refused"] == 1
@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from uapis_extension.minecraft_uuid import MinecraftUUIDCache
+
+pytestmark = pytest.mark.anyio
+
+PLAYERS = {f"player{i}": f"{i:032x}" for i in range(20)}
+PLAYERS["Notch"] = "069a79f444e94726a5befca90e38aaf5"
+
+
+class Mojang:
+    """本地模拟的Mojang批量查询接口，记录每次请求的玩家名列表"""
+
+    def __init__(self):
+        self.requests = []
+        self.status = 200
+
+    async def profiles(self, request):
+        names = await request.json()
+        self.requests.append(names)
+        if self.status != 200:
+            return web.json_response({"errorMessage": "Too Many Requests"}, status=self.status)
+        if len(names) > 10:
+            return web.json_response({"errorMessage": "Not more that 10 profile name per call is allowed."}, status=400)
+        lookup = {name.lower(): (name, uuid) for name, uuid in PLAYERS.items()}
+        return web.json_response([
+            {"id": lookup[name.lower()][1], "name": lookup[name.lower()][0]}
+            for name in names if name.lower() in lookup
+        ])
+
+
+@pytest.fixture
+async def mojang(http_client):
+    stand_in = Mojang()
+    app = web.Application()
+    app.router.add_post("/profiles/minecraft", stand_in.profiles)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    stand_in.url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/profiles/minecraft"
+    yield stand_in
+    await runner.cleanup()
+
+
+@pytest.fixture
+def make_cache(mojang, tmp_path):
+    caches = []
+
+    def make(**kwargs):
+        cache = MinecraftUUIDCache(str(tmp_path / "cache" / "uuid.db"), profiles_url=mojang.url, **kwargs)
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        cache.close()
+
+
+async def test_misses_are_batched_into_bulk_requests(mojang, make_cache):
+    cache = make_cache()
+    names = [f"player{i}" for i in range(11)] + ["notch", "nobody"]
+    results = await cache.resolve_many(names)
+    assert results == {**{f"player{i}": PLAYERS[f"player{i}"] for i in range(11)}, "notch": PLAYERS["Notch"], "nobody": None}
+    assert sorted(len(batch) for batch in mojang.requests) == [3, 10]
+    stats = cache.get_stats()
+    assert (stats["batches"], stats["looked_up"], stats["not_found"], stats["pending"]) == (2, 12, 1, 0)
+
+
+async def test_concurrent_lookups_of_one_name_share_a_request(mojang, make_cache):
+    cache = make_cache()
+    results = await asyncio.gather(*(cache.resolve(name) for name in ("Notch", "notch", "NOTCH")))
+    assert results == [PLAYERS["Notch"]] * 3
+    assert mojang.requests == [["notch"]]
+
+
+async def test_cache_persists_across_instances(mojang, make_cache):
+    await make_cache().resolve_many(["Notch", "nobody"])
+    assert len(mojang.requests) == 1
+
+    cache = make_cache()
+    assert await cache.resolve("Notch") == PLAYERS["Notch"]
+    assert await cache.resolve("nobody") is None  # 不存在的玩家名同样缓存
+    assert await cache.resolve("Notch") == PLAYERS["Notch"]
+    assert len(mojang.requests) == 1
+    stats = cache.get_stats()
+    assert (stats["disk_hits"], stats["negative_hits"], stats["memory_hits"]) == (1, 1, 1)
+
+
+async def test_failed_lookups_are_not_cached(mojang, make_cache):
+    cache = make_cache()
+    mojang.status = 429
+    assert await cache.resolve("Notch") is None
+    assert cache.get_stats()["errors"] == 1
+    mojang.status = 200
+    assert await cache.resolve("Notch") == PLAYERS["Notch"]
+    assert len(mojang.requests) == 2
+
+
+async def test_expired_entries_are_looked_up_again(mojang, make_cache):
+    cache = make_cache(ttl=0.05, negative_ttl=0.05)
+    await cache.resolve_many(["Notch", "nobody"])
+    await asyncio.sleep(0.1)
+    await cache.resolve_many(["Notch", "nobody"])
+    assert len(mojang.requests) == 2
+
+
+@pytest.mark.parametrize("name", ["", "has space", "x" * 17, "名字"])
+async def test_invalid_names_are_rejected_locally(mojang, make_cache, name):
+    assert await make_cache().resolve(name) is None
+    assert mojang.requests == []
+
+
+async def test_memory_only_cache(mojang):
+    cache = MinecraftUUIDCache(None, profiles_url=mojang.url, memory_size=1)
+    try:
+        await cache.resolve("Notch")
+        await cache.resolve("player1")
+        await cache.resolve("Notch")  # 已被挤出内存缓存
+        assert len(mojang.requests) == 3
+    finally:
+        cache.close()
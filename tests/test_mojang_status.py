@@ -0,0 +1,118 @@
+import asyncio, time
+
+import pytest
+from aiohttp import web
+
+from uapis_extension.mojang_status import MOJANG_ENDPOINTS, MojangStatusMonitor
+
+pytestmark = pytest.mark.anyio
+
+
+class Services:
+    """本地模拟的会话服务器与API服务"""
+
+    def __init__(self):
+        self.requests = 0
+        self.delay = {"session": 0.0, "api": 0.0}
+        self.api_status = "OK"
+
+    async def session(self, request):
+        self.requests += 1
+        await asyncio.sleep(self.delay["session"])
+        return web.Response(status=403)
+
+    async def api(self, request):
+        self.requests += 1
+        await asyncio.sleep(self.delay["api"])
+        if self.api_status is None:
+            return web.Response(text="<html>502 Bad Gateway</html>", status=502)
+        return web.json_response({"Status": self.api_status})
+
+
+@pytest.fixture
+async def services(http_client):
+    stand_in = Services()
+    app = web.Application()
+    app.router.add_post("/session/", stand_in.session)
+    app.router.add_get("/api/", stand_in.api)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    base = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+    stand_in.endpoints = {
+        "会话验证": ("POST", f"{base}/session/", MOJANG_ENDPOINTS["会话验证"][2]),
+        "API服务": ("GET", f"{base}/api/", MOJANG_ENDPOINTS["API服务"][2]),
+    }
+    yield stand_in
+    await runner.cleanup()
+
+
+@pytest.fixture
+def monitor(services):
+    monitor = MojangStatusMonitor(services.endpoints, interval=3600, timeout=0.2, history_size=4)
+    yield monitor
+    monitor.stop()
+
+
+async def test_cold_get_probes_once_for_concurrent_callers(services, monitor):
+    services.delay = {"session": 0.05, "api": 0.05}
+    started = time.perf_counter()
+    texts = await asyncio.gather(*(monitor.get() for _ in range(5)))
+    assert time.perf_counter() - started < 0.095  # 两个服务并发检查（依次检查至少需要0.1s）
+    assert services.requests == 2
+    assert texts == [texts[0]] * 5
+    assert "| 会话验证：正常" in texts[0] and "| API服务：正常" in texts[0]
+    assert "可用率：100.0%（最近1次检查）" in texts[0]
+    # 之后直接返回内存中的文本
+    assert await monitor.get() == texts[0]
+    assert services.requests == 2
+
+
+async def test_slow_service_does_not_hold_up_the_round(services, monitor):
+    services.delay["api"] = 1
+    started = time.perf_counter()
+    await monitor.refresh()
+    assert time.perf_counter() - started < 0.5
+    latest = monitor.latest()
+    assert latest["会话验证"].ok and latest["会话验证"].latency is not None
+    assert not latest["API服务"].ok and latest["API服务"].latency is None
+    assert latest["API服务"].detail.startswith("请求出错")
+
+
+@pytest.mark.parametrize("api_status, detail", [
+    ("DOWN", "异常，返回码200，在线状态DOWN"),
+    (None, "异常，返回码502，在线状态None"),
+])
+async def test_unhealthy_api_is_reported(services, monitor, api_status, detail):
+    services.api_status = api_status
+    await monitor.refresh()
+    assert monitor.latest()["API服务"].detail == detail
+    assert monitor.get_stats()["failures"] == 1
+
+
+async def test_uptime_covers_the_recent_history(services, monitor):
+    assert monitor.uptime("API服务") is None
+    assert "| API服务：尚未检查" in monitor.render()
+    for status in ("DOWN", "OK", "OK", "OK", "OK"):
+        services.api_status = status
+        await monitor.refresh()
+    # 历史记录只保留最近4次
+    assert monitor.uptime("API服务") == 100.0
+    services.api_status = "DOWN"
+    await monitor.refresh()
+    assert monitor.uptime("API服务") == 75.0
+    assert monitor.get_stats()["uptime"] == {"会话验证": 100.0, "API服务": 75.0}
+    assert "可用率：75.0%（最近4次检查）" in await monitor.get()
+
+
+async def test_background_loop_updates_the_snapshot(services, monitor):
+    monitor.interval = 0.05
+    monitor.start()
+    for _ in range(60):
+        if monitor.get_stats()["rounds"] >= 3:
+            break
+        await asyncio.sleep(0.05)
+    assert monitor.get_stats()["rounds"] >= 3
+    await monitor.get()
+    assert monitor.get_stats()["cold_probes"] == 0
@@ -0,0 +1,43 @@
+import pytest
+
+from src.Utils.RateLimiter import RateLimiter
+
+
+@pytest.fixture
+def limiter():
+    return RateLimiter({"user": (1, 2), "group": (10, 3), "command": (0, 5)}, max_buckets=100, idle_ttl=600)
+
+
+def test_burst_then_refill(limiter):
+    keys = [("user", "u1")]
+    assert [limiter.acquire(keys, now=0) for _ in range(3)] == [None, None, "user"]
+    assert limiter.retry_after("user", "u1", now=0) == pytest.approx(1.0)
+    assert limiter.acquire(keys, now=0.5) == "user"
+    assert limiter.acquire(keys, now=1.0) is None
+
+
+def test_tokens_are_only_taken_when_every_bucket_allows(limiter):
+    group = ("group", "g1")
+    assert limiter.acquire([("user", "u1"), group], now=0) is None
+    assert limiter.acquire([("user", "u1"), group], now=0) is None
+    # 用户桶已空：群桶不应被扣除
+    assert limiter.acquire([("user", "u1"), group], now=0) == "user"
+    assert limiter.acquire([("user", "u2"), group], now=0) is None
+    assert limiter.acquire([("user", "u3"), group], now=0) == "group"
+    assert limiter.get_stats()["limited_by"] == {"user": 1, "group": 1}
+
+
+def test_disabled_dimensions_and_empty_ids_are_skipped(limiter):
+    for _ in range(20):
+        assert limiter.acquire([("command", "ping"), ("group", None), ("unknown", "x")], now=0) is None
+    assert limiter.get_stats()["buckets"] == 0
+
+
+def test_idle_and_excess_buckets_are_evicted():
+    limiter = RateLimiter({"user": (1, 1)}, max_buckets=2, idle_ttl=10)
+    for index in range(3):
+        limiter.acquire([("user", f"u{index}")], now=0)
+    assert limiter.get_stats()["buckets"] == 2
+    limiter.acquire([("user", "u9")], now=20)
+    assert limiter.get_stats()["buckets"] == 1
+    assert limiter.get_stats()["evicted"] == 3
@@ -0,0 +1,119 @@
+import asyncio, time
+
+import pytest
+
+from src.Utils.SendScheduler import SendJob, SendScheduler
+
+pytestmark = pytest.mark.anyio
+
+
+class Upstream:
+    """按预设的状态码序列依次返回的发送函数"""
+
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.calls = []
+        self.finished = []
+
+    async def send(self, job):
+        self.calls.append(job.target)
+        status = self.statuses.pop(0) if self.statuses else 200
+        if isinstance(status, Exception):
+            raise status
+        return status, {"id": "msg"} if status == 200 else {"code": status}
+
+    async def finish(self, job, status, body):
+        self.finished.append((job.target, status, job.attempts))
+
+
+def make_scheduler(upstream, **kwargs):
+    options = {"workers": 1, "global_rate": 1000, "global_burst": 1000, "target_rate": 1000, "target_burst": 1000,
+               "max_retries": 3, "backoff_base": 0.01, "backoff_max": 0.02}
+    options.update(kwargs)
+    return SendScheduler(send=upstream.send, finish=upstream.finish, **options)
+
+
+async def test_retryable_errors_are_retried_until_success():
+    upstream = Upstream([429, 503, OSError("reset"), 200])
+    scheduler = make_scheduler(upstream)
+    assert await scheduler.submit(SendJob("group", "g1", payload=None))
+    await scheduler.stop()
+    assert upstream.finished == [("g1", 200, 4)]
+    stats = scheduler.get_stats()
+    assert (stats["retried"], stats["sent"]) == (3, 1)
+    assert stats["retry_histogram"] == {"3": 1}
+
+
+async def test_gives_up_after_max_retries():
+    upstream = Upstream([500] * 10)
+    scheduler = make_scheduler(upstream, max_retries=2)
+    assert not await scheduler.submit(SendJob("group", "g1", payload=None))
+    await scheduler.stop()
+    assert upstream.finished == [("g1", 500, 3)]
+
+
+async def test_non_retryable_errors_fail_immediately():
+    upstream = Upstream([400])
+    scheduler = make_scheduler(upstream)
+    assert not await scheduler.submit(SendJob("user", "u1", payload=None))
+    await scheduler.stop()
+    assert len(upstream.calls) == 1
+
+
+async def test_expired_passive_replies_are_not_sent():
+    upstream = Upstream([])
+    scheduler = make_scheduler(upstream)
+    assert not await scheduler.submit(SendJob("group", "g1", payload=None, deadline=time.time() - 1))
+    await scheduler.stop()
+    assert upstream.calls == []
+    assert scheduler.get_stats()["expired"] == 1
+
+
+async def test_retry_is_skipped_when_it_would_miss_the_reply_window():
+    upstream = Upstream([503, 200])
+    scheduler = make_scheduler(upstream, backoff_base=5, backoff_max=5)
+    scheduler._backoff = lambda attempt: 5
+    assert not await scheduler.submit(SendJob("group", "g1", payload=None, deadline=time.time() + 1))
+    await scheduler.stop()
+    assert upstream.finished == [("g1", 503, 1)]
+
+
+async def test_passive_replies_are_sent_before_active_messages():
+    upstream = Upstream([])
+    scheduler = make_scheduler(upstream)
+    scheduler.start()
+    futures = [
+        scheduler.submit(SendJob("group", "active", payload=None)),
+        scheduler.submit(SendJob("group", "passive-late", payload=None, deadline=time.time() + 60)),
+        scheduler.submit(SendJob("group", "passive-soon", payload=None, deadline=time.time() + 30)),
+    ]
+    await asyncio.gather(*futures)
+    await scheduler.stop()
+    assert upstream.calls == ["passive-soon", "passive-late", "active"]
+
+
+async def test_target_rate_limit_delays_instead_of_dropping():
+    upstream = Upstream([])
+    scheduler = make_scheduler(upstream, target_rate=20, target_burst=1)
+    started = time.monotonic()
+    results = await asyncio.gather(*(scheduler.submit(SendJob("group", "g1", payload=None)) for _ in range(3)))
+    elapsed = time.monotonic() - started
+    await scheduler.stop()
+    assert all(results)
+    assert elapsed >= 0.09
+    assert scheduler.get_stats()["throttled"] >= 2
+
+
+async def test_failing_finish_callback_completes_the_job_once():
+    upstream = Upstream([])
+
+    async def finish(job, status, body):
+        upstream.finished.append((job.target, status, job.attempts))
+        raise RuntimeError("记录失败")
+
+    scheduler = SendScheduler(send=upstream.send, finish=finish, workers=1)
+    assert await scheduler.submit(SendJob("group", "g1", payload=None))
+    await scheduler.stop()
+    assert upstream.finished == [("g1", 200, 1)]
+    stats = scheduler.get_stats()
+    assert (stats["sent"], stats["failed"]) == (1, 0)
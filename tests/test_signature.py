@@ -0,0 +1,65 @@
+import pytest
+
+from src.Utils import Signature
+from src.Utils.Signature import SignatureError, SignatureVerifier, derive_seed
+
+BODY = b'{"op":13,"d":{"plain_token":"abc","event_ts":"1700000000"}}'
+NOW = 1700000000
+
+
+@pytest.fixture
+def verifier():
+    return SignatureVerifier("DG5g3B4j9X2KOErG", max_skew=300)
+
+
+def test_derive_seed_repeats_secret_to_32_bytes():
+    assert derive_seed("abc") == (b"abc" * 11)[:32]
+    assert derive_seed("x" * 40) == b"x" * 32
+    with pytest.raises(ValueError):
+        derive_seed("")
+
+
+def test_valid_signature_is_accepted(verifier):
+    signature = verifier.sign(str(NOW), BODY)
+    verifier.verify(signature, str(NOW), BODY, now=NOW + 10)
+    verifier.verify(signature.encode(), str(NOW).encode(), BODY, now=NOW)
+
+
+@pytest.mark.parametrize("case", ["tampered_body", "other_secret", "bad_hex", "short", "missing", "skew", "bad_timestamp"])
+def test_invalid_requests_are_rejected(verifier, case):
+    signature, timestamp, body, now = verifier.sign(str(NOW), BODY), str(NOW), BODY, NOW
+    if case == "tampered_body":
+        body = BODY.replace(b"abc", b"abd")
+    elif case == "other_secret":
+        signature = SignatureVerifier("another-secret").sign(timestamp, BODY)
+    elif case == "bad_hex":
+        signature = "zz" * 64
+    elif case == "short":
+        signature = signature[:64]
+    elif case == "missing":
+        signature = None
+    elif case == "skew":
+        now = NOW + 301
+    elif case == "bad_timestamp":
+        timestamp = "yesterday"
+    with pytest.raises(SignatureError):
+        verifier.verify(signature, timestamp, body, now=now)
+
+
+def test_skew_check_can_be_disabled():
+    verifier = SignatureVerifier("DG5g3B4j9X2KOErG", max_skew=0)
+    signature = verifier.sign(str(NOW), BODY)
+    verifier.verify(signature, str(NOW), BODY, now=NOW + 86400)
+
+
+def test_get_verifier_reports_empty_appsecret(monkeypatch):
+    monkeypatch.setattr(Signature, "_verifier", None)
+    monkeypatch.setattr(Signature.config.Bot, "appsecret", "")
+    with pytest.raises(ValueError, match="appsecret"):
+        Signature.get_verifier()
+
+
+def test_get_verifier_is_built_once(monkeypatch):
+    monkeypatch.setattr(Signature, "_verifier", None)
+    monkeypatch.setattr(Signature.config.Bot, "appsecret", "DG5g3B4j9X2KOErG")
+    assert Signature.get_verifier() is Signature.get_verifier()
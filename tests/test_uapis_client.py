@@ -0,0 +1,139 @@
+import asyncio
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from uapis_extension.client import UapisClient
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def upstream(http_client):
+    """本地模拟的Uapis接口，记录每个路径收到的请求数"""
+    hits = {}
+
+    async def handler(request):
+        hits[request.path] = hits.get(request.path, 0) + 1
+        await asyncio.sleep(float(request.query.get("delay", 0)))
+        if request.path.endswith("/missing"):
+            return web.json_response({"code": 404, "message": "not found"}, status=404)
+        if request.path.endswith("/html"):
+            return web.Response(text="<html>502 Bad Gateway</html>", status=int(request.query.get("status", 200)))
+        return web.json_response({"path": request.path, "query": dict(request.query), "method": request.method})
+
+    app = web.Application()
+    app.router.add_route("*", "/{tail:.*}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}/", hits
+    await runner.cleanup()
+
+
+async def test_cached_get_hits_upstream_once(upstream):
+    base, hits = upstream
+    client = UapisClient(base, cache_ttl={"api/v1/cached": 60})
+    first = await client.get("/api/v1/cached?x=1")
+    assert await client.get("api/v1/cached?x=1") is first
+    await client.get("api/v1/cached?x=2")
+    assert hits["/api/v1/cached"] == 2
+    stats = client.get_stats()["endpoints"]["api/v1/cached"]
+    assert (stats["hits"], stats["misses"], stats["upstream"]) == (1, 2, 2)
+
+
+async def test_concurrent_gets_are_coalesced(upstream):
+    base, hits = upstream
+    client = UapisClient(base)  # 默认不缓存，只合并同时发起的请求
+    results = await asyncio.gather(*(client.get("api/v1/slow?delay=0.05") for _ in range(20)))
+    assert hits["/api/v1/slow"] == 1
+    assert all(result == results[0] for result in results)
+    assert client.get_stats()["endpoints"]["api/v1/slow"]["coalesced"] == 19
+
+    await client.get("api/v1/slow?delay=0.05")
+    assert hits["/api/v1/slow"] == 2
+
+
+async def test_error_responses_are_not_cached(upstream):
+    base, hits = upstream
+    client = UapisClient(base, default_ttl=60)
+    assert await client.get("api/v1/missing") is None
+    assert await client.get("api/v1/missing") is None
+    assert hits["/api/v1/missing"] == 2
+    assert client.get_stats()["endpoints"]["api/v1/missing"]["errors"] == 2
+
+
+async def test_cache_evicts_least_recently_used(upstream):
+    base, hits = upstream
+    client = UapisClient(base, cache_size=2, default_ttl=60)
+    for path in ("a", "b", "a", "c", "a", "b"):
+        await client.get(f"api/{path}")
+    assert (hits["/api/a"], hits["/api/b"], hits["/api/c"]) == (1, 2, 1)
+    assert client.get_stats()["evicted"] == 2
+
+
+async def test_invalidate_and_per_call_ttl(upstream):
+    base, hits = upstream
+    client = UapisClient(base, default_ttl=60)
+    await client.get("api/v1/x")
+    client.invalidate("/api/v1/x")
+    await client.get("api/v1/x")
+    await client.get("api/v1/x", ttl=0)
+    assert hits["/api/v1/x"] == 3
+
+
+async def test_post_is_never_cached(upstream):
+    base, hits = upstream
+    client = UapisClient(base, default_ttl=60)
+    assert (await client.post("api/v1/form", data={"a": "1"}))["method"] == "POST"
+    await client.post("api/v1/form", json={"a": 1})
+    assert hits["/api/v1/form"] == 2
+
+
+async def test_upstream_failure_reaches_every_waiter(http_client):
+    client = UapisClient("http://127.0.0.1:9/", timeout=2)
+    results = await asyncio.gather(*(client.get("api/v1/down") for _ in range(5)), return_exceptions=True)
+    assert all(isinstance(result, (aiohttp.ClientError, asyncio.TimeoutError)) for result in results)
+    assert client.get_stats()["endpoints"]["api/v1/down"]["upstream"] == 1
+    assert client.get_stats()["inflight"] == 0
+
+
+async def test_cancelled_caller_does_not_cancel_other_waiters(upstream):
+    base, hits = upstream
+    client = UapisClient(base)
+    leader = asyncio.ensure_future(client.get("api/v1/slow?delay=0.1"))
+    await asyncio.sleep(0.02)
+    followers = [asyncio.ensure_future(client.get("api/v1/slow?delay=0.1")) for _ in range(3)]
+    await asyncio.sleep(0.02)
+    leader.cancel()  # 如发起请求的命令超时
+    results = await asyncio.gather(*followers)
+    assert all(result["path"] == "/api/v1/slow" for result in results)
+    assert leader.cancelled()
+    assert hits["/api/v1/slow"] == 1
+
+
+async def test_request_is_cancelled_when_every_caller_gives_up(upstream):
+    base, hits = upstream
+    client = UapisClient(base, default_ttl=60)
+    callers = [asyncio.ensure_future(client.get("api/v1/slow?delay=0.2")) for _ in range(2)]
+    await asyncio.sleep(0.05)
+    for caller in callers:
+        caller.cancel()
+    await asyncio.gather(*callers, return_exceptions=True)
+    assert client.get_stats()["inflight"] == 0
+    # 被取消的请求不会写入缓存，下一次调用重新请求
+    assert (await client.get("api/v1/slow"))["path"] == "/api/v1/slow"
+    assert hits["/api/v1/slow"] == 2
+
+
+@pytest.mark.parametrize("status", [200, 502])
+async def test_non_json_body_is_counted_as_an_error(upstream, status):
+    base, _ = upstream
+    client = UapisClient(base, default_ttl=60)
+    assert await client.get(f"api/v1/html?status={status}") is None
+    stats = client.get_stats()["endpoints"]["api/v1/html"]
+    assert (stats["upstream"], stats["errors"]) == (1, 1)
+    assert client.get_stats()["cache_size"] == 0
@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from typing import Dict
 import yaml, os
 
 
@@ -8,6 +9,33 @@ if not os.path.exists("./data/apiconfig.yaml"):
 
 class ConfigBase(BaseModel):
     url: str = "https://uapis.cn"
+    timeout: float = 10  # 单次请求超时 单位秒 设为0则不限制
+    cache_size: int = 512  # 响应缓存最多保留的条目数 超出后淘汰最久未使用的条目
+    default_ttl: float = 0  # 未在cache_ttl中配置的接口的缓存时间 单位秒 0表示不缓存
+    cache_ttl: Dict[str, float] = {  # 接口路径（不含查询参数）-> 缓存时间 单位秒
+        "api/v1/misc/hotboard": 60,
+        "api/v1/network/ipinfo": 3600,
+        "api/v1/network/whois": 3600,
+        "api/v1/network/ping": 0,  # 延迟需实时测量，只合并同时发起的相同请求
+        "api/v1/game/steam/summary": 300,
+        "api/v1/game/minecraft/historyid": 600,
+    }
+    hotboard_interval: float = 300  # 热榜后台刷新间隔 单位秒
+    hotboard_retry_interval: float = 30  # 热榜刷新失败后的重试间隔 单位秒
+    mojang_profiles_url: str = "https://api.mojang.com/profiles/minecraft"  # 按玩家名批量查询UUID的接口
+    uuid_cache_path: str = "./data/minecraft_uuid.db"  # 玩家UUID磁盘缓存文件
+    uuid_ttl: float = 604800  # 玩家UUID缓存时间 单位秒
+    uuid_negative_ttl: float = 3600  # 不存在的玩家名的缓存时间 单位秒
+    uuid_memory_size: int = 1024  # 内存中最多缓存的玩家名数量
+    uuid_batch_window: float = 0.05  # 收集待查询玩家名的时间窗口 单位秒 窗口内的查询合并为一次批量请求
+    mcping_timeout: float = 5  # 查询Minecraft服务器状态的超时时间 单位秒
+    mcping_cache_ttl: float = 30  # 服务器状态缓存时间 单位秒
+    mcping_cache_size: int = 256  # 最多缓存的服务器数量
+    mcping_concurrency: int = 16  # 同时进行的服务器状态查询数上限
+    mcping_allow_private: bool = False  # 是否允许查询内网/回环等非公网地址的服务器
+    mcstatus_interval: float = 60  # Mojang服务状态检查间隔 单位秒
+    mcstatus_timeout: float = 3  # 检查单个Mojang服务的超时时间 单位秒
+    mcstatus_history_size: int = 60  # 计算可用率时使用的最近检查次数
 
 with open("./data/apiconfig.yaml", "r", encoding="utf-8") as f:
     yaml_config = yaml.safe_load(f)
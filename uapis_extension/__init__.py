@@ -2,7 +2,12 @@ import aiohttp, asyncio, re
 from aiohttp import ClientError
 
 from src.Utils.Logger import logger
+from src.Utils.HttpClient import get_session
 from uapis_extension.Config import apiconfig
+from uapis_extension.client import uapis_client
+from uapis_extension.minecraft_uuid import minecraft_uuids
+from uapis_extension.minecraft_ping import minecraft_pinger
+from uapis_extension.mojang_status import mojang_status
 
 from uapis_extension.functions import format_hot_search, translate_domain_status
 
@@ -14,95 +19,46 @@ from uapis_extension.functions import format_hot_search, translate_domain_status
 
 async def post_for_api(url: str, body = None, headers = None) -> dict:
     """
-    使用aiohttp获取URL并验证响应
+    使用共享连接池POST请求Uapis接口（不缓存）
 
     Args:
         url: 要请求的URL
+        body: 请求体
+        headers: 请求头
 
     Returns:
-        验证后的响应模型实例
+        响应JSON，上游返回非200时为None
 
     Raises:
         aiohttp.ClientError: 如果请求失败或返回错误
-        Exception: 如果请求过程中发生未知错误
+        asyncio.TimeoutError: 如果请求超时
     """
-    if url.startswith("/"):
-        url = url[1:]
-    async with aiohttp.ClientSession() as session:
-        try:
-            if body:
-                async with session.post(apiconfig.url + url, body=body, headers=headers) as response:
-                    data = await response.json()
-                    if response.status == 200:
-                        return data
-                    else:
-                        logger.error(
-                            f"""❌ 请求失败，状态码: {response.status} API POST返回错误 (HTTP {response.status}): Code: {data.get('code')}, Message: {data.get('message')}"""
-                        )
-            else:
-                async with session.post(apiconfig.url + url, headers=headers) as response:
-                    data = await response.json()
-                    if response.status == 200:
-                        return data
-                    else:
-                        logger.error(
-                            f"""❌ 请求失败，状态码: {response.status} API POST返回错误 (HTTP {response.status}): Code: {data.get('code')}, Message: {data.get('message')}"""
-                        )
-
-        except aiohttp.ClientError as e:
-            logger.error(f"❌ HTTP请求失败: {e}")
-            raise
-        except Exception as e:
-            logger.error(f"❌ 请求过程中发生未知错误: {e}")
-            raise
+    return await uapis_client.post(url, data=body, headers=headers)
 
 
 async def get_from_api(url: str) -> dict:
     """
-    使用aiohttp获取URL并验证响应
+    使用共享连接池GET请求Uapis接口
+
+    相同URL的结果按接口配置的时间缓存（见 data/apiconfig.yaml 的 cache_ttl），
+    同时发起的相同请求只会向上游请求一次
 
     Args:
         url: 要请求的URL
 
     Returns:
-        验证后的响应模型实例
+        响应JSON，上游返回非200时为None
 
     Raises:
         aiohttp.ClientError: 如果请求失败或返回错误
-        Exception: 如果请求过程中发生未知错误
+        asyncio.TimeoutError: 如果请求超时
     """
-    if url.startswith("/"):
-        url = url[1:]
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.get(apiconfig.url + url) as response:
-                data = await response.json()
-                if response.status == 200:
-                    return data
-                else:
-                    logger.error(
-                        f"""❌ 请求失败，状态码: {response.status}
-API GET返回错误 (HTTP {response.status}): Code: {data.get('code')}, Message: {data.get('message')}"""
-                    )
-        except aiohttp.ClientError as e:
-            logger.error(f"❌ HTTP请求失败: {e}")
-            raise
-        except Exception as e:
-            logger.error(f"❌ 请求过程中发生未知错误: {e}")
-            raise
+    return await uapis_client.get(url)
 
 
 async def get_minecraft_uuid(username: str) -> str:
-    url = f"https://api.mojang.com/users/profiles/minecraft/{username}"
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.get(url) as response:
-                response.raise_for_status()
-                data = await response.json()
-                return data.get("id")
-        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
-            logger.error(f"请求错误: {e}")
-            return None
+    """查询玩家名对应的UUID（经过内存与磁盘两级缓存，未命中的玩家名合并为批量查询）"""
+    return await minecraft_uuids.resolve(username)
 
 async def get_player_history(uuid):
     url = f"api/v1/game/minecraft/historyid?uuid={uuid}"
@@ -115,38 +71,13 @@ async def get_player_history(uuid):
     return formatted_history
 
 
-async def check_minecraft_online():
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.post("https://sessionserver.mojang.com/") as response:
-                code = response.status
-                if code == 403:
-                    status1 = "正常"
-                else:
-                    status1 = f"异常，返回码{code}"
-        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
-            logger.error(f"请求错误: {e}")
-            status1 = f"请求出错：{e}"
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.get("https://api.mojang.com/") as response:
-                code = response.status
-                statusall = await response.json()
-                statusall = statusall.get("Status")
-                if code == 200 and statusall == "OK":
-                    status2 = "正常"
-                else:
-                    status2 = f"异常，返回码{code}，在线状态{statusall}"
-        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
-            logger.error(f"请求错误: {e}")
-            status2 = f"请求出错：{e}"
-    result = f"""===MC验证服务器在线状态===
-| 会话验证：{status1}
-| API服务：{status2}"""
-    return result
+async def check_minecraft_online() -> str:
+    """Mojang服务状态（由后台定时检查，直接返回最近一次的结果）"""
+    return await mojang_status.get()
 
-async def get_minecraft_info(address: int) -> str:
-    result = await get_from_api(f"api/v1/game/minecraft/serverstatus?server={address}")
+async def get_minecraft_info(address: str, edition: str = "java") -> str:
+    """查询Minecraft服务器状态（Java版/基岩版，直接连接服务器查询）"""
+    result = await minecraft_pinger.ping(address, edition)
     result = (
         await create_text(result) if result else """很抱歉，您所查询的服务器不在线！"""
     )
@@ -163,6 +94,7 @@ async def create_text(data):
     players_online = data.get("players", "0")
     players_max = data.get("max_players", "未知")
     version = data.get("version", "未知")
+    latency = data.get("latency")
     if not isinstance(description, str):
         description = str(description)
     # 处理描述中的特殊字符和颜色代码（例如 §a, §c等）
@@ -174,6 +106,7 @@ async def create_text(data):
 | IP: {ip} 
 | 端口: {port}
 | 人数: {players_online}/{players_max}
+| 延迟: {f"{latency} ms" if latency is not None else "未知"}
 | 服务器描述: 
 {description}
 | 版本: {version}
@@ -184,11 +117,10 @@ async def create_text(data):
 
 async def get_hypixel_info(command, userid):
     url = "http://localhost:30001/hypixel?" + "command=" + command + "&userId=" + userid
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.get(url) as response:
-                response.raise_for_status()
-                return await response.json()
-        except (ClientError, asyncio.TimeoutError) as e:
-            logger.error(f"请求错误: {e}")
-            return "请求出错！具体信息：" + str(e)
+    try:
+        async with get_session().get(url, timeout=uapis_client.timeout) as response:
+            response.raise_for_status()
+            return await response.json()
+    except (ClientError, asyncio.TimeoutError) as e:
+        logger.error(f"请求错误: {e}")
+        return "请求出错！具体信息：" + str(e)
@@ -0,0 +1,194 @@
+import aiohttp, asyncio, time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from src.Utils.Logger import logger
+from src.Utils.HttpClient import get_session
+from uapis_extension.Config import apiconfig
+from uapis_extension.singleflight import SingleFlight
+
+
+class UapisClient:
+    """Uapis接口客户端
+
+    - 复用框架的共享连接池（src.Utils.HttpClient），每个请求带独立超时
+    - GET响应按接口路径配置缓存时间（TTL），缓存条目数超过cache_size时淘汰最久未使用的条目
+    - 同一URL的并发GET只向上游发出一次请求，其余调用等待并共享同一结果；
+      请求在独立任务中执行，个别调用方被取消不影响其他等待的调用方
+    - 按接口统计请求数、缓存命中/未命中、合并的请求数、错误数与上游耗时
+
+    缓存中的响应会直接返回给调用方，请勿修改返回的字典
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = 10,
+        cache_size: int = 512,
+        cache_ttl: Optional[Dict[str, float]] = None,
+        default_ttl: float = 0,
+    ):
+        """
+        :param base_url: 接口地址，以/结尾
+        :param cache_ttl: 接口路径（不含查询参数）-> 缓存秒数，0表示不缓存
+        :param default_ttl: 未配置的接口的缓存秒数
+        """
+        self.base_url = base_url
+        self.timeout = aiohttp.ClientTimeout(total=timeout or None)
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl or {}
+        self.default_ttl = default_ttl
+        self._cache: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._inflight = SingleFlight()
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._evicted = 0
+
+    @staticmethod
+    def _split(url: str) -> Tuple[str, str]:
+        """返回 (请求路径, 接口路径)；相对路径去掉开头的/，接口路径不含查询参数"""
+        if not url.startswith(("http://", "https://")):
+            url = url.lstrip("/")
+        return url, url.split("?", 1)[0]
+
+    def ttl_for(self, endpoint: str) -> float:
+        """获取接口的缓存秒数"""
+        return self.cache_ttl.get(endpoint, self.default_ttl)
+
+    def _endpoint_stats(self, endpoint: str) -> Dict[str, float]:
+        stats = self._stats.get(endpoint)
+        if stats is None:
+            stats = self._stats[endpoint] = {
+                "requests": 0, "hits": 0, "misses": 0, "coalesced": 0,
+                "upstream": 0, "errors": 0, "latency_total": 0.0, "latency_max": 0.0,
+            }
+        return stats
+
+    def _cache_get(self, key: str) -> Tuple[bool, Any]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return False, None
+        expire_at, data = entry
+        if expire_at <= time.monotonic():
+            del self._cache[key]
+            return False, None
+        self._cache.move_to_end(key)
+        return True, data
+
+    def _cache_put(self, key: str, data: Any, ttl: float):
+        self._cache[key] = (time.monotonic() + ttl, data)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+            self._evicted += 1
+
+    def invalidate(self, url: Optional[str] = None):
+        """清除指定URL的缓存，不传参数时清空全部缓存"""
+        if url is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(self._split(url)[0], None)
+
+    async def get(self, url: str, ttl: Optional[float] = None, endpoint: Optional[str] = None) -> Optional[dict]:
+        """GET请求（带缓存与并发合并）
+
+        :param url: 接口路径（相对于base_url）或完整URL
+        :param ttl: 本次请求结果的缓存秒数，默认按接口配置
+        :param endpoint: 统计与缓存配置所用的接口路径，默认为url去掉查询参数（参数在路径中时需指定）
+        :return: 响应JSON；上游返回非200或响应不是JSON时为None（不缓存）
+        :raises aiohttp.ClientError, asyncio.TimeoutError: 请求失败
+        """
+        key, default_endpoint = self._split(url)
+        endpoint = endpoint or default_endpoint
+        ttl = self.ttl_for(endpoint) if ttl is None else ttl
+        stats = self._endpoint_stats(endpoint)
+        stats["requests"] += 1
+        if ttl > 0:
+            hit, data = self._cache_get(key)
+            if hit:
+                stats["hits"] += 1
+                return data
+        stats["misses"] += 1
+
+        if key in self._inflight:
+            stats["coalesced"] += 1
+        return await self._inflight.run(key, lambda: self._fetch(key, endpoint, ttl))
+
+    async def _fetch(self, key: str, endpoint: str, ttl: float) -> Optional[dict]:
+        data = await self._request("GET", key, endpoint)
+        if data is not None and ttl > 0:
+            self._cache_put(key, data, ttl)
+        return data
+
+    async def post(
+        self, url: str, data: Any = None, headers: Optional[dict] = None, json: Any = None
+    ) -> Optional[dict]:
+        """POST请求（不缓存、不合并）
+
+        :param data: 表单或原始请求体
+        :param json: JSON请求体
+
+        :return: 响应JSON；上游返回非200或响应不是JSON时为None
+        :raises aiohttp.ClientError, asyncio.TimeoutError: 请求失败
+        """
+        key, endpoint = self._split(url)
+        stats = self._endpoint_stats(endpoint)
+        stats["requests"] += 1
+        stats["misses"] += 1
+        return await self._request("POST", key, endpoint, data=data, headers=headers, json=json)
+
+    async def _request(self, method: str, key: str, endpoint: str, **kwargs) -> Optional[dict]:
+        url = key if key.startswith(("http://", "https://")) else self.base_url + key
+        stats = self._endpoint_stats(endpoint)
+        stats["upstream"] += 1
+        started = time.monotonic()
+        try:
+            async with get_session().request(method, url, timeout=self.timeout, **kwargs) as response:
+                status = response.status
+                data = await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            stats["errors"] += 1
+            logger.error(f"❌ HTTP请求失败: {method} {endpoint} {e!r}")
+            raise
+        except ValueError as e:
+            stats["errors"] += 1
+            logger.error(f"❌ 请求失败，API {method}返回的内容不是合法的JSON (HTTP {status}): {endpoint} {e}")
+            return None
+        finally:
+            elapsed = (time.monotonic() - started) * 1000
+            stats["latency_total"] += elapsed
+            stats["latency_max"] = max(stats["latency_max"], elapsed)
+        if status == 200:
+            return data
+        stats["errors"] += 1
+        code, message = (data.get("code"), data.get("message")) if isinstance(data, dict) else (None, data)
+        logger.error(
+            f"❌ 请求失败，状态码: {status} API {method}返回错误 (HTTP {status}): Code: {code}, Message: {message}"
+        )
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取各接口的缓存命中与上游耗时统计"""
+        endpoints = {}
+        for endpoint, stats in self._stats.items():
+            item = {key: value for key, value in stats.items() if not key.startswith("latency")}
+            cacheable = stats["hits"] + stats["misses"]
+            item["hit_rate"] = round(stats["hits"] / cacheable, 4) if cacheable else 0.0
+            item["avg_latency_ms"] = round(stats["latency_total"] / stats["upstream"], 2) if stats["upstream"] else 0.0
+            item["max_latency_ms"] = round(stats["latency_max"], 2)
+            endpoints[endpoint] = item
+        return {
+            "cache_size": len(self._cache),
+            "cache_limit": self.cache_size,
+            "evicted": self._evicted,
+            "inflight": len(self._inflight),
+            "endpoints": endpoints,
+        }
+
+
+uapis_client = UapisClient(
+    base_url=apiconfig.url,
+    timeout=apiconfig.timeout,
+    cache_size=apiconfig.cache_size,
+    cache_ttl=apiconfig.cache_ttl,
+    default_ttl=apiconfig.default_ttl,
+)
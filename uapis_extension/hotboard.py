@@ -0,0 +1,123 @@
+import asyncio, time
+from typing import Any, Dict, Optional
+
+from src.Utils.Logger import logger
+from uapis_extension.Config import apiconfig
+from uapis_extension.client import uapis_client
+from uapis_extension.functions import format_hot_search
+
+
+# 热榜类型 -> 显示名称
+HOT_TYPES = {
+    "bilibili": "B站-日榜",
+    "acfun": "A站-热搜榜",
+    "weibo": "微博-热搜榜",
+    "zhihu": "知乎-热搜榜",
+    "douyin": "抖音-热搜榜",
+}
+
+
+def render_board(label: str, data: dict) -> str:
+    """生成热榜回复文本"""
+    return "===" + label + "===" + "\n" + \
+           format_hot_search(data) + "\n" + \
+           "=============" + "\n" + \
+           str(data.get("update_time", "")) + "\n" + \
+           "============="
+
+
+class HotboardRefresher:
+    """热榜后台刷新
+
+    后台协程每隔interval秒并发刷新所有热榜，并把回复文本预先生成好保存在内存中，
+    命令直接返回内存中的文本，不再等待上游接口：
+    - 刷新进行中或上游不可用时继续返回上一次成功获取的内容
+    - 有热榜刷新失败时改为每隔retry_interval秒重试
+    - 尚未成功获取过的热榜（如刚启动）在命令中同步获取一次，同一热榜的并发获取只请求一次
+    """
+
+    def __init__(self, boards: Dict[str, str], interval: float = 300, retry_interval: float = 30):
+        """
+        :param boards: 热榜类型 -> 显示名称
+        """
+        self.boards = boards
+        self.interval = interval
+        self.retry_interval = retry_interval
+        self._content: Dict[str, str] = {}
+        self._updated_at: Dict[str, float] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"served": 0, "stale_served": 0, "cold_fetches": 0, "refreshes": 0, "failures": 0}
+
+    def start(self):
+        """启动后台刷新协程（需在事件循环中调用）"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    def stop(self):
+        """停止后台刷新协程"""
+        for task in (self._task, *self._inflight.values()):
+            if task is not None:
+                task.cancel()
+        self._task = None
+        self._inflight.clear()
+
+    async def _loop(self):
+        while True:
+            results = await asyncio.gather(*(self.refresh(board) for board in self.boards))
+            await asyncio.sleep(self.interval if all(results) else self.retry_interval)
+
+    def refresh(self, board: str) -> "asyncio.Task":
+        """刷新一个热榜，同一热榜同时只会有一个刷新任务
+
+        :return: 刷新任务，结果为是否刷新成功
+        """
+        task = self._inflight.get(board)
+        if task is None or task.done():
+            task = self._inflight[board] = asyncio.create_task(self._fetch(board))
+        return task
+
+    async def _fetch(self, board: str) -> bool:
+        try:
+            # 热榜由本类缓存，不再经过客户端的响应缓存（ttl=0），保证每次刷新都取到最新数据
+            data = await uapis_client.get(f"api/v1/misc/hotboard?type={board}", ttl=0)
+        except Exception as e:
+            data = None
+            logger.warning(f"热榜刷新 >>> {board} 获取失败，继续使用上次的内容: {e!r}")
+        if not data:
+            self._stats["failures"] += 1
+            return False
+        self._content[board] = render_board(self.boards[board], data)
+        self._updated_at[board] = time.monotonic()
+        self._stats["refreshes"] += 1
+        return True
+
+    async def get(self, board: str) -> Optional[str]:
+        """获取热榜回复文本，没有可用内容时返回None"""
+        content = self._content.get(board)
+        if content is None:
+            self._stats["cold_fetches"] += 1
+            await asyncio.shield(self.refresh(board))
+            content = self._content.get(board)
+            if content is None:
+                return None
+        elif time.monotonic() - self._updated_at[board] > self.interval + self.retry_interval:
+            # 后台刷新未按时完成（如上游故障），先返回旧内容并在后台再刷新一次
+            self._stats["stale_served"] += 1
+            self.refresh(board)
+        self._stats["served"] += 1
+        return content
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取热榜刷新统计信息"""
+        now = time.monotonic()
+        stats = dict(self._stats)
+        stats["age"] = {board: round(now - updated_at, 1) for board, updated_at in self._updated_at.items()}
+        return stats
+
+
+hotboard = HotboardRefresher(
+    boards=HOT_TYPES,
+    interval=apiconfig.hotboard_interval,
+    retry_interval=apiconfig.hotboard_retry_interval,
+)
@@ -0,0 +1,349 @@
+import asyncio, ipaddress, json, os, socket, struct, time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import aiodns
+except ImportError:  # 可选依赖 pip install aiodns（用于解析Java版服务器的SRV记录）
+    aiodns = None
+
+from src.Utils.Logger import logger
+from uapis_extension.Config import apiconfig
+from uapis_extension.singleflight import SingleFlight
+
+
+"""
+Minecraft服务器状态查询
+
+- Java版：Server List Ping（握手 -> 状态请求 -> 状态响应 -> Ping/Pong），数据包使用VarInt长度前缀
+- 基岩版：RakNet Unconnected Ping（UDP），响应为以分号分隔的服务器信息
+"""
+
+
+EDITIONS = {
+    "java": "java", "je": "java",
+    "be": "bedrock", "bedrock": "bedrock", "pe": "bedrock",
+}
+DEFAULT_PORTS = {"java": 25565, "bedrock": 19132}
+
+_RAKNET_MAGIC = bytes.fromhex("00ffff00fefefefefdfdfdfd12345678")
+_UNCONNECTED_PING = 0x01
+_UNCONNECTED_PONG = 0x1C
+
+
+def encode_varint(value: int) -> bytes:
+    """编码VarInt（负数按32位补码编码）"""
+    value &= 0xFFFFFFFF
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+async def read_varint(reader: asyncio.StreamReader) -> int:
+    """从流中读取一个VarInt"""
+    result = 0
+    for shift in range(0, 35, 7):
+        byte = (await reader.readexactly(1))[0]
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result - (1 << 32) if result & 0x80000000 else result
+    raise ValueError("VarInt过长")
+
+
+def _pack_packet(packet_id: int, payload: bytes = b"") -> bytes:
+    body = encode_varint(packet_id) + payload
+    return encode_varint(len(body)) + body
+
+
+def _pack_string(value: str) -> bytes:
+    data = value.encode("utf-8")
+    return encode_varint(len(data)) + data
+
+
+async def _read_packet(reader: asyncio.StreamReader) -> Tuple[int, bytes]:
+    length = await read_varint(reader)
+    if length <= 0 or length > 0x200000:
+        raise ValueError(f"数据包长度异常: {length}")
+    data = await reader.readexactly(length)
+    packet_reader = asyncio.StreamReader()
+    packet_reader.feed_data(data)
+    packet_reader.feed_eof()
+    packet_id = await read_varint(packet_reader)
+    return packet_id, await packet_reader.read()
+
+
+def _flatten_description(description: Any) -> str:
+    """把Java版的文本组件（字符串或 {"text", "extra"}）拼接为纯文本"""
+    if isinstance(description, str):
+        return description
+    if isinstance(description, list):
+        return "".join(_flatten_description(part) for part in description)
+    if isinstance(description, dict):
+        return str(description.get("text", "")) + "".join(
+            _flatten_description(part) for part in description.get("extra", [])
+        )
+    return ""
+
+
+def _as_int(value: Any) -> int:
+    """服务器返回的人数可能不是整数，无法识别时视为0"""
+    return value if isinstance(value, int) and not isinstance(value, bool) else 0
+
+
+def parse_address(address: str) -> Tuple[str, Optional[int]]:
+    """解析 主机[:端口]，主机中的,视为.（消息中的域名常被写成 mc,hypixel,net）
+
+    :return: (主机, 端口)，未指定端口时端口为None
+    """
+    address = address.strip().replace(",", ".").replace("，", ".")
+    if address.startswith("["):  # [IPv6]:端口
+        host, _, rest = address[1:].partition("]")
+        port = rest[1:] if rest.startswith(":") else ""
+    elif address.count(":") == 1:
+        host, port = address.split(":")
+    else:
+        host, port = address, ""
+    if port and not port.isdigit():
+        raise ValueError(f"端口格式错误: {port}")
+    return host, int(port) if port else None
+
+
+def _is_ip(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        return False
+
+
+class _BedrockPingProtocol(asyncio.DatagramProtocol):
+    def __init__(self, future: asyncio.Future):
+        self.future = future
+
+    def datagram_received(self, data, addr):
+        if not self.future.done() and data[:1] == bytes([_UNCONNECTED_PONG]):
+            self.future.set_result((data, addr))
+
+    def error_received(self, exc):
+        if not self.future.done():
+            self.future.set_exception(exc)
+
+
+class MinecraftPinger:
+    """Minecraft服务器状态查询
+
+    - 按 (版本, 主机, 端口) 缓存查询结果cache_ttl秒（离线结果同样缓存），缓存条目数不超过cache_size
+    - 同一服务器的并发查询共用同一次查询，个别调用方被取消（如命令超时）不影响其他调用方
+    - 同时进行的查询数不超过concurrency，每次查询整体超时timeout秒
+    - Java版未指定端口且主机为域名时，先查询 _minecraft._tcp SRV记录（需安装aiodns）
+    - 地址由用户提供，连接前先解析主机（含SRV记录指向的主机），并直接连接解析出的地址；
+      除非allow_private为True，否则拒绝内网、回环、链路本地与保留地址，避免命令被用来探测机器人所在的内网
+    """
+
+    def __init__(
+        self,
+        timeout: float = 5,
+        cache_ttl: float = 30,
+        cache_size: int = 256,
+        concurrency: int = 16,
+        allow_private: bool = False,
+    ):
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.concurrency = concurrency
+        self.allow_private = allow_private
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._cache: "OrderedDict[tuple, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._inflight = SingleFlight()
+        self._resolver = None
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "online": 0, "offline": 0, "srv_resolved": 0, "refused": 0}
+
+    async def ping(self, address: str, edition: str = "java") -> Dict[str, Any]:
+        """查询服务器状态
+
+        :param address: 主机[:端口]
+        :param edition: java/be（见EDITIONS）
+        :return: {"online": True, "ip", "port", "motd_clean", "players", "max_players", "version", "latency"}
+                 或 {"online": False, "error"}
+        """
+        edition = EDITIONS.get((edition or "java").lower(), "java")
+        try:
+            host, port = parse_address(address)
+        except ValueError as e:
+            return {"online": False, "error": str(e)}
+        key = (edition, host.lower(), port)
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._cache.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[1]
+        self._stats["misses"] += 1
+
+        if key in self._inflight:
+            self._stats["coalesced"] += 1
+        return await self._inflight.run(key, lambda: self._ping_and_cache(key, edition, host, port))
+
+    async def _ping_and_cache(self, key: tuple, edition: str, host: str, port: Optional[int]) -> Dict[str, Any]:
+        result = await self._ping_uncached(edition, host, port)
+        self._cache[key] = (time.monotonic() + self.cache_ttl, result)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+    async def _ping_uncached(self, edition: str, host: str, port: Optional[int]) -> Dict[str, Any]:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        async with self._semaphore:
+            try:
+                if edition == "java":
+                    coro = self._ping_java(host, port)
+                else:
+                    coro = self._ping_bedrock(host, port or DEFAULT_PORTS["bedrock"])
+                result = await asyncio.wait_for(coro, self.timeout)
+                self._stats["online"] += 1
+                return result
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, struct.error) as e:
+                self._stats["offline"] += 1
+                logger.debug(f"Minecraft Ping >>> {edition} {host}:{port} 查询失败: {e!r}")
+                return {"online": False, "error": repr(e)}
+
+    async def _resolve_srv(self, host: str) -> Optional[Tuple[str, int]]:
+        if aiodns is None or _is_ip(host):
+            return None
+        if self._resolver is None:
+            self._resolver = aiodns.DNSResolver()
+        try:
+            records = await self._resolver.query(f"_minecraft._tcp.{host}", "SRV")
+        except aiodns.error.DNSError:
+            return None
+        if not records:
+            return None
+        record = min(records, key=lambda r: (r.priority, -r.weight))
+        self._stats["srv_resolved"] += 1
+        return record.host.rstrip("."), record.port
+
+    async def _resolve_public(self, host: str, port: int, socktype: int) -> str:
+        """解析主机，返回第一个允许连接的地址
+
+        :raises ValueError: 主机只解析到内网、回环、链路本地或保留地址
+        """
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socktype)
+        for *_, sockaddr in infos:
+            ip = sockaddr[0]
+            if self.allow_private or ipaddress.ip_address(ip.split("%", 1)[0]).is_global:
+                return ip
+        self._stats["refused"] += 1
+        raise ValueError(f"{host} 不是公网地址，拒绝查询")
+
+    async def _ping_java(self, host: str, port: Optional[int]) -> Dict[str, Any]:
+        connect_host, connect_port = host, port or DEFAULT_PORTS["java"]
+        if port is None:
+            srv = await self._resolve_srv(host)
+            if srv is not None:
+                connect_host, connect_port = srv
+
+        ip = await self._resolve_public(connect_host, connect_port, socket.SOCK_STREAM)
+        reader, writer = await asyncio.open_connection(ip, connect_port)
+        try:
+            handshake = encode_varint(-1) + _pack_string(host) + struct.pack(">H", connect_port) + encode_varint(1)
+            started = time.perf_counter()
+            writer.write(_pack_packet(0x00, handshake) + _pack_packet(0x00))
+            await writer.drain()
+            packet_id, payload = await _read_packet(reader)
+            status_rtt = time.perf_counter() - started
+            if packet_id != 0x00:
+                raise ValueError(f"状态响应包ID异常: {packet_id}")
+            payload_reader = asyncio.StreamReader()
+            payload_reader.feed_data(payload)
+            payload_reader.feed_eof()
+            length = await read_varint(payload_reader)
+            status = json.loads((await payload_reader.readexactly(length)).decode("utf-8"))
+            if not isinstance(status, dict):
+                raise ValueError(f"状态响应不是JSON对象: {type(status).__name__}")
+
+            latency = status_rtt
+            token = os.urandom(8)
+            try:
+                started = time.perf_counter()
+                writer.write(_pack_packet(0x01, token))
+                await writer.drain()
+                packet_id, payload = await asyncio.wait_for(_read_packet(reader), self.timeout / 2)
+                if packet_id == 0x01 and payload == token:
+                    latency = time.perf_counter() - started
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+                pass  # 部分服务器不响应Ping包，使用状态请求的往返时间
+        finally:
+            writer.close()
+
+        players = status.get("players")
+        players = players if isinstance(players, dict) else {}
+        version = status.get("version")
+        version = version if isinstance(version, dict) else {}
+        return {
+            "online": True,
+            "ip": ip,
+            "port": connect_port,
+            "motd_clean": _flatten_description(status.get("description", "")),
+            "players": _as_int(players.get("online")),
+            "max_players": _as_int(players.get("max")),
+            "version": str(version.get("name", "未知")),
+            "latency": round(latency * 1000, 1),
+        }
+
+    async def _ping_bedrock(self, host: str, port: int) -> Dict[str, Any]:
+        ip = await self._resolve_public(host, port, socket.SOCK_DGRAM)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        transport, _ = await loop.create_datagram_endpoint(
+            lambda: _BedrockPingProtocol(future), remote_addr=(ip, port)
+        )
+        try:
+            started = time.perf_counter()
+            timestamp = int(time.time() * 1000) & 0x7FFFFFFFFFFFFFFF
+            transport.sendto(
+                bytes([_UNCONNECTED_PING]) + struct.pack(">q", timestamp) + _RAKNET_MAGIC + os.urandom(8)
+            )
+            data, addr = await future
+            latency = time.perf_counter() - started
+        finally:
+            transport.close()
+
+        # 0x1c | 时间(8) | 服务器GUID(8) | MAGIC(16) | 字符串长度(2) | 服务器信息
+        offset = 1 + 8 + 8 + len(_RAKNET_MAGIC)
+        if len(data) < offset + 2 or data[17:offset] != _RAKNET_MAGIC:
+            raise ValueError("基岩版响应格式异常")
+        (length,) = struct.unpack(">H", data[offset:offset + 2])
+        fields = data[offset + 2:offset + 2 + length].decode("utf-8", "replace").split(";")
+        fields += [""] * (9 - len(fields))
+        return {
+            "online": True,
+            "ip": addr[0],
+            "port": port,
+            "motd_clean": "\n".join(part for part in (fields[1], fields[7]) if part),
+            "players": int(fields[4]) if fields[4].isdigit() else 0,
+            "max_players": int(fields[5]) if fields[5].isdigit() else 0,
+            "version": f"{fields[0]} {fields[3]}".strip(),
+            "latency": round(latency * 1000, 1),
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取服务器查询统计信息"""
+        stats = dict(self._stats)
+        stats.update({"cached": len(self._cache), "inflight": len(self._inflight), "srv": aiodns is not None})
+        return stats
+
+
+minecraft_pinger = MinecraftPinger(
+    timeout=apiconfig.mcping_timeout,
+    cache_ttl=apiconfig.mcping_cache_ttl,
+    cache_size=apiconfig.mcping_cache_size,
+    concurrency=apiconfig.mcping_concurrency,
+    allow_private=apiconfig.mcping_allow_private,
+)
@@ -0,0 +1,210 @@
+import asyncio, os, re, sqlite3, time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.Utils.Logger import logger
+from uapis_extension.Config import apiconfig
+from uapis_extension.client import uapis_client
+
+_VALID_NAME = re.compile(r"^[A-Za-z0-9_]{1,16}$")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS minecraft_uuid (
+    name TEXT PRIMARY KEY,
+    uuid TEXT,
+    expires_at REAL NOT NULL
+)
+"""
+
+
+class MinecraftUUIDCache:
+    """Minecraft玩家名 -> UUID 两级缓存
+
+    - 内存LRU保存最近查询过的玩家名，其次查询磁盘上的SQLite缓存表，均按过期时间失效
+    - 不存在的玩家名同样缓存（uuid为NULL），有效期为negative_ttl，避免反复查询
+    - 未命中的玩家名先在batch_window秒内收集，再用一次批量接口（最多batch_size个名字）查询，
+      同一玩家名的并发查询共用同一次请求
+    - 请求失败（网络错误、限流等）时不写入缓存，下次查询会重新请求
+
+    磁盘缓存使用标准库sqlite3在事件循环中同步读写：读取为主键查询，写入按批次提交，耗时均在毫秒以内
+    """
+
+    def __init__(
+        self,
+        path: Optional[str],
+        profiles_url: str = "https://api.mojang.com/profiles/minecraft",
+        ttl: float = 7 * 86400,
+        negative_ttl: float = 3600,
+        memory_size: int = 1024,
+        batch_window: float = 0.05,
+        batch_size: int = 10,
+    ):
+        """
+        :param path: 磁盘缓存文件路径，None表示只使用内存缓存
+        :param profiles_url: 批量查询接口，请求体为玩家名列表，返回 [{"id", "name"}]
+        """
+        self.path = path
+        self.profiles_url = profiles_url
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.memory_size = memory_size
+        self.batch_window = batch_window
+        self.batch_size = batch_size
+        self._memory: "OrderedDict[str, Tuple[float, Optional[str]]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._waiting: Dict[str, asyncio.Future] = {}  # 尚未得到结果的玩家名（含已发出请求的）
+        self._pending: List[str] = []  # 等待加入下一次批量请求的玩家名
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+        self._stats = {
+            "memory_hits": 0, "disk_hits": 0, "negative_hits": 0, "misses": 0,
+            "batches": 0, "looked_up": 0, "not_found": 0, "errors": 0,
+        }
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self._db is None and self.path:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(self.path)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(_SCHEMA)
+            self._db.execute("DELETE FROM minecraft_uuid WHERE expires_at <= ?", (time.time(),))
+            self._db.commit()
+        return self._db
+
+    def close(self):
+        """关闭磁盘缓存并取消尚未发出的批量查询"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        for future in self._waiting.values():
+            future.cancel()
+        self._waiting.clear()
+        self._pending.clear()
+        for task in self._tasks:
+            task.cancel()
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _remember(self, name: str, uuid: Optional[str], expires_at: float):
+        self._memory[name] = (expires_at, uuid)
+        self._memory.move_to_end(name)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _lookup_cached(self, name: str) -> Tuple[bool, Optional[str]]:
+        now = time.time()
+        entry = self._memory.get(name)
+        if entry is not None:
+            if entry[0] > now:
+                self._memory.move_to_end(name)
+                self._stats["memory_hits" if entry[1] else "negative_hits"] += 1
+                return True, entry[1]
+            del self._memory[name]
+        try:
+            db = self._connect()
+            row = db.execute(
+                "SELECT uuid, expires_at FROM minecraft_uuid WHERE name = ?", (name,)
+            ).fetchone() if db is not None else None
+        except sqlite3.Error as e:
+            logger.error(f"Minecraft UUID >>> 读取磁盘缓存失败: {e}")
+            row = None
+        if row is not None and row[1] > now:
+            self._remember(name, row[0], row[1])
+            self._stats["disk_hits" if row[0] else "negative_hits"] += 1
+            return True, row[0]
+        return False, None
+
+    async def resolve(self, name: str) -> Optional[str]:
+        """查询玩家名对应的UUID（不带横线），玩家不存在或查询失败时返回None"""
+        if not name or not _VALID_NAME.match(name):
+            return None
+        key = name.lower()
+        found, uuid = self._lookup_cached(key)
+        if found:
+            return uuid
+        self._stats["misses"] += 1
+        future = self._waiting.get(key)
+        if future is None:
+            future = self._waiting[key] = asyncio.get_running_loop().create_future()
+            self._pending.append(key)
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+            elif self._timer is None:
+                self._timer = asyncio.get_running_loop().call_later(self.batch_window, self._flush)
+        return await asyncio.shield(future)
+
+    async def resolve_many(self, names: List[str]) -> Dict[str, Optional[str]]:
+        """批量查询多个玩家名"""
+        results = await asyncio.gather(*(self.resolve(name) for name in names))
+        return dict(zip(names, results))
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            names, self._pending = self._pending[:self.batch_size], self._pending[self.batch_size:]
+            task = asyncio.create_task(self._lookup(names))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _settle(self, name: str, uuid: Optional[str]):
+        future = self._waiting.pop(name, None)
+        if future is not None and not future.done():
+            future.set_result(uuid)
+
+    async def _lookup(self, names: List[str]):
+        self._stats["batches"] += 1
+        try:
+            profiles = await uapis_client.post(self.profiles_url, json=names)
+            if not isinstance(profiles, list):
+                raise ValueError(f"批量查询接口返回异常: {profiles!r}")
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.error(f"Minecraft UUID >>> 批量查询 {len(names)} 个玩家名失败: {e!r}")
+            for name in names:
+                self._settle(name, None)
+            return
+
+        found = {profile["name"].lower(): profile["id"] for profile in profiles if "name" in profile and "id" in profile}
+        now = time.time()
+        rows = []
+        for name in names:
+            uuid = found.get(name)
+            expires_at = now + (self.ttl if uuid else self.negative_ttl)
+            self._remember(name, uuid, expires_at)
+            rows.append((name, uuid, expires_at))
+            self._stats["looked_up" if uuid else "not_found"] += 1
+            self._settle(name, uuid)
+        self._save(rows)
+
+    def _save(self, rows: List[Tuple[str, Optional[str], float]]):
+        try:
+            db = self._connect()
+            if db is not None:
+                with db:
+                    db.executemany(
+                        "INSERT INTO minecraft_uuid (name, uuid, expires_at) VALUES (?, ?, ?) "
+                        "ON CONFLICT (name) DO UPDATE SET uuid = excluded.uuid, expires_at = excluded.expires_at",
+                        rows,
+                    )
+        except sqlite3.Error as e:
+            logger.error(f"Minecraft UUID >>> 写入磁盘缓存失败: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取UUID缓存统计信息"""
+        stats = dict(self._stats)
+        stats.update({"memory_size": len(self._memory), "pending": len(self._waiting)})
+        return stats
+
+
+minecraft_uuids = MinecraftUUIDCache(
+    path=apiconfig.uuid_cache_path,
+    profiles_url=apiconfig.mojang_profiles_url,
+    ttl=apiconfig.uuid_ttl,
+    negative_ttl=apiconfig.uuid_negative_ttl,
+    memory_size=apiconfig.uuid_memory_size,
+    batch_window=apiconfig.uuid_batch_window,
+)
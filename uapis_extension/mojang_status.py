@@ -0,0 +1,157 @@
+import aiohttp, asyncio, time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, NamedTuple, Optional, Tuple
+
+from src.Utils.Logger import logger
+from src.Utils.HttpClient import get_session
+from uapis_extension.Config import apiconfig
+
+
+class ProbeResult(NamedTuple):
+    ok: bool
+    detail: str  # 正常 / 异常原因
+    latency: Optional[float]  # 单位毫秒，请求出错时为None
+    checked_at: float  # time.time()
+
+
+async def _probe_session_server(response: aiohttp.ClientResponse) -> Tuple[bool, str]:
+    # 会话服务器根路径不接受请求，正常运行时返回403
+    if response.status == 403:
+        return True, "正常"
+    return False, f"异常，返回码{response.status}"
+
+
+async def _probe_api(response: aiohttp.ClientResponse) -> Tuple[bool, str]:
+    try:
+        status = (await response.json(content_type=None)).get("Status")
+    except (ValueError, AttributeError):
+        status = None
+    if response.status == 200 and status == "OK":
+        return True, "正常"
+    return False, f"异常，返回码{response.status}，在线状态{status}"
+
+
+# 服务名称 -> (请求方法, 地址, 响应检查函数)
+MOJANG_ENDPOINTS: Dict[str, Tuple[str, str, Callable[[aiohttp.ClientResponse], Awaitable[Tuple[bool, str]]]]] = {
+    "会话验证": ("POST", "https://sessionserver.mojang.com/", _probe_session_server),
+    "API服务": ("GET", "https://api.mojang.com/", _probe_api),
+}
+
+
+class MojangStatusMonitor:
+    """Mojang服务状态监控
+
+    后台协程每隔interval秒并发检查所有服务（每个请求超时timeout秒），保存最近history_size轮的结果，
+    并预先生成回复文本，命令直接返回内存中的文本：
+    - 可用率按历史记录中检查成功的比例计算
+    - 尚未完成过检查（如刚启动）时在命令中同步检查一轮，并发的检查只进行一次
+    """
+
+    def __init__(self, endpoints: dict, interval: float = 60, timeout: float = 3, history_size: int = 60):
+        """
+        :param endpoints: 服务名称 -> (请求方法, 地址, 响应检查函数)，见MOJANG_ENDPOINTS
+        """
+        self.endpoints = endpoints
+        self.interval = interval
+        self.timeout = timeout
+        self.history: Dict[str, Deque[ProbeResult]] = {name: deque(maxlen=history_size) for name in endpoints}
+        self._snapshot: Optional[str] = None
+        self._inflight: Optional[asyncio.Task] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"served": 0, "cold_probes": 0, "rounds": 0, "failures": 0}
+
+    def start(self):
+        """启动后台检查协程（需在事件循环中调用）"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    def stop(self):
+        """停止后台检查协程"""
+        for task in (self._task, self._inflight):
+            if task is not None:
+                task.cancel()
+        self._task = None
+        self._inflight = None
+
+    async def _loop(self):
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.interval)
+
+    def refresh(self) -> "asyncio.Task":
+        """并发检查所有服务，同时只会有一轮检查"""
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.create_task(self._probe_all())
+        return self._inflight
+
+    async def _probe_all(self):
+        results = await asyncio.gather(*(self._probe(name) for name in self.endpoints))
+        for name, result in zip(self.endpoints, results):
+            self.history[name].append(result)
+        self._stats["rounds"] += 1
+        self._snapshot = self.render()
+
+    async def _probe(self, name: str) -> ProbeResult:
+        method, url, check = self.endpoints[name]
+        started = time.perf_counter()
+        try:
+            async with get_session().request(
+                method, url, timeout=aiohttp.ClientTimeout(total=self.timeout)
+            ) as response:
+                ok, detail = await check(response)
+            latency = round((time.perf_counter() - started) * 1000, 1)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            ok, detail, latency = False, f"请求出错：{e!r}", None
+        if not ok:
+            self._stats["failures"] += 1
+            logger.warning(f"Mojang状态 >>> {name} {detail}")
+        return ProbeResult(ok, detail, latency, time.time())
+
+    def uptime(self, name: str) -> Optional[float]:
+        """服务在历史记录中的可用率（百分比），没有记录时返回None"""
+        history = self.history[name]
+        if not history:
+            return None
+        return round(sum(result.ok for result in history) / len(history) * 100, 1)
+
+    def latest(self) -> Dict[str, Optional[ProbeResult]]:
+        """各服务最近一次的检查结果"""
+        return {name: history[-1] if history else None for name, history in self.history.items()}
+
+    def render(self) -> str:
+        """生成状态回复文本"""
+        lines = ["===MC验证服务器在线状态==="]
+        checked_at = None
+        for name, result in self.latest().items():
+            if result is None:
+                lines.append(f"| {name}：尚未检查")
+                continue
+            checked_at = result.checked_at
+            latency = f" {result.latency} ms" if result.latency is not None else ""
+            lines.append(f"| {name}：{result.detail}{latency}")
+            lines.append(f"|   可用率：{self.uptime(name)}%（最近{len(self.history[name])}次检查）")
+        if checked_at is not None:
+            lines.append(f"| 检查时间：{time.strftime('%H:%M:%S', time.localtime(checked_at))}")
+        return "\n".join(lines)
+
+    async def get(self) -> str:
+        """获取状态回复文本"""
+        if self._snapshot is None:
+            self._stats["cold_probes"] += 1
+            await asyncio.shield(self.refresh())
+        self._stats["served"] += 1
+        return self._snapshot
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取状态监控统计信息"""
+        stats = dict(self._stats)
+        stats["uptime"] = {name: self.uptime(name) for name in self.endpoints}
+        return stats
+
+
+mojang_status = MojangStatusMonitor(
+    endpoints=MOJANG_ENDPOINTS,
+    interval=apiconfig.mcstatus_interval,
+    timeout=apiconfig.mcstatus_timeout,
+    history_size=apiconfig.mcstatus_history_size,
+)
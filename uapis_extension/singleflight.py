@@ -0,0 +1,49 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List
+
+
+class SingleFlight:
+    """合并同一键的并发调用
+
+    同一键的第一个调用方在独立的任务中执行查询，之后的调用方等待同一个任务并共享结果或异常。
+    调用方被取消（如命令超时）时只是不再等待，不会取消仍有其他调用方在等待的查询；
+    所有调用方都已取消时才取消查询任务
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, List[Any]] = {}  # 键 -> [查询任务, 等待中的调用方数]
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._flights
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """执行或加入键对应的查询
+
+        :param factory: 返回查询协程的函数，只有没有进行中的查询时才会调用
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            task = asyncio.ensure_future(factory())
+            flight = self._flights[key] = [task, 0]
+            task.add_done_callback(lambda t: self._finish(key, t))
+        task = flight[0]
+        flight[1] += 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            flight[1] -= 1
+            if not flight[1] and not task.done():
+                # 最后一个调用方也已取消，之后的调用重新发起查询
+                self._finish(key, task)
+                task.cancel()
+
+    def _finish(self, key: Hashable, task: "asyncio.Future"):
+        if self._flights.get(key, (None,))[0] is task:
+            del self._flights[key]
+        if task.done() and not task.cancelled():
+            # 所有调用方都已取消时，避免“异常未被获取”的警告
+            task.exception()
+